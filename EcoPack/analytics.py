@@ -1,13 +1,8 @@
 # analytics.py
 
+import math
 import pandas as pd
 
-# ==========================================================
-# GLOBAL IN-MEMORY STORE
-# This will be updated from app.py after ranking API runs
-# ==========================================================
-LAST_RANKINGS = pd.DataFrame()
-
 
 # ==========================================================
 # 1️⃣ DASHBOARD METRICS
@@ -53,11 +48,9 @@ def calculate_dashboard_metrics(df):
 # ==========================================================
 # 2️⃣ TOP 5 COMPARISON DATA
 # ==========================================================
-def get_top5_comparison_data():
-
-    global LAST_RANKINGS
+def get_top5_comparison_data(df):
 
-    if LAST_RANKINGS is None or LAST_RANKINGS.empty:
+    if df is None or df.empty:
         return []
 
     required_cols = [
@@ -67,11 +60,11 @@ def get_top5_comparison_data():
         "suitability_score"
     ]
 
-    cols = [c for c in required_cols if c in LAST_RANKINGS.columns]
+    cols = [c for c in required_cols if c in df.columns]
     if not cols:
         return []
 
-    df = LAST_RANKINGS.copy()
+    df = df.copy()
 
     for col in cols:
         if col != "material_name":
@@ -83,17 +76,15 @@ def get_top5_comparison_data():
 # ==========================================================
 # 3️⃣ MATERIAL USAGE TREND
 # ==========================================================
-def get_material_usage_trend():
+def get_material_usage_trend(df):
 
-    global LAST_RANKINGS
-
-    if LAST_RANKINGS is None or LAST_RANKINGS.empty:
+    if df is None or df.empty:
         return []
 
-    if "material_name" not in LAST_RANKINGS.columns:
+    if "material_name" not in df.columns:
         return []
 
-    trend = LAST_RANKINGS["material_name"].value_counts().head(5)
+    trend = df["material_name"].value_counts().head(5)
 
     return [
         {"material_name": str(name), "count": int(count)}
@@ -104,20 +95,18 @@ def get_material_usage_trend():
 # ==========================================================
 # 4️⃣ CO2 TREND
 # ==========================================================
-def get_co2_trend():
+def get_co2_trend(df):
 
-    global LAST_RANKINGS
-
-    if LAST_RANKINGS is None or LAST_RANKINGS.empty:
+    if df is None or df.empty:
         return []
 
-    if "material_name" not in LAST_RANKINGS.columns:
+    if "material_name" not in df.columns:
         return []
 
-    if "co2_score" not in LAST_RANKINGS.columns:
+    if "co2_score" not in df.columns:
         return []
 
-    df = LAST_RANKINGS.copy()
+    df = df.copy()
     df["co2_score"] = pd.to_numeric(df["co2_score"], errors="coerce").fillna(0)
 
     trend = (
@@ -133,20 +122,18 @@ def get_co2_trend():
 # ==========================================================
 # 5️⃣ COST TREND
 # ==========================================================
-def get_cost_trend():
-
-    global LAST_RANKINGS
+def get_cost_trend(df):
 
-    if LAST_RANKINGS is None or LAST_RANKINGS.empty:
+    if df is None or df.empty:
         return []
 
-    if "material_name" not in LAST_RANKINGS.columns:
+    if "material_name" not in df.columns:
         return []
 
-    if "cost_rupees" not in LAST_RANKINGS.columns:
+    if "cost_rupees" not in df.columns:
         return []
 
-    df = LAST_RANKINGS.copy()
+    df = df.copy()
     df["cost_rupees"] = pd.to_numeric(df["cost_rupees"], errors="coerce").fillna(0)
 
     trend = (
@@ -156,4 +143,105 @@ def get_cost_trend():
         .rename(columns={"cost_rupees": "avg_cost"})
     )
 
-    return trend.to_dict(orient="records")
\ No newline at end of file
+    return trend.to_dict(orient="records")
+
+# ==========================================================
+# 6️⃣ SINGLE-PASS ANALYTICS (built once per stored ranking)
+# ==========================================================
+EMPTY_METRICS = {
+    "avg_co2": 0,
+    "avg_cost": 0,
+    "avg_suitability": 0,
+    "co2_reduction_percent": 0,
+    "cost_savings_percent": 0
+}
+
+
+def _to_number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def build_ranking_analytics(records):
+    """
+    Build every dashboard payload for one ranking in a single pass over
+    its records: metrics, comparison, usage_trend, co2_trend, cost_trend.
+    Same values as the per-endpoint functions above.
+    """
+    if not records:
+        return {
+            "metrics": dict(EMPTY_METRICS),
+            "comparison": [],
+            "usage_trend": [],
+            "co2_trend": [],
+            "cost_trend": []
+        }
+
+    co2_total = cost_total = suit_total = 0.0
+    comparison = []
+    per_material = {}
+
+    for r in records:
+        name = r.get("material_name")
+        co2 = _to_number(r.get("co2_score"))
+        cost = _to_number(r.get("cost_rupees"))
+        suit = _to_number(r.get("suitability_score"))
+
+        co2_total += co2
+        cost_total += cost
+        suit_total += suit
+
+        comparison.append({
+            "material_name": name,
+            "cost_rupees": cost,
+            "co2_score": co2,
+            "suitability_score": suit
+        })
+
+        if name is not None:
+            stats = per_material.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += co2
+            stats[2] += cost
+
+    n = len(records)
+    avg_co2 = co2_total / n
+    avg_cost = cost_total / n
+    avg_suitability = suit_total / n
+
+    # Baseline reference (traditional packaging)
+    traditional_co2 = 15
+    traditional_cost = 10
+
+    co2_reduction = ((traditional_co2 - avg_co2) / traditional_co2) * 100
+    cost_savings = ((traditional_cost - avg_cost) / traditional_cost) * 100
+
+    # usage → most frequent first; co2/cost → by material name (groupby order)
+    by_count = sorted(per_material.items(), key=lambda item: -item[1][0])[:5]
+    by_name = sorted(per_material.items(), key=lambda item: str(item[0]))
+
+    return {
+        "metrics": {
+            "avg_co2": round(avg_co2, 2),
+            "avg_cost": round(avg_cost, 2),
+            "avg_suitability": round(avg_suitability, 2),
+            "co2_reduction_percent": round(co2_reduction, 2),
+            "cost_savings_percent": round(cost_savings, 2)
+        },
+        "comparison": comparison,
+        "usage_trend": [
+            {"material_name": str(name), "count": count}
+            for name, (count, _, _) in by_count
+        ],
+        "co2_trend": [
+            {"material_name": name, "avg_co2": co2 / count}
+            for name, (count, co2, _) in by_name
+        ],
+        "cost_trend": [
+            {"material_name": name, "avg_cost": cost / count}
+            for name, (count, _, cost) in by_name
+        ]
+    }
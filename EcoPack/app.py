@@ -1,7 +1,12 @@
 import os
+import json
+import time
+import base64
+import hashlib
+import logging
 from pathlib import Path
 from dotenv import load_dotenv
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, send_file, url_for, g
 import pandas as pd
 
 # =========================
@@ -10,12 +15,40 @@ import pandas as pd
 ROOT_DIR = Path(__file__).resolve().parent
 load_dotenv(ROOT_DIR / ".env")
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"
+)
+
 # =========================
 # LOCAL IMPORTS
 # =========================
-from ml.ranking import get_material_ranking
+from ml.ranking import (
+    get_material_ranking,
+    get_material_rankings_batch,
+    get_rank_sensitivity,
+    get_ranking_page,
+    ranked_orders,
+    order_stats,
+    warmup,
+    is_ready,
+    WARMUP_TIMINGS,
+    catalog,
+    prediction_cache,
+    ranking_table,
+    pareto_index,
+    coalescer
+)
+from ml.constraints import CONSTRAINTS, parse_constraints
+from ml.scoring import WEIGHT_NAMES, parse_weights, ranking_weights
+from ml.sensitivity import DEFAULT_SAMPLES, MAX_SAMPLES, sample_weights
+from db import pool_stats
+from metrics import REGISTRY, CONTENT_TYPE, timed, report_error
 import analytics
-from export_utils import export_pdf, export_excel
+from export_utils import export_excel, PDF_DOWNLOAD_NAME
+from report_jobs import ReportJobs
+from ranking_store import create_ranking_store, new_result_id
+from usage_aggregator import create_usage_aggregator, WINDOWS, DEFAULT_WINDOW
 
 # =========================
 # FLASK APP
@@ -23,10 +56,209 @@ from export_utils import export_pdf, export_excel
 app = Flask(__name__)
 
 # =========================
-# MEMORY STORE
+# LIMITS
+# =========================
+MAX_BATCH_SPECS = int(os.getenv("MAX_BATCH_SPECS", "10000"))
+# /api/ranking returns (and stores) the best top_k materials
+DEFAULT_TOP_K = 5
+MAX_TOP_K = int(os.getenv("MAX_TOP_K", "1000"))
+# /api/ranking/pages
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
 # =========================
-LAST_RANKINGS = pd.DataFrame()
-analytics.LAST_RANKINGS = LAST_RANKINGS
+# RANKING STORE
+# =========================
+# Each /api/ranking result is stored under its own id so concurrent
+# clients (and other gunicorn workers, with RANKING_STORE=sqlite, the
+# default under gunicorn with more than one worker) read back their own
+# ranking.
+RESULT_COOKIE = "ecopack_result_id"
+
+ranking_store = create_ranking_store()
+
+
+def save_ranking(records):
+    """
+    Store a ranking with its prebuilt dashboard analytics.
+    Returns (result_id, analytics payload).
+    """
+    with timed("analytics"):
+        payload = analytics.build_ranking_analytics(records)
+    content_hash = hashlib.sha256(
+        json.dumps(records, sort_keys=True).encode()
+    ).hexdigest()[:20]
+
+    result_id = new_result_id()
+    ranking_store.put(result_id, {
+        "ranking": records,
+        "analytics": payload,
+        "content_hash": content_hash,
+        "metrics_json": json.dumps(payload["metrics"])
+    })
+    return result_id, payload
+
+
+def current_result_id():
+    return request.args.get("result_id") or request.cookies.get(RESULT_COOKIE)
+
+
+def current_entry():
+    """Stored entry for the caller's result id (None if unknown/expired)."""
+    result_id = current_result_id()
+    return ranking_store.get(result_id) if result_id else None
+
+
+def current_ranking():
+    entry = current_entry()
+
+    if not entry:
+        return pd.DataFrame()
+    return pd.DataFrame(entry["ranking"])
+
+
+def json_response(body, etag):
+    """Pre-serialized JSON with an ETag; 304 when the client has it."""
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+# PDF reports cached by ranking content hash, rendered in a process pool
+reports = ReportJobs()
+
+# Cross-request usage statistics for the trend charts (per worker, or
+# shared by all workers with USAGE_STORE=sqlite, the default under
+# gunicorn with more than one worker)
+usage = create_usage_aggregator()
+
+
+# ==========================================================
+# METRICS
+# ==========================================================
+HTTP_SECONDS = REGISTRY.histogram(
+    "ecopack_http_request_seconds",
+    "Request latency by route, method and status.",
+    ["route", "method", "status"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "ecopack_http_requests_in_flight",
+    "Requests currently being handled by this worker."
+)
+
+
+def _hit_ratio(hits, misses):
+    total = hits + misses
+    return hits / total if total else None
+
+
+# Cache counters are read when /metrics is scraped, not per request
+REGISTRY.callback(
+    "ecopack_cache_hits_total", "Cache hits by cache.",
+    lambda: {
+        ("predictions",): prediction_cache.hits,
+        ("ranking_table",): ranking_table.hits,
+        ("pareto_index",): pareto_index.hits,
+        ("ranked_orders",): order_stats["hits"],
+        ("pdf_reports",): reports.hits
+    },
+    ["cache"], kind="counter"
+)
+REGISTRY.callback(
+    "ecopack_cache_misses_total", "Cache misses by cache.",
+    lambda: {
+        ("predictions",): prediction_cache.misses,
+        ("ranking_table",): ranking_table.fallbacks,
+        ("pareto_index",): pareto_index.fallbacks,
+        ("ranked_orders",): order_stats["misses"],
+        ("pdf_reports",): reports.misses
+    },
+    ["cache"], kind="counter"
+)
+REGISTRY.callback(
+    "ecopack_cache_hit_ratio", "Hits / (hits + misses) since the worker started.",
+    lambda: {
+        ("predictions",): _hit_ratio(prediction_cache.hits, prediction_cache.misses),
+        ("ranking_table",): _hit_ratio(ranking_table.hits, ranking_table.fallbacks),
+        ("pareto_index",): _hit_ratio(pareto_index.hits, pareto_index.fallbacks),
+        ("ranked_orders",): _hit_ratio(order_stats["hits"], order_stats["misses"]),
+        ("pdf_reports",): _hit_ratio(reports.hits, reports.misses)
+    },
+    ["cache"]
+)
+REGISTRY.callback(
+    "ecopack_ranking_coalesced_total",
+    "Ranking calls by outcome: leader (computed), collapsed (shared a leader's result), "
+    "timeout (gave up waiting and computed).",
+    lambda: {
+        ("leader",): coalescer.leaders,
+        ("collapsed",): coalescer.collapsed,
+        ("timeout",): coalescer.timeouts
+    },
+    ["outcome"], kind="counter"
+)
+REGISTRY.callback(
+    "ecopack_ranking_in_flight", "Distinct ranking computations in progress.",
+    coalescer.in_flight
+)
+REGISTRY.callback(
+    "ecopack_ranking_store_entries", "Stored ranking results.",
+    lambda: len(ranking_store)
+)
+REGISTRY.callback(
+    "ecopack_ranked_order_entries", "Full ranked orders cached for pagination.",
+    lambda: len(ranked_orders)
+)
+REGISTRY.callback(
+    "ecopack_catalog_rows", "Rows in the resident material catalog.",
+    lambda: len(catalog.current().df) if catalog.current() is not None else None
+)
+REGISTRY.callback(
+    "ecopack_catalog_version", "Catalog snapshot version (bumps on every reload).",
+    lambda: catalog.current().version if catalog.current() is not None else None
+)
+REGISTRY.callback(
+    "ecopack_db_pool_connections", "Database pool connections by state.",
+    lambda: {
+        ("checked_out",): pool_stats().get("checkedout"),
+        ("checked_in",): pool_stats().get("checkedin"),
+        ("overflow",): pool_stats().get("overflow")
+    },
+    ["state"]
+)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+
+@app.after_request
+def observe_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_SECONDS.observe(
+            time.perf_counter() - started, route, request.method, str(response.status_code)
+        )
+    return response
+
+
+@app.teardown_request
+def finish_request(exc):
+    HTTP_IN_FLIGHT.dec()
+
+
+def with_result_cookie(response, result_id):
+    response.set_cookie(
+        RESULT_COOKIE,
+        result_id,
+        max_age=int(ranking_store.ttl),
+        httponly=True,
+        samesite="Lax"
+    )
+    return response
 
 # ==========================================================
 # ROUTES
@@ -48,29 +280,40 @@ def dashboard():
 # ==========================================================
 @app.route("/api/ranking", methods=["POST"])
 def ranking():
-    global LAST_RANKINGS
-
     try:
         data = request.get_json()
 
-        if not data:
+        if not isinstance(data, dict) or not data:
             return jsonify({"error": "No input"}), 400
 
+        try:
+            weights = parse_weights(data.get("weights"))
+            constraints = parse_constraints(data)
+            top_k = int(data.get("top_k", DEFAULT_TOP_K))
+            if not 1 <= top_k <= MAX_TOP_K:
+                raise ValueError(f"top_k must be between 1 and {MAX_TOP_K}")
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
         ranking_df = get_material_ranking(
             product_type=data.get("product_type"),
             product_category=data.get("product_category"),
             fragility=data.get("fragility"),
             shipping_type=data.get("shipping_type"),
-            sustainability_priority=data.get("sustainability_priority")
+            sustainability_priority=data.get("sustainability_priority"),
+            top_n=top_k,
+            weights=weights,
+            constraints=constraints
         )
 
         if ranking_df is None or ranking_df.empty:
-            LAST_RANKINGS = pd.DataFrame()
-            analytics.LAST_RANKINGS = LAST_RANKINGS
-            return jsonify({"ranking": [], "metrics": {}})
+            result_id, _ = save_ranking([])
+            return with_result_cookie(
+                jsonify({"ranking": [], "metrics": {}, "result_id": result_id}),
+                result_id
+            )
 
-        df = ranking_df.head(5).copy()
-        df["rank"] = range(1, len(df) + 1)
+        df = ranking_df.copy()
 
         for col in [
             "cost_rupees",
@@ -81,18 +324,245 @@ def ranking():
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
-        LAST_RANKINGS = df.copy()
-        analytics.LAST_RANKINGS = LAST_RANKINGS
+        with timed("json_serialize"):
+            records = df.to_dict(orient="records")
+        result_id, payload = save_ranking(records)
+        usage.record(records)
+
+        with timed("json_serialize"):
+            response = jsonify({
+                "ranking": records,
+                "metrics": payload["metrics"],
+                "result_id": result_id
+            })
+        return with_result_cookie(response, result_id)
+
+    except Exception as e:
+        report_error("ranking")
+        return jsonify({"error": str(e)}), 500
+
+# ==========================================================
+# BATCH RANKING API
+# ==========================================================
+@app.route("/api/ranking/batch", methods=["POST"])
+def ranking_batch():
+    try:
+        data = request.get_json()
+
+        specs = data.get("specs") if isinstance(data, dict) else data
+
+        if not isinstance(specs, list) or not specs:
+            return jsonify({"error": "Expected a non-empty list of specs"}), 400
+
+        if len(specs) > MAX_BATCH_SPECS:
+            return jsonify({"error": f"At most {MAX_BATCH_SPECS} specs per batch"}), 400
+
+        if not all(isinstance(spec, dict) for spec in specs):
+            return jsonify({"error": "Each spec must be an object"}), 400
+
+        try:
+            top_n = int(data.get("top_n", DEFAULT_TOP_K)) if isinstance(data, dict) else DEFAULT_TOP_K
+            if not 1 <= top_n <= MAX_TOP_K:
+                raise ValueError(f"top_n must be between 1 and {MAX_TOP_K}")
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        rankings = get_material_rankings_batch(specs, top_n=top_n)
+
+        # Identical specs share one DataFrame → serialize each once
+        records = {}
+        results = []
+        with timed("json_serialize"):
+            for df in rankings:
+                if id(df) not in records:
+                    records[id(df)] = df.to_dict(orient="records")
+                results.append({"ranking": records[id(df)]})
+            response = jsonify({"results": results})
+
+        for result in results:
+            usage.record(result["ranking"])
+        return response
+
+    except Exception as e:
+        report_error("batch_ranking")
+        return jsonify({"error": str(e)}), 500
+
+# ==========================================================
+# PAGINATED RANKING API
+# ==========================================================
+INPUT_FIELDS = ("product_category", "fragility", "shipping_type", "sustainability_priority")
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-        metrics = analytics.calculate_dashboard_metrics(df)
+
+def decode_cursor(token):
+    """Cursor token → state dict. Raises ValueError when malformed."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+
+    if (
+        not isinstance(state, dict)
+        or not isinstance(state.get("inputs"), dict)
+        or not isinstance(state.get("constraints") or {}, dict)
+        or not isinstance(state.get("offset"), int)
+        or state["offset"] < 0
+        or not isinstance(state.get("version"), str)
+    ):
+        raise ValueError("Invalid cursor")
+    return state
+
+
+@app.route("/api/ranking/pages", methods=["GET", "POST"])
+def ranking_pages():
+    """
+    The whole ranked catalog, page by page. The first request carries
+    the inputs (optional weights and hard constraints such as max_cost);
+    every response has a next_cursor to pass back (query string or
+    body) until it is null. Pages are slices of a ranked order cached
+    per input combination.
+    """
+    try:
+        data = request.get_json(silent=True) if request.method == "POST" else None
+        data = data if isinstance(data, dict) else {}
+        params = {**request.args.to_dict(), **data}
+
+        try:
+            page_size = int(params.get("page_size", DEFAULT_PAGE_SIZE))
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+
+            if params.get("cursor"):
+                state = decode_cursor(params["cursor"])
+            else:
+                state = {
+                    "inputs": {field: params.get(field) for field in INPUT_FIELDS},
+                    "weights": params.get("weights"),
+                    "constraints": {name: params[name] for name in CONSTRAINTS if name in params},
+                    "offset": 0,
+                    "version": None
+                }
+            inputs = tuple(state["inputs"].get(field) for field in INPUT_FIELDS)
+            weights = parse_weights(state.get("weights"))
+            constraints = parse_constraints(state.get("constraints") or {})
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            page, total, version = get_ranking_page(
+                inputs, state["offset"], page_size,
+                weights=weights, version=state["version"], constraints=constraints
+            )
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 410
+
+        if page is None:
+            return jsonify({"error": "Material catalog unavailable"}), 503
+
+        offset = state["offset"]
+        next_offset = offset + len(page)
+        next_cursor = None
+        if next_offset < total:
+            next_cursor = encode_cursor({**state, "offset": next_offset, "version": version})
+
+        with timed("json_serialize"):
+            return jsonify({
+                "ranking": page.to_dict(orient="records"),
+                "offset": offset,
+                "page_size": page_size,
+                "total": total,
+                "next_cursor": next_cursor
+            })
+
+    except Exception as e:
+        report_error("ranking_pages")
+        return jsonify({"error": str(e)}), 500
+
+# ==========================================================
+# SENSITIVITY API
+# ==========================================================
+def weights_dict(weights):
+    return dict(zip(WEIGHT_NAMES, (round(float(w), 6) for w in weights)))
+
+
+def parse_weight_vector(value):
+    """parse_weights() for one `weight_vectors` entry, which must be given."""
+    weights = parse_weights(value)
+    if weights is None:
+        raise ValueError("each weight vector must be an object")
+    return weights
+
+
+@app.route("/api/ranking/sensitivity", methods=["POST"])
+def ranking_sensitivity():
+    """
+    Rank stability across many weight vectors: explicit `weight_vectors`,
+    or `samples` vectors drawn uniformly from the weight simplex (or
+    around the base weights with a `concentration`).
+    """
+    try:
+        data = request.get_json()
+
+        if not isinstance(data, dict):
+            return jsonify({"error": "No input"}), 400
+
+        try:
+            base = parse_weights(data.get("weights")) or ranking_weights(
+                data.get("shipping_type"), data.get("sustainability_priority")
+            )
+            top_n = int(data.get("top_n", 5))
+
+            if data.get("weight_vectors") is not None:
+                vectors = data["weight_vectors"]
+                if not isinstance(vectors, list) or not vectors:
+                    raise ValueError("weight_vectors must be a non-empty list")
+                weights = [parse_weight_vector(v) for v in vectors]
+            else:
+                samples = int(data.get("samples", DEFAULT_SAMPLES))
+                if not 0 < samples <= MAX_SAMPLES:
+                    raise ValueError(f"Between 1 and {MAX_SAMPLES} weight vectors")
+                concentration = data.get("concentration")
+                if concentration is not None and float(concentration) <= 0:
+                    raise ValueError("concentration must be positive")
+                weights = sample_weights(
+                    samples,
+                    seed=int(data.get("seed", 0)),
+                    center=base,
+                    concentration=None if concentration is None else float(concentration)
+                )
+
+            if len(weights) > MAX_SAMPLES:
+                raise ValueError(f"Between 1 and {MAX_SAMPLES} weight vectors")
+            if not 1 <= top_n <= MAX_TOP_K:
+                raise ValueError(f"top_n must be between 1 and {MAX_TOP_K}")
+
+            start = time.perf_counter()
+            df, summary = get_rank_sensitivity(
+                data.get("product_category"),
+                data.get("fragility"),
+                weights,
+                top_n=top_n,
+                base_weights=base
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        if df is None:
+            return jsonify({"error": "Material catalog unavailable"}), 503
 
         return jsonify({
-            "ranking": df.to_dict(orient="records"),
-            "metrics": metrics
+            "base_weights": weights_dict(base),
+            "summary": summary,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "materials": df.round(4).to_dict(orient="records")
         })
 
     except Exception as e:
-        print("❌ RANKING ERROR:", e)
+        report_error("sensitivity")
         return jsonify({"error": str(e)}), 500
 
 # ==========================================================
@@ -101,23 +571,15 @@ def ranking():
 @app.route("/api/dashboard-metrics", methods=["GET"])
 def dashboard_metrics():
     try:
-        if analytics.LAST_RANKINGS.empty:
-            return jsonify({
-                "avg_co2": 0,
-                "avg_cost": 0,
-                "avg_suitability": 0,
-                "co2_reduction_percent": 0,
-                "cost_savings_percent": 0
-            })
+        entry = current_entry()
 
-        metrics = analytics.calculate_dashboard_metrics(
-            analytics.LAST_RANKINGS
-        )
+        if not entry:
+            return json_response(json.dumps(analytics.EMPTY_METRICS), "empty-metrics")
 
-        return jsonify(metrics)
+        return json_response(entry["metrics_json"], f"{entry['content_hash']}-metrics")
 
     except Exception as e:
-        print("❌ DASHBOARD ERROR:", e)
+        report_error("dashboard")
         return jsonify({"error": str(e)}), 500
 
 # ==========================================================
@@ -126,42 +588,143 @@ def dashboard_metrics():
 @app.route("/api/trends", methods=["GET"])
 def trends():
     try:
-        if analytics.LAST_RANKINGS.empty:
-            return jsonify({
-                "comparison": [],
-                "usage_trend": [],
-                "co2_trend": [],
-                "cost_trend": []
-            })
+        window = request.args.get("window", DEFAULT_WINDOW)
 
-        return jsonify({
-            "comparison": analytics.get_top5_comparison_data(),
-            "usage_trend": analytics.get_material_usage_trend(),
-            "co2_trend": analytics.get_co2_trend(),
-            "cost_trend": analytics.get_cost_trend()
+        if window not in WINDOWS:
+            return jsonify({"error": f"window must be one of {list(WINDOWS)}"}), 400
+
+        entry = current_entry()
+        content_hash = entry["content_hash"] if entry else "none"
+        etag = f"{content_hash}-{usage.state_key(window)}"
+
+        # Cheap path for dashboard polling: nothing changed → 304
+        if request.if_none_match.contains(etag):
+            return json_response(b"", etag)
+
+        payload = entry["analytics"] if entry else analytics.build_ranking_analytics([])
+
+        # Comparison → this client's ranking; trends → all ranking calls,
+        # or this ranking's own when the window has no traffic yet
+        usage_trend = usage.usage_trend(window)
+        if usage_trend:
+            trend_data = {
+                "usage_trend": usage_trend,
+                "co2_trend": usage.co2_trend(window),
+                "cost_trend": usage.cost_trend(window)
+            }
+        else:
+            trend_data = {
+                "usage_trend": payload["usage_trend"],
+                "co2_trend": payload["co2_trend"],
+                "cost_trend": payload["cost_trend"]
+            }
+
+        body = json.dumps({
+            "comparison": payload["comparison"],
+            **trend_data,
+            "usage_timeline": usage.timeline(window)
         })
+        return json_response(body, etag)
 
     except Exception as e:
-        print("❌ TREND ERROR:", e)
+        report_error("trends")
         return jsonify({"error": str(e)}), 500
 
 # ==========================================================
 # EXPORT
 # ==========================================================
+def send_pdf(path):
+    return send_file(
+        path,
+        as_attachment=True,
+        download_name=PDF_DOWNLOAD_NAME,
+        mimetype="application/pdf"
+    )
+
 @app.route("/api/export/pdf")
 def export_pdf_api():
-    if analytics.LAST_RANKINGS.empty:
+    entry = current_entry()
+    if not entry or not entry["ranking"]:
+        return jsonify({"error": "No ranking data"}), 400
+
+    try:
+        with timed("export_pdf"):
+            path = reports.render_now(entry["content_hash"], pd.DataFrame(entry["ranking"]))
+        return send_pdf(path)
+
+    except Exception as e:
+        report_error("export_pdf")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/export/pdf/jobs", methods=["POST"])
+def export_pdf_job_start():
+    entry = current_entry()
+    if not entry or not entry["ranking"]:
         return jsonify({"error": "No ranking data"}), 400
-    return export_pdf()
+
+    job_id = entry["content_hash"]
+    status = reports.submit(job_id, pd.DataFrame(entry["ranking"]))
+
+    return jsonify({
+        "job_id": job_id,
+        "status": status,
+        "url": url_for("export_pdf_job", job_id=job_id)
+    }), 200 if status == "done" else 202
+
+@app.route("/api/export/pdf/jobs/<job_id>")
+def export_pdf_job(job_id):
+    if not reports.valid_key(job_id):
+        return jsonify({"error": "Invalid job id"}), 400
+
+    status = reports.status(job_id)
+
+    if status == "done":
+        return send_pdf(reports.path(job_id))
+    if status == "pending":
+        return jsonify({"job_id": job_id, "status": status}), 202
+    if status == "failed":
+        return jsonify({
+            "job_id": job_id,
+            "status": status,
+            "error": reports.error(job_id)
+        }), 500
+
+    return jsonify({"error": "Unknown job"}), 404
 
 @app.route("/api/export/excel")
 def export_excel_api():
-    if analytics.LAST_RANKINGS.empty:
+    rankings = current_ranking()
+    if rankings.empty:
         return jsonify({"error": "No ranking data"}), 400
-    return export_excel()
+    with timed("export_excel"):
+        return export_excel(rankings)
+
+# ==========================================================
+# HEALTH
+# ==========================================================
+@app.route("/healthz")
+def healthz():
+    # Liveness: the process is up and serving
+    return jsonify({"status": "ok"})
+
+@app.route("/metrics")
+def metrics():
+    # Prometheus text format, per worker (see metrics.Registry)
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+@app.route("/readyz")
+def readyz():
+    # Readiness: models loaded and catalog warmed (see ml.ranking.warmup)
+    ready = is_ready()
+    return jsonify({
+        "status": "ready" if ready else "starting",
+        "warmup_seconds": WARMUP_TIMINGS,
+        "db_pool": pool_stats()
+    }), 200 if ready else 503
 
 # ==========================================================
 # RUN
 # ==========================================================
 if __name__ == "__main__":
+    warmup()
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Check the constraint index (presorted columns) against a full boolean
+mask over the catalog and time both, from very selective to broad hard
+constraints.
+
+    python -m benchmarks.bench_constraints --sizes 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# ml.ranking creates the DB engine on import; nothing is read from it here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.bench_pareto import snapshot_of
+from benchmarks.synthetic import make_catalog, make_predictions
+from ml.constraints import CONSTRAINTS, ConstraintIndex
+from ml.scoring import STRENGTH
+
+# Share of the catalog the tightest bound keeps
+SELECTIVITIES = [0.001, 0.01, 0.05, 0.2, 0.5]
+
+
+def column_values(snapshot, predictions, column):
+    if column == "cost":
+        return predictions[0]
+    if column == "co2":
+        return predictions[1]
+    return snapshot.features[column]
+
+
+def mask_rows(snapshot, predictions, tier, constraints):
+    mask = snapshot.features[STRENGTH] >= tier
+    for name, bound in constraints:
+        column, side = CONSTRAINTS[name]
+        values = column_values(snapshot, predictions, column)
+        mask &= values <= bound if side == "max" else values >= bound
+    return np.flatnonzero(mask)
+
+
+def make_queries(snapshot, predictions, selectivity, count, rng):
+    """(tier, constraints): the first bound keeps `selectivity` of the rows, the others half."""
+    queries = []
+    names = sorted(CONSTRAINTS)
+    for _ in range(count):
+        picked = rng.choice(names, rng.integers(1, len(names) + 1), replace=False)
+        constraints = []
+        for i, name in enumerate(picked):
+            column, side = CONSTRAINTS[name]
+            share = selectivity if i == 0 else 0.5
+            q = share if side == "max" else 1 - share
+            constraints.append((name, float(np.quantile(column_values(snapshot, predictions, column), q))))
+        queries.append((int(rng.integers(1, 4)), tuple(sorted(constraints))))
+    return queries
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'build (s)':>10} {'selectivity':>12} {'mask (ms)':>10} "
+          f"{'index (ms)':>11} {'speedup':>8}  same")
+    failed = False
+    rng = np.random.default_rng(0)
+
+    for n in args.sizes:
+        df = make_catalog(n)
+        predictions = make_predictions(n)
+        snapshot = snapshot_of(df, 1)
+
+        index = ConstraintIndex()
+        start = time.perf_counter()
+        index.warm(snapshot, predictions)
+        build_t = time.perf_counter() - start
+
+        for selectivity in SELECTIVITIES:
+            queries = make_queries(snapshot, predictions, selectivity, args.queries, rng)
+            mask_t = index_t = 0.0
+            same = True
+
+            for tier, constraints in queries:
+                start = time.perf_counter()
+                expected = mask_rows(snapshot, predictions, tier, constraints)
+                mask_t += time.perf_counter() - start
+
+                start = time.perf_counter()
+                rows = index.candidates(snapshot, predictions, tier, constraints)
+                index_t += time.perf_counter() - start
+
+                same &= np.array_equal(rows, expected)
+
+            failed |= not same
+            mask_ms = mask_t * 1000 / len(queries)
+            index_ms = index_t * 1000 / len(queries)
+            print(f"{n:>10} {build_t:>10.3f} {selectivity:>12} {mask_ms:>10.2f} "
+                  f"{index_ms:>11.3f} {mask_ms / index_ms:>7.1f}x  {same}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Check the Pareto (k-skyband) index against the brute-force ranking and
+time both.
+
+For every input combination and several top-N, rank_top() must return
+exactly rank_snapshot().head(N), also when dominated rows differ from
+their dominators by float noise only (near ties). The incremental
+rebuild (rows added, non-skyband rows removed) must match a fresh
+build, and removing a skyband row must fall back to a full build.
+
+    python -m benchmarks.bench_pareto --sizes 1000 100000 1000000
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# ml.ranking creates the DB engine on import; nothing is read from it here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.synthetic import make_catalog, make_predictions
+from ml.catalog import CATALOG_COLUMNS, CatalogSnapshot
+from ml.pareto import ParetoIndex
+from ml.ranking import rank_snapshot, rank_top, pareto_index
+from ml.ranking_table import FRAGILITIES, PRODUCT_CATEGORIES, SHIPPING_TYPES, SUSTAINABILITY_PRIORITIES
+
+COMBINATIONS = list(itertools.product(
+    PRODUCT_CATEGORIES + ["toys"], FRAGILITIES, SHIPPING_TYPES, SUSTAINABILITY_PRIORITIES
+))
+
+
+def snapshot_of(df, version):
+    return CatalogSnapshot(df[CATALOG_COLUMNS].reset_index(drop=True), ("bench", version), version)
+
+
+def check_top_n(snapshot, predictions, top_ns):
+    """(mismatches, brute seconds, pruned seconds) over every combination."""
+    mismatches = 0
+    brute_t = pruned_t = 0.0
+
+    for inputs in COMBINATIONS:
+        start = time.perf_counter()
+        full = rank_snapshot(snapshot, predictions, *inputs)
+        brute_t += time.perf_counter() - start
+
+        for n in top_ns:
+            start = time.perf_counter()
+            top = rank_top(snapshot, predictions, *inputs, n)
+            pruned_t += time.perf_counter() - start
+
+            if not top.equals(full.head(n)):
+                mismatches += 1
+                print(f"❌ MISMATCH {inputs} top {n}")
+
+    return mismatches, brute_t / len(COMBINATIONS), pruned_t / (len(COMBINATIONS) * len(top_ns))
+
+
+def check_near_ties(df, cost, co2, k, trials=100):
+    """
+    Mismatches when the best rows are a few ulps apart in cost, worst
+    first in catalog order: their scores round to ties, so a dominated
+    row can win on catalog order.
+    """
+    rng = np.random.default_rng(5)
+    df = df.copy()
+    cost = cost.copy()
+    co2 = co2.copy()
+
+    near = np.arange(min(len(df), 2 * k))
+    cost[near] = cost.min() * (1 + (len(near) - near) * 2 * np.finfo(float).eps)
+    co2[near] = co2.min()
+    for column in ("strength", "weight_capacity", "biodegradability_score", "recyclability_percentage"):
+        df.loc[df.index[near], column] = df[column].max()
+
+    snapshot = snapshot_of(df, 1)
+    predictions = (cost, co2)
+    mismatches = 0
+
+    for _ in range(trials):
+        weights = tuple(rng.dirichlet(np.ones(3)))
+        n = int(rng.integers(1, k + 1))
+        top = rank_top(snapshot, predictions, "other", "low", None, None, n, weights=weights)
+        expected = rank_snapshot(snapshot, predictions, "other", "low", None, None, weights=weights, top_n=n)
+        if not top.equals(expected):
+            mismatches += 1
+    return mismatches
+
+
+def check_incremental(df, cost, co2, k):
+    """Incremental rebuild after appends / removals vs. a fresh build."""
+    n = len(df)
+    rng = np.random.default_rng(3)
+    snapshot = snapshot_of(df, 1)
+    predictions = (cost, co2)
+    index = ParetoIndex(k)
+    keys = [(c, f) for c in ("food", "electronics", "other") for f in FRAGILITIES]
+
+    band = set()
+    for category, fragility in keys:
+        band.update(index.lookup(snapshot, predictions, category, fragility, k).rows.tolist())
+
+    # Append 1% new rows, drop 1% of the rows that are in no skyband
+    extra = make_catalog(max(n // 100, 1), seed=11)
+    extra_cost, extra_co2 = make_predictions(len(extra), seed=12)
+    outside = np.setdiff1d(np.arange(n), list(band))
+    keep = np.setdiff1d(np.arange(n), rng.choice(outside, min(len(outside), n // 100), replace=False))
+
+    df2 = pd.concat([df.iloc[keep], extra], ignore_index=True)
+    preds2 = (np.concatenate([cost[keep], extra_cost]), np.concatenate([co2[keep], extra_co2]))
+    snapshot2 = snapshot_of(df2, 2)
+
+    start = time.perf_counter()
+    updated = {key: index.lookup(snapshot2, preds2, *key, k).rows for key in keys}
+    incremental_t = time.perf_counter() - start
+
+    ok = index.incremental_builds == len(keys)
+    fresh = ParetoIndex(k)
+    for key in keys:
+        if not np.array_equal(updated[key], fresh.lookup(snapshot2, preds2, *key, k).rows):
+            print(f"❌ INCREMENTAL MISMATCH {key}")
+            ok = False
+
+    # Removing a skyband row forces a full rebuild of that entry
+    victim = index.lookup(snapshot2, preds2, "other", "low", k).rows[0]
+    keep3 = np.delete(np.arange(len(df2)), victim)
+    snapshot3 = snapshot_of(df2.iloc[keep3], 3)
+    preds3 = (preds2[0][keep3], preds2[1][keep3])
+    before = index.full_builds
+    rows = index.lookup(snapshot3, preds3, "other", "low", k).rows
+    expected = ParetoIndex(k).lookup(snapshot3, preds3, "other", "low", k).rows
+
+    ok &= np.array_equal(rows, expected) and index.full_builds == before + 1
+    return ok, incremental_t
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--top-n", type=int, nargs="+", default=[1, 5, pareto_index.k])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'build (s)':>10} {'candidates':>11} {'brute (ms)':>11} "
+          f"{'pruned (ms)':>12} {'mismatch':>9} {'near ties':>10} {'incr. (s)':>10}  incremental ok")
+    failed = False
+
+    for n in args.sizes:
+        df = make_catalog(n)
+        cost, co2 = make_predictions(n)
+        # The index is keyed on the predictions object, like the prediction cache's result
+        predictions = (cost, co2)
+        snapshot = snapshot_of(df, 1)
+
+        pareto_index.invalidate()
+        start = time.perf_counter()
+        pareto_index.warm(snapshot, predictions)
+        build_t = time.perf_counter() - start
+
+        candidates = max(e["candidates"] for e in pareto_index.stats()["entries"].values())
+        mismatches, brute_t, pruned_t = check_top_n(snapshot, predictions, args.top_n)
+        ok, incremental_t = check_incremental(df, cost, co2, pareto_index.k)
+        near_ties = check_near_ties(df, cost, co2, pareto_index.k)
+
+        failed |= bool(mismatches or near_ties) or not ok
+        print(f"{n:>10} {build_t:>10.3f} {candidates:>11} {brute_t * 1000:>11.2f} "
+              f"{pruned_t * 1000:>12.3f} {mismatches:>9} {near_ties:>10} {incremental_t:>10.3f}  {ok}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
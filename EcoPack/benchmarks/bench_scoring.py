@@ -0,0 +1,138 @@
+"""
+Compare the old row-wise pandas scoring with the vectorized pipeline.
+
+    python -m benchmarks.bench_scoring --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_catalog, make_predictions
+from ml.scoring import (
+    FEATURES,
+    STRENGTH,
+    final_scores,
+    min_strength,
+    rank_order,
+    ranking_weights,
+    suitability_scores
+)
+
+INPUTS = ("other", "high", "international", "high")
+
+
+# ==========================================================
+# PREVIOUS IMPLEMENTATION (df.apply per row)
+# ==========================================================
+def legacy_ranking(df, product_category, fragility, shipping_type, sustainability_priority):
+    fragility = (fragility or "").lower()
+
+    if fragility == "high":
+        df = df[df["strength"] >= 3]
+    elif fragility == "medium":
+        df = df[df["strength"] >= 2]
+    else:
+        df = df[df["strength"] >= 1]
+
+    def material_priority_score(row):
+        cat = (product_category or "").lower()
+        if cat == "food":
+            return 0.5 * row["biodegradability_score"] + 0.5 * row["recyclability_percentage"]
+        elif cat == "electronics":
+            return 0.6 * row["strength"] + 0.4 * row["weight_capacity"]
+        else:
+            return (
+                0.4 * row["strength"] +
+                0.3 * row["biodegradability_score"] +
+                0.3 * row["recyclability_percentage"]
+            )
+
+    df["suitability_score"] = df.apply(material_priority_score, axis=1)
+
+    df["cost_score"] = 1 - (
+        (df["cost_rupees"] - df["cost_rupees"].min()) /
+        (df["cost_rupees"].max() - df["cost_rupees"].min() + 1e-6)
+    )
+    df["co2_score_norm"] = 1 - (
+        (df["co2_score"] - df["co2_score"].min()) /
+        (df["co2_score"].max() - df["co2_score"].min() + 1e-6)
+    )
+    df["suitability_norm"] = (
+        (df["suitability_score"] - df["suitability_score"].min()) /
+        (df["suitability_score"].max() - df["suitability_score"].min() + 1e-6)
+    )
+
+    cost_w, co2_w, suit_w = ranking_weights(shipping_type, sustainability_priority)
+
+    df["final_score"] = (
+        cost_w * df["cost_score"] +
+        co2_w * df["co2_score_norm"] +
+        suit_w * df["suitability_norm"]
+    )
+
+    return df.sort_values("final_score", ascending=False)
+
+
+# ==========================================================
+# VECTORIZED IMPLEMENTATION
+# ==========================================================
+def vectorized_ranking(features, cost, co2, product_category, fragility, shipping_type, sustainability_priority):
+    candidates = np.flatnonzero(features[STRENGTH] >= min_strength(fragility))
+    cost = cost[candidates]
+    co2 = co2[candidates]
+
+    suitability = suitability_scores(features[:, candidates], product_category)
+    score = final_scores(cost, co2, suitability, ranking_weights(shipping_type, sustainability_priority))
+    order = rank_order(score)
+    return candidates[order], score[order]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="skip the df.apply version above this many rows")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}  same order")
+
+    for n in args.sizes:
+        df = make_catalog(n)
+        cost, co2 = make_predictions(n)
+        features = np.ascontiguousarray(df[FEATURES].to_numpy(dtype=float).T)
+
+        fast_t, (rows, _) = best_of(
+            lambda: vectorized_ranking(features, cost, co2, *INPUTS), args.repeat
+        )
+
+        if n > args.legacy_max:
+            print(f"{n:>10} {'-':>12} {fast_t:>15.4f} {'-':>9}  -")
+            continue
+
+        frame = df.assign(cost_rupees=cost, co2_score=co2)
+        slow_t, ranked = best_of(lambda: legacy_ranking(frame.copy(), *INPUTS), 1)
+
+        same = np.array_equal(ranked.index.to_numpy(), rows)
+        print(f"{n:>10} {slow_t:>12.4f} {fast_t:>15.4f} {slow_t / fast_t:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Top-k ranking: full stable sort + head(k) vs. partial selection
+(top_order) vs. the Pareto index, on large synthetic catalogs.
+
+    python -m benchmarks.bench_topk --sizes 100000 1000000 --k 5 100 1000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+# ml.ranking creates the DB engine on import; nothing is read from it here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from benchmarks.bench_pareto import snapshot_of
+from benchmarks.synthetic import make_catalog, make_predictions
+from ml.ranking import pareto_index, rank_snapshot, rank_top
+from ml.scoring import rank_order, top_order
+
+INPUTS = ("other", "low", "international", "high")
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'k':>6} {'sort (ms)':>10} {'select (ms)':>12} {'speedup':>8} "
+          f"{'ranking full (ms)':>18} {'ranking top-k (ms)':>19} {'pareto (ms)':>12}  same")
+    failed = False
+
+    for n in args.sizes:
+        df = make_catalog(n)
+        predictions = make_predictions(n)
+        snapshot = snapshot_of(df, 1)
+        scores = np.random.default_rng(0).random(n).round(3)   # rounded → ties at the cut
+
+        pareto_index.warm(snapshot, predictions)
+        full_t, full = best_of(lambda: rank_snapshot(snapshot, predictions, *INPUTS), args.repeat)
+
+        for k in args.k:
+            sort_t, expected = best_of(lambda: rank_order(scores)[:k], args.repeat)
+            select_t, picked = best_of(lambda: top_order(scores, k), args.repeat)
+
+            top_t, top = best_of(lambda: rank_snapshot(snapshot, predictions, *INPUTS, top_n=k), args.repeat)
+            same = np.array_equal(expected, picked) and top.equals(full.head(k))
+
+            pareto = "-"
+            if k <= pareto_index.k:
+                pareto_t, pruned = best_of(lambda: rank_top(snapshot, predictions, *INPUTS, k), args.repeat)
+                same &= pruned.equals(full.head(k))
+                pareto = f"{pareto_t * 1000:.2f}"
+
+            failed |= not same
+            print(f"{n:>10} {k:>6} {sort_t * 1000:>10.2f} {select_t * 1000:>12.2f} "
+                  f"{sort_t / select_t:>7.1f}x {full_t * 1000:>18.2f} {top_t * 1000:>19.2f} "
+                  f"{pareto:>12}  {same}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Library predict vs. ml.tree_engine for the cost and CO2 models.
+
+    python -m ml.tree_engine export
+    python -m benchmarks.bench_tree_engine --sizes 1 100 10000 100000
+"""
+import argparse
+import pickle
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import make_catalog
+from ml.scoring import FEATURES
+from ml.model_store import current_model_dir
+from ml.tree_engine import MODEL_DIR, load_array_models
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    model_dir = current_model_dir(MODEL_DIR)
+    with open(model_dir / "rf_cost_model.pkl", "rb") as f:
+        rf = pickle.load(f)
+    with open(model_dir / "xgb_co2_model.pkl", "rb") as f:
+        xgb = pickle.load(f)
+    with open(model_dir / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+    cost, co2, array_scaler = load_array_models(model_dir)
+
+    print(f"{'rows':>8} {'model':>6} {'library (ms)':>13} {'arrays (ms)':>12} {'speedup':>8} {'max diff':>9}")
+
+    for n in args.sizes:
+        df = make_catalog(n)
+        X_frame = df[FEATURES]
+        X = X_frame.to_numpy(dtype=float)
+        X_scaled = scaler.transform(X_frame)
+
+        cases = {
+            "cost": (lambda: rf.predict(X_frame), lambda: cost.predict(X)),
+            "co2": (lambda: xgb.predict(X_scaled), lambda: co2.predict(array_scaler.transform(X)))
+        }
+
+        for name, (library, arrays) in cases.items():
+            lib_t = best_of(library, args.repeat)
+            arr_t = best_of(arrays, args.repeat)
+            diff = float(np.max(np.abs(library() - arrays())))
+            print(f"{n:>8} {name:>6} {lib_t * 1e3:>13.3f} {arr_t * 1e3:>12.3f} "
+                  f"{lib_t / arr_t:>7.1f}x {diff:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Per-worker memory and model load time: pickled models loaded in every
+worker vs. memory-mapped .npy bundles preloaded in the master.
+
+Forks --workers processes the way gunicorn does and reads RSS/PSS from
+/proc (Linux only). PSS splits shared pages between the processes
+mapping them, so it is the number that shows sharing.
+
+    python -m ml.tree_engine export
+    python -m benchmarks.bench_worker_memory --workers 4
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from ml.model_store import current_model_dir
+
+MODEL_DIR = current_model_dir(ROOT_DIR / "models")
+
+
+def memory_kb():
+    stats = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                stats[key.lower()] = int(rest.split()[0])
+    return stats
+
+
+def load(backend):
+    warnings.filterwarnings("ignore")
+    if backend == "arrays":
+        from ml.tree_engine import load_array_models
+        return load_array_models(MODEL_DIR)
+
+    models = []
+    for name in ("rf_cost_model.pkl", "xgb_co2_model.pkl", "scaler.pkl"):
+        with open(MODEL_DIR / name, "rb") as f:
+            models.append(pickle.load(f))
+    return tuple(models)
+
+
+def predict(models):
+    cost, co2, scaler = models
+    X = np.random.default_rng(0).uniform(1, 50, (100, 4))
+    cost.predict(X)
+    co2.predict(scaler.transform(X))
+
+
+# ==========================================================
+# ONE CONFIGURATION (run in a fresh interpreter)
+# ==========================================================
+def run(backend, preload, workers):
+    base = memory_kb()
+    master_load = 0.0
+    models = None
+
+    if preload:
+        start = time.perf_counter()
+        models = load(backend)
+        master_load = time.perf_counter() - start
+
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            start = time.perf_counter()
+            worker_models = models if preload else load(backend)
+            boot = time.perf_counter() - start
+            predict(worker_models)
+            line = json.dumps({"boot_s": boot, **memory_kb()}) + "\n"
+            os.write(write_fd, line.encode())
+            # stay alive until every worker has measured (shared pages)
+            time.sleep(1.0)
+            os._exit(0)
+        pids.append(pid)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        results = [json.loads(line) for line in f]
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    n = len(results)
+    return {
+        "backend": backend,
+        "mode": "preload" if preload else "per-worker",
+        "master_load_s": master_load,
+        "interpreter_rss_kb": base["rss"],
+        "worker_boot_s": sum(r["boot_s"] for r in results) / n,
+        "worker_rss_kb": sum(r["rss"] for r in results) / n,
+        "worker_pss_kb": sum(r["pss"] for r in results) / n
+    }
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--run", nargs=2, metavar=("BACKEND", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        backend, mode = args.run
+        print(json.dumps(run(backend, mode == "preload", args.workers)))
+        return
+
+    print(f"{'backend':>8} {'mode':>11} {'master load (s)':>16} {'worker boot (s)':>16} "
+          f"{'RSS/worker (MB)':>16} {'PSS/worker (MB)':>16}")
+
+    for backend in ("library", "arrays"):
+        for mode in ("per-worker", "preload"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_worker_memory",
+                 "--workers", str(args.workers), "--run", backend, mode],
+                cwd=ROOT_DIR, capture_output=True, text=True, check=True
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{backend:>8} {mode:>11} {r['master_load_s']:>16.3f} {r['worker_boot_s']:>16.3f} "
+                  f"{r['worker_rss_kb'] / 1024:>16.1f} {r['worker_pss_kb'] / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Cold-start report: import time per module, broken down by the packages
+each one pulls in, plus the warmup stages of ml.ranking.
+
+Every module is imported in a fresh interpreter with `-X importtime`, so
+the numbers are what a new gunicorn master / worker pays.
+
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --modules app export_utils --top 5
+    DATABASE_URL=... python -m benchmarks.startup_profile --warmup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+MODULES = ["app", "ml.ranking", "export_utils", "report_jobs", "analytics"]
+
+
+def import_profile(module):
+    """
+    Import `module` in a fresh interpreter → (wall seconds, {package: seconds}).
+    Each module's own ("self") time is added to its top-level package, so
+    "sklearn.ensemble._forest" is counted under "sklearn" and nothing is
+    counted twice.
+    """
+    env = dict(os.environ, DATABASE_URL=os.getenv("DATABASE_URL", "sqlite://"))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|", 2)
+        if not own.strip().isdigit():
+            continue    # header line
+        package = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(own) / 1e6
+    return wall, packages
+
+
+def warmup_profile():
+    """Run ml.ranking.warmup() in a fresh interpreter → stage timings."""
+    code = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "from ml import ranking\n"
+        "imported = time.perf_counter() - start\n"
+        "ready = ranking.warmup()\n"
+        "print(json.dumps({'import': imported, 'ready': ready, **ranking.WARMUP_TIMINGS}))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per module")
+    parser.add_argument("--warmup", action="store_true", help="also time ml.ranking.warmup() (needs DATABASE_URL)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        wall, packages = import_profile(module)
+        results[module] = {"wall_s": wall, "packages_s": packages}
+
+    if args.warmup:
+        results["warmup"] = warmup_profile()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for module in args.modules:
+        r = results[module]
+        print(f"{module}: {r['wall_s']:.3f} s (interpreter included)")
+        ranked = sorted(r["packages_s"].items(), key=lambda item: -item[1])
+        for package, seconds in ranked[:args.top]:
+            print(f"    {package:<24} {seconds:>8.3f} s")
+
+    if args.warmup:
+        stages = results["warmup"]
+        print(f"warmup (ready={stages.pop('ready')}):")
+        for stage, seconds in stages.items():
+            print(f"    {stage:<24} {seconds:>8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Benchmark suite for the ranking, analytics and export hot paths.
+
+Each catalog size runs in a fresh interpreter against a synthetic
+SQLite table (stand-in for the Postgres `material` table). Every stage
+reports median / min wall time over --repeat runs and its peak traced
+allocation (one extra run under tracemalloc); the process peak RSS is
+reported per size. Results are saved as JSON and compared with a
+stored baseline: a stage is flagged when it is slower (or allocates
+more) than the baseline by more than --threshold.
+
+    python -m benchmarks.suite --sizes 100 1000 10000 100000 1000000
+    python -m benchmarks.suite --save-baseline          # store this run as the baseline
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+BENCH_DIR = ROOT_DIR / "benchmarks"
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+SIZES = [100, 1000, 10000, 100000, 1000000]
+INPUTS = ("food", "high", "international", "high")
+
+# Differences below these are noise, never regressions
+MIN_SECONDS = 0.002
+MIN_MB = 1.0
+
+
+# ==========================================================
+# STAGES (run inside the per-size interpreter)
+# ==========================================================
+def build_stages():
+    """
+    (name, setup, run) per stage. setup() resets caches so cold stages
+    measure the cold path on every repeat; run() is the timed part.
+    """
+    import pandas as pd
+    from flask import Flask
+
+    import analytics
+    import export_utils
+    from ml import ranking
+
+    # Model loading is a startup cost, not part of the predict stage
+    ranking.warmup(data=False)
+    state = {}
+
+    def load():
+        state["snapshot"], state["predictions"] = ranking.load_snapshot()
+
+    def ranked():
+        if "ranked" not in state:
+            load()
+            state["ranked"] = ranking.rank_snapshot(state["snapshot"], state["predictions"], *INPUTS)
+            state["records"] = state["ranked"].to_dict(orient="records")
+        return state["ranked"]
+
+    export_app = Flask(__name__, root_path=str(ROOT_DIR))
+
+    def excel():
+        with export_app.test_request_context():
+            export_utils.export_excel(ranked())
+
+    return [
+        ("catalog_load", None, lambda: ranking.catalog.refresh(force=True)),
+        ("predict", ranking.invalidate_predictions, load),
+        ("ranking_table_build", ranking.ranking_table.invalidate,
+         lambda: ranking.ranking_table.lookup(state["snapshot"], state["predictions"], *INPUTS)),
+        ("get_material_ranking", None,
+         lambda: ranking.get_material_ranking(None, *INPUTS)),
+        ("rank_snapshot", None,
+         lambda: ranking.rank_snapshot(state["snapshot"], state["predictions"], *INPUTS)),
+        ("analytics_dashboard_metrics", None, lambda: analytics.calculate_dashboard_metrics(ranked())),
+        ("analytics_top5_comparison", None, lambda: analytics.get_top5_comparison_data(ranked())),
+        ("analytics_usage_trend", None, lambda: analytics.get_material_usage_trend(ranked())),
+        ("analytics_co2_trend", None, lambda: analytics.get_co2_trend(ranked())),
+        ("analytics_cost_trend", None, lambda: analytics.get_cost_trend(ranked())),
+        ("analytics_single_pass", None, lambda: analytics.build_ranking_analytics(state["records"])),
+        ("export_pdf", None, lambda: export_utils.render_pdf(ranked())),
+        ("export_excel", None, excel),
+        ("ranking_to_frame", None, lambda: pd.DataFrame(state["records"]))
+    ]
+
+
+def time_stage(setup, run, repeat):
+    # Warm stages: one untimed run first (lazy imports, first-touch caches)
+    if setup is None:
+        run()
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    # One more run under tracemalloc for the stage's peak allocation
+    if setup:
+        setup()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_mb": peak / 2**20
+    }
+
+
+def run_size(n_rows, repeat, db_path):
+    from benchmarks.synthetic import make_catalog, write_sqlite
+
+    start = time.perf_counter()
+    write_sqlite(make_catalog(n_rows), db_path)
+    setup_s = time.perf_counter() - start
+
+    # Before anything imports db.py
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["CATALOG_POLL_SECONDS"] = "0"
+
+    stages = {}
+    for name, setup, run in build_stages():
+        stages[name] = time_stage(setup, run, repeat)
+
+    return {
+        "rows": n_rows,
+        "db_setup_s": setup_s,
+        "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stages": stages
+    }
+
+
+# ==========================================================
+# BASELINE COMPARISON
+# ==========================================================
+def compare(current, baseline, threshold):
+    """List of regressions (stage slower / bigger than baseline × (1 + threshold))."""
+    regressions = []
+
+    for size, result in current["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+
+        for stage, now in result["stages"].items():
+            before = base["stages"].get(stage)
+            if not before:
+                continue
+
+            for metric, floor in (("median_s", MIN_SECONDS), ("peak_mb", MIN_MB)):
+                old, new = before[metric], now[metric]
+                if new - old > floor and new > old * (1 + threshold):
+                    regressions.append({
+                        "rows": int(size),
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": (new - old) / old if old else float("inf")
+                    })
+    return regressions
+
+
+def print_results(results):
+    for size, r in results.items():
+        print(f"\n{int(size):,} rows  (peak RSS {r['rss_peak_mb']:.0f} MB, DB setup {r['db_setup_s']:.2f}s)")
+        print(f"    {'stage':<30} {'median ms':>11} {'min ms':>10} {'peak MB':>9}")
+        for stage, s in r["stages"].items():
+            print(f"    {stage:<30} {s['median_s'] * 1000:>11.2f} {s['min_s'] * 1000:>10.2f} {s['peak_mb']:>9.1f}")
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="also write this run to --baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change flagged as regression")
+    parser.add_argument("--run", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_size(args.run, args.repeat, args.db)))
+        return 0
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.sizes:
+            print(f"… {n_rows:,} rows", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.suite", "--run", str(n_rows),
+                 "--repeat", str(args.repeat), "--db", os.path.join(tmp, f"material_{n_rows}.db")],
+                cwd=ROOT_DIR, capture_output=True, text=True, check=True
+            ).stdout
+            results[str(n_rows)] = json.loads(out.strip().splitlines()[-1])
+
+    current = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model_backend": os.getenv("MODEL_BACKEND", "library"),
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    print_results(results)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(current, indent=2))
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(Path(args.baseline).read_text())
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline} (use --save-baseline)")
+        return 0
+
+    regressions = compare(current, baseline, args.threshold)
+    if not regressions:
+        print(f"✅ No regressions vs. baseline (threshold {args.threshold:.0%})")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) vs. baseline (threshold {args.threshold:.0%}):")
+    for r in regressions:
+        print(f"    {r['rows']:>9,} rows  {r['stage']:<30} {r['metric']:<9} "
+              f"{r['baseline']:.4g} → {r['current']:.4g} ({r['change']:+.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+
+# ==========================================================
+# SYNTHETIC MATERIAL CATALOG
+# ==========================================================
+def make_catalog(n_rows, seed=42):
+    """
+    Random material table with the same columns as the `material` table.
+    Value ranges roughly follow the real dataset.
+    """
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        "material_id": np.arange(1, n_rows + 1),
+        "material_name": [f"Material {i}" for i in range(1, n_rows + 1)],
+        "strength": rng.integers(1, 6, n_rows).astype(float),
+        "weight_capacity": rng.uniform(1, 50, n_rows).round(2),
+        "biodegradability_score": rng.uniform(1, 10, n_rows).round(2),
+        "co2_score": rng.uniform(0.5, 20, n_rows).round(2),
+        "recyclability_percentage": rng.uniform(10, 100, n_rows).round(1),
+        "cost_rupees": rng.uniform(1, 30, n_rows).round(2)
+    })
+
+
+def make_predictions(n_rows, seed=7):
+    """Stand-in model outputs (cost float64, co2 float32 like XGBoost)."""
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(1, 30, n_rows)
+    co2 = rng.uniform(0.5, 20, n_rows).astype(np.float32)
+    return cost, co2
+
+
+def write_sqlite(df, path, table="material", chunk_rows=50000):
+    """Write a catalog to a SQLite file (stand-in for the Postgres table)."""
+    import sqlite3
+
+    con = sqlite3.connect(path)
+    try:
+        con.execute(f"DROP TABLE IF EXISTS {table}")
+        con.execute(
+            f"CREATE TABLE {table} ("
+            " material_id INTEGER PRIMARY KEY,"
+            " material_name TEXT,"
+            " strength REAL,"
+            " weight_capacity REAL,"
+            " biodegradability_score REAL,"
+            " co2_score REAL,"
+            " recyclability_percentage REAL,"
+            " cost_rupees REAL)"
+        )
+        columns = [
+            "material_id", "material_name", "strength", "weight_capacity",
+            "biodegradability_score", "co2_score", "recyclability_percentage", "cost_rupees"
+        ]
+        placeholders = ", ".join("?" * len(columns))
+        for start in range(0, len(df), chunk_rows):
+            rows = df[columns].iloc[start:start + chunk_rows].itertuples(index=False, name=None)
+            con.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+        con.commit()
+    finally:
+        con.close()
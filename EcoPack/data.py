@@ -1,30 +1,78 @@
 import os
 import pandas as pd
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
 
-# Load .env only for LOCAL development
-load_dotenv()
+# Pooled engine shared with the web tier (DB_POOL_* settings, see db.py)
+from db import (
+    MATERIAL_TABLE,
+    engine,
+    read_frame,
+    select_aggregates,
+    select_columns,
+    table_columns
+)
+from metrics import log, report_error, timed
 
-# Works in BOTH Localhost + Render
-DATABASE_URL = os.environ.get("DATABASE_URL")
+# Model inputs + targets: the only columns training reads
+FEATURE_COLUMNS = [
+    "strength",
+    "weight_capacity",
+    "biodegradability_score",
+    "recyclability_percentage"
+]
+TARGET_COLUMNS = ["cost_rupees", "co2_score"]
+TRAINING_COLUMNS = FEATURE_COLUMNS + TARGET_COLUMNS
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL not set in environment variables")
+# Streaming loader: rows per chunk and the dtype every chunk is cast to
+CHUNK_ROWS = int(os.getenv("TRAINING_CHUNK_ROWS", "50000"))
+COLUMN_DTYPES = {c: "float64" for c in TRAINING_COLUMNS}
 
-# SQLAlchemy Engine
-engine = create_engine(DATABASE_URL)
+# Monotonic primary key: stable stream order and the "new rows" watermark
+KEY_COLUMN = "material_id"
+COLUMN_DTYPES[KEY_COLUMN] = "int64"
 
-def load_material_data(table_name="material"):
+
+def load_material_data(table_name=MATERIAL_TABLE, columns=TRAINING_COLUMNS):
     """
     Load material dataset from PostgreSQL.
-    Returns a pandas DataFrame.
+    Returns a pandas DataFrame with only `columns`.
     """
     try:
-        with engine.connect() as conn:
-            df = pd.read_sql(text(f"SELECT * FROM {table_name}"), conn)
-        print("Dataset loaded successfully!")
+        with timed("db_read"):
+            df = read_frame(table_name, columns, engine)
+        log.info("dataset loaded: %d rows", len(df))
         return df
-    except Exception as e:
-        print("DB Load Error:", e)
-        return pd.DataFrame()
\ No newline at end of file
+    except Exception:
+        report_error("db_load")
+        return pd.DataFrame()
+
+
+def count_material_rows(table_name=MATERIAL_TABLE, after_key=None):
+    """Row count, or only rows with KEY_COLUMN > after_key."""
+    after = None if after_key is None else (KEY_COLUMN, after_key)
+    with engine.connect() as conn:
+        return conn.execute(select_aggregates(table_name, bind=engine, after=after)).scalar_one()
+
+
+def has_key_column(table_name=MATERIAL_TABLE):
+    return KEY_COLUMN in table_columns(table_name, engine)
+
+
+def iter_material_chunks(
+    table_name=MATERIAL_TABLE,
+    columns=TRAINING_COLUMNS,
+    chunk_rows=CHUNK_ROWS,
+    order_by=None
+):
+    """
+    Stream `columns` of the table as DataFrames of at most `chunk_rows`
+    rows. Uses a server-side cursor (PostgreSQL), so only one chunk is
+    held in memory at a time. Columns in COLUMN_DTYPES are cast to it.
+    """
+    columns = list(columns)
+    dtypes = {c: COLUMN_DTYPES[c] for c in columns if c in COLUMN_DTYPES}
+    statement = select_columns(table_name, columns, engine, order_by=order_by)
+
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=chunk_rows).execute(statement)
+        for rows in result.partitions():
+            yield pd.DataFrame.from_records(rows, columns=columns).astype(dtypes, copy=False)
@@ -0,0 +1,167 @@
+# db.py
+
+import os
+import re
+import threading
+from pathlib import Path
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, column, func, inspect, select, table
+from sqlalchemy.engine import make_url
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+if not DATABASE_URL:
+    raise ValueError("DATABASE_URL not set in environment variables")
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+MATERIAL_TABLE = "material"
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+
+
+# ==========================================================
+# 1️⃣ ENGINE (one pool per process)
+# ==========================================================
+def create_pooled_engine(url=DATABASE_URL):
+    """
+    Engine with the DB_POOL_* settings. In-memory SQLite has a
+    single-connection pool, so only pre-ping / recycle apply there.
+    """
+    options = {
+        "pool_pre_ping": POOL_PRE_PING,
+        "pool_recycle": POOL_RECYCLE
+    }
+
+    parsed = make_url(url)
+    in_memory = parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+    if not in_memory:
+        options.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT
+        )
+
+    return create_engine(url, **options)
+
+
+# Shared by the web tier (ml.ranking) and training (data.py)
+engine = create_pooled_engine()
+
+
+def dispose_after_fork():
+    # Connections opened by the parent must not be reused across processes
+    engine.dispose(close=False)
+
+
+def pool_stats(bind=None):
+    """Connection pool counters for health / metrics endpoints."""
+    pool = (bind or engine).pool
+    stats = {"pool": type(pool).__name__}
+
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+
+    stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+    return stats
+
+
+# ==========================================================
+# 2️⃣ VALIDATED IDENTIFIERS
+# ==========================================================
+_columns_cache = {}
+_columns_lock = threading.Lock()
+
+
+def identifier(name):
+    """Table / column names cannot be bound parameters → validate them."""
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+
+def table_columns(table_name, bind=None, refresh=False):
+    """Column names of `table_name` (reflected once per engine)."""
+    bind = bind or engine
+    key = (str(bind.url), identifier(table_name))
+
+    with _columns_lock:
+        if refresh or key not in _columns_cache:
+            _columns_cache[key] = [
+                c["name"] for c in inspect(bind).get_columns(table_name)
+            ]
+        return _columns_cache[key]
+
+
+def _table(table_name, columns, bind):
+    """
+    Lightweight table construct for `columns`. Every name is validated
+    and must exist in the table; SQLAlchemy quotes them when compiling.
+    """
+    available = set(table_columns(table_name, bind))
+    missing = [c for c in columns if c not in available]
+    if missing:
+        available = set(table_columns(table_name, bind, refresh=True))
+        missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"Unknown column(s) in {table_name}: {missing}")
+
+    return table(table_name, *(column(identifier(c)) for c in columns))
+
+
+# ==========================================================
+# 3️⃣ QUERIES
+# ==========================================================
+def select_columns(table_name, columns, bind=None, after=None, order_by=None):
+    """
+    SELECT <columns> FROM <table_name> as a SQLAlchemy statement.
+    after=(column, value) adds WHERE column > :value (bound);
+    order_by names the sort column.
+    """
+    columns = list(columns)
+    extra = [c for c in (after[0] if after else None, order_by) if c and c not in columns]
+    t = _table(table_name, columns + extra, bind or engine)
+
+    statement = select(*(t.c[c] for c in columns))
+    if after:
+        statement = statement.where(t.c[after[0]] > after[1])
+    if order_by:
+        statement = statement.order_by(t.c[order_by])
+    return statement
+
+
+def select_aggregates(table_name, counts=True, sums=(), maxes=(), bind=None, after=None):
+    """SELECT COUNT(*), SUM(..), MAX(..) FROM <table_name> — one row."""
+    names = [*sums, *maxes]
+    if after and after[0] not in names:
+        names.append(after[0])
+    t = _table(table_name, names, bind or engine)
+
+    parts = [func.count()] if counts else []
+    parts += [func.sum(t.c[c]) for c in sums]
+    parts += [func.max(t.c[c]) for c in maxes]
+
+    statement = select(*parts).select_from(t)
+    if after:
+        statement = statement.where(t.c[after[0]] > after[1])
+    return statement
+
+
+def read_frame(table_name, columns, bind=None):
+    """Load only `columns` of `table_name` into a DataFrame."""
+    bind = bind or engine
+    with bind.connect() as conn:
+        return pd.read_sql(select_columns(table_name, columns, bind), conn)
@@ -3,30 +3,36 @@
 import io
 from datetime import datetime
 from flask import send_file, jsonify
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from openpyxl import Workbook
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from pytz import timezone
 import pandas as pd
-import analytics
+
+# ReportLab, matplotlib and openpyxl are imported inside the export
+# functions: most requests never export, so they stay off the startup path.
 
 
 # ======================================================
 # PDF EXPORT
 # ======================================================
-def export_pdf():
-
-    if analytics.LAST_RANKINGS is None or analytics.LAST_RANKINGS.empty:
-        return jsonify({"error": "No ranking data available to export"}), 404
+PDF_DOWNLOAD_NAME = "EcoPack_AI_Report.pdf"
+
+
+def render_pdf(rankings):
+    """
+    Build the sustainability report for a ranking DataFrame.
+    Returns the PDF as bytes (no Flask dependency, safe to run in a
+    worker process).
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from pytz import timezone
 
     # IMPORTANT → copy + take only TOP 5
-    df = analytics.LAST_RANKINGS.copy().head(5)
+    df = rankings.copy().head(5)
 
     # SAFE NUMERIC CONVERSION
     df["co2_score"] = pd.to_numeric(df["co2_score"], errors="coerce").fillna(0)
@@ -140,12 +146,18 @@ def export_pdf():
     elements.append(Paragraph("Generated by EcoPack AI System", styles["Normal"]))
 
     doc.build(elements)
-    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def export_pdf(rankings):
+
+    if rankings is None or rankings.empty:
+        return jsonify({"error": "No ranking data available to export"}), 404
 
     return send_file(
-        buffer,
+        io.BytesIO(render_pdf(rankings)),
         as_attachment=True,
-        download_name="EcoPack_AI_Report.pdf",
+        download_name=PDF_DOWNLOAD_NAME,
         mimetype='application/pdf'
     )
 
@@ -153,12 +165,13 @@ def export_pdf():
 # ======================================================
 # EXCEL EXPORT
 # ======================================================
-def export_excel():
+def export_excel(rankings):
+    from openpyxl import Workbook
 
-    if analytics.LAST_RANKINGS is None or analytics.LAST_RANKINGS.empty:
+    if rankings is None or rankings.empty:
         return jsonify({"error": "No ranking data available to export"}), 404
 
-    df = analytics.LAST_RANKINGS.copy().head(5)
+    df = rankings.copy().head(5)
 
     output = io.BytesIO()
     wb = Workbook()
@@ -0,0 +1,39 @@
+# gunicorn.conf.py
+
+import os
+
+# ==========================================================
+# WORKERS
+# ==========================================================
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+# Stored rankings and usage trends must be visible to every worker: a
+# result saved by one worker is read back (dashboard, exports) by whichever
+# gets the request, and trend ETags must not depend on the worker.
+# Runs before the app is imported, so ranking_store and usage see it.
+if workers > 1:
+    os.environ.setdefault("RANKING_STORE", "sqlite")
+    os.environ.setdefault("USAGE_STORE", "sqlite")
+
+# Import the app once in the master and load the models there (when_ready);
+# forked workers then share those pages copy-on-write. With MODEL_BACKEND=arrays
+# the models are read-only memory maps and stay shared for good.
+preload_app = True
+
+
+def post_fork(server, worker):
+    import db
+    db.dispose_after_fork()
+
+
+def when_ready(server):
+    # Models only: the DB connection and catalog are per worker
+    from ml import ranking
+    ranking.warmup(data=False)
+
+
+def post_worker_init(worker):
+    # Warm the catalog in the background; /readyz reports 503 until done
+    import threading
+    from ml import ranking
+    threading.Thread(target=ranking.warmup, daemon=True, name="warmup").start()
@@ -0,0 +1,226 @@
+# metrics.py
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached lookups (sub-ms) up to PDF rendering
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+log = logging.getLogger("ecopack")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+# ==========================================================
+# 1️⃣ METRIC TYPES
+# ==========================================================
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def samples(self):
+        """(suffix, labelnames, labelvalues, value) tuples for rendering."""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", self.labelnames, labels, value) for labels, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels):
+        """In-flight gauge: +1 while the block runs."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        # Per-bucket (non-cumulative) counts; cumulated when rendering
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(c), s, n)) for labels, (c, s, n) in self._values.items()]
+
+        names = self.labelnames + ("le",)
+        out = []
+        for labels, (counts, total, count) in items:
+            running = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                running += c
+                out.append(("_bucket", names, labels + (_number(bound),), running))
+            out.append(("_sum", self.labelnames, labels, total))
+            out.append(("_count", self.labelnames, labels, count))
+        return out
+
+
+class CallbackGauge(_Metric):
+    """
+    Value read at scrape time from `fn()` (a number, or a dict of
+    label-value tuple → number), so the hot path pays nothing.
+    """
+    kind = "gauge"
+
+    def __init__(self, name, documentation, fn, labelnames=(), kind="gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        try:
+            values = self.fn()
+        except Exception:
+            log.exception("metric callback %s failed", self.name)
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [("", self.labelnames, labels, v) for labels, v in values.items() if v is not None]
+
+
+# ==========================================================
+# 2️⃣ REGISTRY
+# ==========================================================
+class Registry:
+    """
+    Process-local metrics. Each gunicorn worker has its own registry, so
+    every series carries a `worker` label (pid) and the scraper sees
+    per-worker series instead of counters jumping between workers.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, fn, labelnames=(), kind="gauge"):
+        return self.register(CallbackGauge(name, documentation, fn, labelnames, kind))
+
+    def render(self):
+        worker = str(os.getpid())
+        lines = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, names, values, value in metric.samples():
+                labels = _labels_text(("worker",) + tuple(names), (worker,) + tuple(values))
+                lines.append(f"{metric.name}{suffix}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ==========================================================
+# 3️⃣ SHARED METRICS
+# ==========================================================
+STAGE_SECONDS = REGISTRY.histogram(
+    "ecopack_stage_seconds",
+    "Time spent per ranking / analytics / export stage.",
+    ["stage"]
+)
+
+ERRORS = REGISTRY.counter(
+    "ecopack_errors_total",
+    "Errors caught and reported, by where they happened.",
+    ["where"]
+)
+
+
+def timed(stage):
+    """Context manager: observe the block's duration as `stage`."""
+    return STAGE_SECONDS.time(stage)
+
+
+def report_error(where, message=None, exc=None):
+    """
+    Log an exception with its traceback and count it. Without `exc`,
+    call from inside an `except` block (logs the current exception).
+    """
+    ERRORS.inc(where)
+    log.error(message or f"{where} failed", exc_info=exc or True)
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+import numpy as np
+
+from db import MATERIAL_TABLE, read_frame, select_aggregates, table_columns
+from metrics import log, report_error, timed
+from ml.scoring import FEATURES
+
+# =========================
+# CHANGE DETECTION
+# =========================
+FINGERPRINT_COLUMNS = FEATURES
+
+# Ranking only needs the name and the model inputs
+CATALOG_COLUMNS = ["material_name", *FEATURES]
+
+DEFAULT_POLL_SECONDS = float(os.getenv("CATALOG_POLL_SECONDS", "30"))
+
+
+# ==========================================================
+# SNAPSHOT
+# ==========================================================
+class CatalogSnapshot:
+    """Immutable view of the material table at one point in time."""
+
+    __slots__ = ("df", "fingerprint", "version", "loaded_at", "_features")
+
+    def __init__(self, df, fingerprint, version):
+        self.df = df
+        self.fingerprint = fingerprint
+        self.version = version
+        self.loaded_at = time.time()
+        self._features = None
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    @property
+    def features(self):
+        """(4, n) float64 matrix of model inputs, one contiguous row per feature."""
+        if self._features is None:
+            features = np.ascontiguousarray(self.df[FEATURES].to_numpy(dtype=float).T)
+            features.flags.writeable = False
+            self._features = features
+        return self._features
+
+
+# ==========================================================
+# RESIDENT MATERIAL CATALOG
+# ==========================================================
+class MaterialCatalog:
+    """
+    Keeps the material table in memory and reloads it in the background.
+
+    Change detection runs a cheap aggregate query (row count plus
+    MAX(updated_at) when the table has that column, otherwise sums of
+    the model input columns). Readers always get the last complete
+    snapshot, so a reload never blocks ranking requests; `prepare` runs
+    on a new snapshot before it is published, in the poller thread.
+    """
+
+    def __init__(
+        self,
+        engine,
+        table=MATERIAL_TABLE,
+        columns=CATALOG_COLUMNS,
+        poll_interval=DEFAULT_POLL_SECONDS,
+        prepare=None
+    ):
+        self.engine = engine
+        self.table = table
+        self.columns = list(columns)
+        self.poll_interval = poll_interval
+        # prepare(snapshot): precompute what requests need before it is published
+        self.prepare = prepare
+
+        self._snapshot = None
+        self._version = 0
+        self._fingerprint_sql = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._poller = None
+        self._pid = None
+
+    # ------------------------------------------------------
+    def _build_fingerprint_sql(self):
+        columns = set(table_columns(self.table, self.engine))
+
+        if "updated_at" in columns:
+            return select_aggregates(self.table, maxes=["updated_at"], bind=self.engine)
+
+        return select_aggregates(
+            self.table,
+            sums=[c for c in FINGERPRINT_COLUMNS if c in columns],
+            maxes=["material_id"] if "material_id" in columns else [],
+            bind=self.engine
+        )
+
+    def fingerprint(self):
+        if self._fingerprint_sql is None:
+            self._fingerprint_sql = self._build_fingerprint_sql()
+
+        with self.engine.connect() as conn:
+            row = conn.execute(self._fingerprint_sql).one()
+        return tuple(str(v) for v in row)
+
+    # ------------------------------------------------------
+    def refresh(self, force=False):
+        """
+        Reload the table if its fingerprint changed.
+        Returns True when a new snapshot was published.
+        """
+        with self._load_lock:
+            fingerprint = self.fingerprint()
+
+            current = self._snapshot
+            if not force and current is not None and current.fingerprint == fingerprint:
+                return False
+
+            with timed("db_read"):
+                df = read_frame(self.table, self.columns, self.engine)
+
+            self._version += 1
+            version = self._version
+            snapshot = CatalogSnapshot(df, fingerprint, version)
+
+            # Requests keep reading the current snapshot meanwhile
+            self._prepare(snapshot)
+            self._snapshot = snapshot
+
+        log.info("material catalog loaded: %d rows (v%d)", len(df), version)
+        return True
+
+    def _prepare(self, snapshot):
+        if self.prepare is None or snapshot.empty:
+            return
+        try:
+            self.prepare(snapshot)
+        except Exception:
+            # Published anyway: requests then build what is missing
+            report_error("catalog_prepare")
+
+    def snapshot(self):
+        """Return the current snapshot, loading it on first use."""
+        self._ensure_poller()
+
+        if self._snapshot is None:
+            self.refresh()
+        return self._snapshot
+
+    def current(self):
+        """Loaded snapshot or None; never touches the database."""
+        return self._snapshot
+
+    # ------------------------------------------------------
+    def _ensure_poller(self):
+        # Threads do not survive fork → start one per worker process
+        if self._pid == os.getpid() or self.poll_interval <= 0:
+            return
+
+        self._pid = os.getpid()
+        self._stop.clear()
+        self._poller = threading.Thread(
+            target=self._poll_loop,
+            name="material-catalog-poller",
+            daemon=True
+        )
+        self._poller.start()
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                # Unchanged table → re-prepare (a no-op unless the models
+                # were reloaded), so requests do not pay for it either
+                if not self.refresh() and self._snapshot is not None:
+                    self._prepare(self._snapshot)
+            except Exception:
+                report_error("catalog_refresh")
+
+    def stop(self):
+        self._stop.set()
+        self._pid = None
@@ -0,0 +1,268 @@
+"""
+Compression of the cost RandomForest: find the smallest model whose
+hold-out MAE stays within a relative tolerance of the full forest.
+
+Candidates
+- sub-ensembles: trees are ordered greedily so that the mean of the
+  first k best reproduces the full forest's predictions on the training
+  rows (no labels involved, so the hold-out stays unseen); every prefix
+  size in SUBSET_SIZES is a candidate.
+- distilled forests: small, depth-limited forests fitted to the full
+  forest's predictions on the training rows (DISTILL_GRID).
+
+Every candidate is reported with its size (pickle and array bundle),
+latency (library and array engine, 1 row and a batch) and hold-out
+MAE / RMSE / R2. The smallest one within tolerance is saved as
+COMPACT_FILES next to the full model, published as a new model set
+(ml.model_store); the server loads it with COMPACT_COST_MODEL=1, as
+long as the sha256 of the full model recorded in REPORT_FILE still
+matches (otherwise the full model is used).
+
+    python -m ml.compress --tolerance 0.02
+    python -m ml.compress --dry-run
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ml.model_store import activate_release, current_model_dir, file_digest, new_release
+from ml.tree_engine import MODEL_DIR, export_random_forest
+
+COMPACT_FILES = {
+    "library": "rf_cost_model.compact.pkl",
+    "arrays": "rf_cost_model.compact.arrays"
+}
+REPORT_FILE = "compression_report.json"
+FULL_MODEL_FILE = "rf_cost_model.pkl"
+# REPORT_FILE key: sha256 of the full model the compact one was derived from
+SOURCE_KEY = "full_model_sha256"
+
+MAE_TOLERANCE = float(os.getenv("COMPRESS_MAE_TOLERANCE", "0.02"))
+
+SUBSET_SIZES = [5, 10, 20, 30, 50, 75, 100, 150, 200, 300]
+DISTILL_GRID = [(20, 6), (50, 6), (50, 8), (100, 8), (100, 10)]
+
+# Training rows used to order the trees (greedy pass is trees² × rows)
+# and to distill
+ORDER_ROWS = 5000
+DISTILL_ROWS = 50000
+BATCH_ROWS = 1000
+
+
+# ==========================================================
+# 1️⃣ SUB-ENSEMBLES
+# ==========================================================
+def tree_predictions(model, X):
+    """(n_trees, n_rows) matrix of per-tree predictions."""
+    X = np.asarray(X, dtype=np.float32)
+    return np.stack([tree.predict(X) for tree in model.estimators_])
+
+
+def greedy_order(P, target, max_trees):
+    """
+    First `max_trees` trees, ordered so every prefix mean tracks `target`
+    as closely as possible (forward selection on mean absolute error).
+    """
+    used = np.zeros(P.shape[0], dtype=bool)
+    total = np.zeros(P.shape[1])
+    order = []
+
+    for k in range(1, min(max_trees, P.shape[0]) + 1):
+        err = np.abs((total + P) / k - target).mean(axis=1)
+        err[used] = np.inf
+        best = int(np.argmin(err))
+        order.append(best)
+        used[best] = True
+        total += P[best]
+
+    return np.array(order)
+
+
+def sub_ensemble(model, trees):
+    """Copy of a fitted RandomForest restricted to `trees` (indices)."""
+    compact = copy.copy(model)
+    compact.estimators_ = [model.estimators_[i] for i in trees]
+    compact.n_estimators = len(trees)
+    return compact
+
+
+# ==========================================================
+# 2️⃣ DISTILLATION
+# ==========================================================
+def distill(model, X_train, n_estimators, max_depth):
+    from sklearn.ensemble import RandomForestRegressor
+
+    student = RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        random_state=42,
+        n_jobs=1
+    )
+    return student.fit(X_train, model.predict(X_train))
+
+
+# ==========================================================
+# 3️⃣ MEASUREMENTS
+# ==========================================================
+def _latency_ms(predict, X, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def measure(name, model, X_test, y_test, X_batch):
+    from ml.train_model import regression_metrics
+
+    arrays = export_random_forest(model)
+    X_one = X_batch.iloc[:1]
+    X_batch_np = X_batch.to_numpy(dtype=float)
+
+    return {
+        "name": name,
+        "n_trees": len(model.estimators_),
+        "max_depth": int(max(tree.get_depth() for tree in model.estimators_)),
+        "pickle_bytes": len(pickle.dumps(model)),
+        "array_bytes": int(arrays.nbytes),
+        "latency_ms": {
+            "library_1": _latency_ms(model.predict, X_one),
+            f"library_{len(X_batch)}": _latency_ms(model.predict, X_batch),
+            "arrays_1": _latency_ms(arrays.predict, X_batch_np[:1]),
+            f"arrays_{len(X_batch)}": _latency_ms(arrays.predict, X_batch_np)
+        },
+        **regression_metrics(y_test, model.predict(X_test))
+    }
+
+
+# ==========================================================
+# 4️⃣ COMPRESSION STEP
+# ==========================================================
+def compress(model_dir=MODEL_DIR, tolerance=MAE_TOLERANCE, chunk_rows=None, save=True):
+    """Evaluate every candidate, save the smallest acceptable one. Returns the report."""
+    from ml.train_model import TARGETS, load_split, write_atomic
+
+    model_dir = Path(model_dir)
+    full_path = current_model_dir(model_dir) / FULL_MODEL_FILE
+    source = file_digest(full_path)
+    with open(full_path, "rb") as f:
+        full = pickle.load(f)
+
+    # Same seeded, key-ordered split as training → the hold-out is unseen
+    split, _ = load_split(chunk_rows)
+    X_train = split.frame(split.X_train)
+    X_test = split.frame(split.X_test)
+    y_test = split.target(split.y_test, TARGETS["cost"])
+
+    def sample(n):
+        rows = np.random.default_rng(0).choice(len(X_train), min(len(X_train), n), replace=False)
+        return X_train.iloc[np.sort(rows)]
+
+    X_order = sample(ORDER_ROWS)
+    X_distill = sample(DISTILL_ROWS)
+    X_batch = X_test.iloc[np.arange(BATCH_ROWS) % len(X_test)]
+
+    reference = measure("full", full, X_test, y_test, X_batch)
+    limit = reference["mae"] * (1 + tolerance)
+    results = [reference]
+
+    order = greedy_order(tree_predictions(full, X_order), full.predict(X_order), max(SUBSET_SIZES))
+    models = {"full": full}
+
+    for k in SUBSET_SIZES:
+        if k >= len(full.estimators_):
+            break
+        name = f"subset_{k}"
+        models[name] = sub_ensemble(full, order[:k])
+        results.append(measure(name, models[name], X_test, y_test, X_batch))
+
+    for n_estimators, max_depth in DISTILL_GRID:
+        name = f"distilled_{n_estimators}x{max_depth}"
+        models[name] = distill(full, X_distill, n_estimators, max_depth)
+        results.append(measure(name, models[name], X_test, y_test, X_batch))
+
+    for r in results:
+        r["mae_change"] = (r["mae"] - reference["mae"]) / reference["mae"] if reference["mae"] else 0.0
+        r["accepted"] = r["mae"] <= limit
+
+    accepted = [r for r in results if r["accepted"] and r["name"] != "full"]
+    best = min(accepted, key=lambda r: (r["array_bytes"], r["mae"])) if accepted else reference
+
+    print(f"{'candidate':<18} {'trees':>5} {'depth':>5} {'arrays KB':>10} {'batch ms':>9} "
+          f"{'MAE':>9} {'Δ MAE':>7}")
+    for r in results:
+        batch_ms = r["latency_ms"][f"arrays_{BATCH_ROWS}"]
+        mark = "→" if r is best else ("✓" if r["accepted"] else " ")
+        print(f"{mark}{r['name']:<17} {r['n_trees']:>5} {r['max_depth']:>5} "
+              f"{r['array_bytes'] / 1024:>10.0f} {batch_ms:>9.2f} {r['mae']:>9.4f} {r['mae_change']:>+7.1%}")
+
+    report = {
+        "tolerance": tolerance,
+        "mae_limit": limit,
+        "selected": best["name"],
+        SOURCE_KEY: source,
+        "candidates": results
+    }
+
+    if save:
+        if best is reference:
+            print("⚠️ No candidate within tolerance; compact model = full model")
+        compact = models[best["name"]]
+        release = new_release(model_dir, base=True, exclude=(*COMPACT_FILES.values(), REPORT_FILE))
+        data = pickle.dumps(compact)
+        write_atomic(release / COMPACT_FILES["library"], data)
+        export_random_forest(compact).save(
+            release / COMPACT_FILES["arrays"], source=hashlib.sha256(data).hexdigest()
+        )
+        write_atomic(release / REPORT_FILE, json.dumps(report, indent=2).encode())
+        activate_release(model_dir, release)
+        print(f"✅ COMPACT COST MODEL SAVED: {best['name']} ({best['n_trees']} trees)")
+
+    return report
+
+
+def compact_available(model_dir=MODEL_DIR, backend="library"):
+    return (Path(model_dir) / COMPACT_FILES[backend]).exists()
+
+
+def compact_matches(model_dir=MODEL_DIR):
+    """
+    False when the compact model was derived from another full model
+    than the one next to it (retrained since). Reports that predate the
+    recorded hash are trusted.
+    """
+    model_dir = Path(model_dir)
+    try:
+        recorded = json.loads((model_dir / REPORT_FILE).read_text()).get(SOURCE_KEY)
+    except (OSError, ValueError):
+        recorded = None
+    return recorded is None or recorded == file_digest(model_dir / FULL_MODEL_FILE)
+
+
+# ==========================================================
+# CLI
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, default=MAE_TOLERANCE,
+                        help="max relative hold-out MAE increase vs. the full forest")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="report only, save nothing")
+    args = parser.parse_args(argv)
+
+    compress(args.model_dir, args.tolerance, args.chunk_rows, save=not args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import threading
+import time
+
+import numpy as np
+
+from ml.scoring import BIODEGRADABILITY, RECYCLABILITY, STRENGTH, WEIGHT_CAPACITY
+from ml.snapshot_states import SnapshotStates
+
+# Request parameter → (column, bound side). Columns are feature rows of
+# the snapshot or the "cost" / "co2" predictions
+CONSTRAINTS = {
+    "max_cost": ("cost", "max"),
+    "max_co2": ("co2", "max"),
+    "min_recyclability": (RECYCLABILITY, "min"),
+    "min_biodegradability": (BIODEGRADABILITY, "min"),
+    "min_weight_capacity": (WEIGHT_CAPACITY, "min"),
+}
+
+PREDICTION_COLUMNS = ("cost", "co2")
+
+# When even the most selective bound keeps more than this share of the
+# catalog, one vectorized mask over the columns beats gathering + sorting
+# the slice (crossover measured around 12% at 1M rows)
+SCAN_FRACTION = 0.1
+
+
+# ==========================================================
+# 1️⃣ REQUEST PARAMETERS
+# ==========================================================
+def parse_constraints(params):
+    """
+    Hard constraints from request parameters (JSON body or query string)
+    → canonical ((name, bound), ...) sorted by name, or None when there
+    are none. Missing / null / empty values are ignored. Raises
+    ValueError for bounds that are not finite numbers.
+    """
+    constraints = []
+    for name in sorted(CONSTRAINTS):
+        value = params.get(name)
+        if value is None or value == "":
+            continue
+        try:
+            bound = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number") from None
+        if not np.isfinite(bound):
+            raise ValueError(f"{name} must be finite")
+        constraints.append((name, bound))
+
+    return tuple(constraints) or None
+
+
+# ==========================================================
+# 2️⃣ PRESORTED COLUMNS
+# ==========================================================
+class SortedColumn:
+    """
+    One column in ascending order (NaN last). A bound maps to a
+    contiguous slice of `order` with one binary search.
+    """
+
+    __slots__ = ("order", "values", "valid")
+
+    def __init__(self, values):
+        # Ties may come out in any order: query results are re-sorted by row
+        order = np.argsort(values)
+        if len(values) < np.iinfo(np.int32).max:
+            order = order.astype(np.int32)
+        self.order = order
+        self.values = values[order]
+        # NaN meets no bound
+        self.valid = len(values) - int(np.isnan(self.values).sum())
+
+    def at_most(self, bound):
+        return self.order[:np.searchsorted(self.values[:self.valid], bound, side="right")]
+
+    def at_least(self, bound):
+        return self.order[np.searchsorted(self.values[:self.valid], bound, side="left"):self.valid]
+
+
+class _Columns:
+    """Sorted columns and tier rows of one (snapshot, predictions) pair."""
+
+    __slots__ = ("snapshot", "predictions", "prediction_values", "columns", "tiers")
+
+    def __init__(self, snapshot, predictions, previous=None):
+        self.snapshot = snapshot
+        self.predictions = predictions
+        # float64 like the features, so bounds compare the same way in
+        # the sorted columns and in the mask
+        self.prediction_values = {
+            column: np.asarray(values, dtype=float)
+            for column, values in zip(PREDICTION_COLUMNS, predictions)
+        }
+        self.columns = {}
+        self.tiers = {}
+
+        # Same snapshot, new predictions (model reload) → keep the features
+        if previous is not None and previous.snapshot is snapshot:
+            self.columns = {
+                column: sorted_column for column, sorted_column in previous.columns.items()
+                if column not in PREDICTION_COLUMNS
+            }
+            self.tiers = dict(previous.tiers)
+
+    def values(self, column):
+        if column in PREDICTION_COLUMNS:
+            return self.prediction_values[column]
+        return self.snapshot.features[column]
+
+
+# ==========================================================
+# 3️⃣ PER-SNAPSHOT INDEX
+# ==========================================================
+class ConstraintIndex:
+    """
+    Presorted feature / prediction columns of the current catalog
+    snapshot, for the fragility tier and the hard constraints.
+
+    Every bound is a binary search into its column, giving the rows
+    that meet it as one slice. The smallest slice is then checked
+    against the other bounds on those rows only, so a query costs
+    O(log n) per bound plus the size of the most selective one instead
+    of a scan over the catalog. Broad queries (SCAN_FRACTION) use a
+    plain mask instead. Tier rows without constraints are cached per
+    tier.
+
+    Columns are sorted lazily on first use (or by warm()) and kept per
+    snapshot (SnapshotStates), so the next snapshot can be indexed while
+    the current one is still queried; only the cost / co2 columns are
+    re-sorted when the predictions change (model reload).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = SnapshotStates()
+
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.queries = 0
+        self.scans = 0
+        self.rows_checked = 0
+
+    # ------------------------------------------------------
+    def _state(self, snapshot, predictions):
+        # Keyed on the objects, not the version number: snapshots built
+        # outside the catalog (benchmarks, tests) can share a version
+        with self._lock:
+            state = self._states.get(snapshot, predictions)
+            if state is None:
+                state = self._states.add(_Columns(snapshot, predictions, self._states.latest()))
+        return state
+
+    def _column(self, state, column):
+        with self._lock:
+            sorted_column = state.columns.get(column)
+            if sorted_column is None:
+                start = time.perf_counter()
+                sorted_column = state.columns[column] = SortedColumn(state.values(column))
+                self.builds += 1
+                self.build_seconds = time.perf_counter() - start
+        return sorted_column
+
+    # ------------------------------------------------------
+    def candidates(self, snapshot, predictions, tier, constraints=None):
+        """
+        Ascending snapshot positions of the rows with strength >= tier
+        that meet every (name, bound) constraint. Read-only array.
+        """
+        self.queries += 1
+        state = self._state(snapshot, predictions)
+
+        if not constraints:
+            rows = state.tiers.get(tier)
+            if rows is None:
+                rows = np.flatnonzero(snapshot.features[STRENGTH] >= tier)
+                rows.flags.writeable = False
+                state.tiers[tier] = rows
+            return rows
+
+        bounds = [(STRENGTH, "min", tier)]
+        bounds += [(*CONSTRAINTS[name], bound) for name, bound in constraints]
+
+        slices = []
+        for column, side, bound in bounds:
+            sorted_column = self._column(state, column)
+            rows = sorted_column.at_most(bound) if side == "max" else sorted_column.at_least(bound)
+            slices.append((rows.size, column, side, bound, rows))
+
+        # Most selective bound first; the others are checked on its rows
+        slices.sort(key=lambda s: s[0])
+        rows = slices[0][4]
+
+        if rows.size > SCAN_FRACTION * len(snapshot.df):
+            self.scans += 1
+            mask = None
+            for _, column, side, bound, _ in slices:
+                values = state.values(column)
+                met = values <= bound if side == "max" else values >= bound
+                mask = met if mask is None else np.logical_and(mask, met, out=mask)
+            rows = np.flatnonzero(mask)
+            rows.flags.writeable = False
+            return rows
+
+        self.rows_checked += rows.size
+
+        for _, column, side, bound, _ in slices[1:]:
+            if rows.size == 0:
+                break
+            values = state.values(column)[rows]
+            rows = rows[values <= bound] if side == "max" else rows[values >= bound]
+
+        rows = np.sort(rows).astype(np.int64)
+        rows.flags.writeable = False
+        return rows
+
+    def warm(self, snapshot, predictions):
+        """Sort every column up front."""
+        state = self._state(snapshot, predictions)
+        for column in (STRENGTH, *{column for column, _ in CONSTRAINTS.values()}):
+            self._column(state, column)
+
+    def invalidate(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        latest = self._states.latest()
+        return {
+            "snapshots": len(self._states),
+            "columns": len(latest.columns) if latest is not None else 0,
+            "builds": self.builds,
+            "last_build_seconds": round(self.build_seconds, 4),
+            "queries": self.queries,
+            "scans": self.scans,
+            "rows_checked": self.rows_checked
+        }
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+# ==========================================================
+# STREAMING TRAIN / TEST SPLIT
+# ==========================================================
+class SplitData:
+    """Train / test arrays built by stream_split()."""
+
+    __slots__ = (
+        "X_train", "X_test", "y_train", "y_test",
+        "key_train", "key_test", "feature_names", "target_names"
+    )
+
+    def __init__(self, X_train, X_test, y_train, y_test, feature_names, target_names,
+                 key_train=None, key_test=None):
+        self.X_train = X_train
+        self.X_test = X_test
+        self.y_train = y_train
+        self.y_test = y_test
+        self.key_train = key_train
+        self.key_test = key_test
+        self.feature_names = list(feature_names)
+        self.target_names = list(target_names)
+
+    def frame(self, X):
+        """Wrap a feature array as a DataFrame (no copy) so models keep feature names."""
+        return pd.DataFrame(X, columns=self.feature_names, copy=False)
+
+    def target(self, y, name):
+        return y[:, self.target_names.index(name)]
+
+
+def stream_split(
+    chunks,
+    n_rows,
+    feature_names,
+    target_names,
+    test_size=0.2,
+    random_state=42,
+    scaler=None,
+    key_name=None
+):
+    """
+    Build a train / test split from an iterator of DataFrame chunks.
+
+    Every row is assigned to the test set with probability `test_size`
+    (seeded, so reruns over the same stream give the same split). All
+    rows go into one preallocated (n_rows, k) buffer: train rows fill it
+    from the front, test rows from the back, so the table is never held
+    twice. `scaler.partial_fit` sees each chunk's train rows as they
+    arrive. Rows beyond `n_rows` (table grew while streaming) are dropped.
+
+    With `key_name`, that column (e.g. the primary key) is kept per row
+    in key_train / key_test. Streamed in key order, a row keeps its
+    train / test assignment when rows are appended later.
+    """
+    rng = np.random.default_rng(random_state)
+    n_features = len(feature_names)
+
+    X = np.empty((n_rows, n_features), dtype=np.float64)
+    y = np.empty((n_rows, len(target_names)), dtype=np.float64)
+    keys = np.empty(n_rows, dtype=np.int64) if key_name else None
+    front = 0
+    back = n_rows
+
+    for chunk in chunks:
+        room = back - front
+        if room <= 0:
+            break
+        chunk = chunk.iloc[:room]
+
+        X_chunk = chunk[feature_names].to_numpy(dtype=np.float64)
+        y_chunk = chunk[target_names].to_numpy(dtype=np.float64)
+        is_test = rng.random(len(chunk)) < test_size
+        is_train = ~is_test
+
+        n_train = int(is_train.sum())
+        X[front:front + n_train] = X_chunk[is_train]
+        y[front:front + n_train] = y_chunk[is_train]
+        if keys is not None:
+            key_chunk = chunk[key_name].to_numpy(dtype=np.int64)
+            keys[front:front + n_train] = key_chunk[is_train]
+        front += n_train
+
+        n_test = len(chunk) - n_train
+        X[back - n_test:back] = X_chunk[is_test]
+        y[back - n_test:back] = y_chunk[is_test]
+        if keys is not None:
+            keys[back - n_test:back] = key_chunk[is_test]
+        back -= n_test
+
+        if scaler is not None and n_train:
+            scaler.partial_fit(pd.DataFrame(X_chunk[is_train], columns=feature_names))
+
+    return SplitData(
+        X[:front], X[back:],
+        y[:front], y[back:],
+        feature_names, target_names,
+        None if keys is None else keys[:front],
+        None if keys is None else keys[back:]
+    )
@@ -0,0 +1,261 @@
+"""
+Incremental retraining: update the saved models with the materials
+added since the last training run instead of refitting from scratch.
+
+- cost (RandomForest): warm_start grows the forest with extra trees
+  fitted on the new train rows.
+- co2 (XGBoost): boosting continues from the saved booster on the new
+  rows, scaled with the saved scaler (the existing trees depend on it).
+
+New rows are the ones whose KEY_COLUMN is above the watermark stored in
+the last training report. The table is streamed in key order, so old
+rows keep their train / test side and the hold-out never contains rows
+a model was trained on. Each updated model's hold-out MAE is compared
+with that of its last full training (kept in the release under
+BASELINE_DIR, so drift cannot creep in run by run), re-scored on the
+same hold-out; only a model that is more than `max_drift` (relative)
+worse, or that would grow past MAX_GROWTH times its fully trained size,
+is refitted from scratch with the same parameters. Edits to existing rows are not detected — run a full
+training for those.
+
+    python -m ml.train_model --incremental --max-drift 0.05
+"""
+import os
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ml.model_store import current_model_dir
+from ml.train_model import (
+    BASELINE_DIR,
+    DEFAULT_N_JOBS,
+    FIXED_PARAMS,
+    MODEL_DIR,
+    MODEL_FILES,
+    TARGETS,
+    StageTimer,
+    evaluate,
+    load_report,
+    load_split,
+    model_data,
+    print_metrics,
+    publish,
+    run,
+    search_and_fit,
+    watermark
+)
+
+MAX_DRIFT = float(os.getenv("INCREMENTAL_MAX_DRIFT", "0.05"))
+
+# Trees / boosting rounds added per update: proportional to the share of
+# new rows. A model that would grow past MAX_GROWTH × its fully trained
+# size (n_estimators) is refitted from scratch instead.
+MAX_GROWTH = float(os.getenv("INCREMENTAL_MAX_GROWTH", "2.0"))
+
+
+def load_saved_models(model_dir=MODEL_DIR):
+    loaded = {}
+    live = current_model_dir(model_dir)
+    for kind, name in MODEL_FILES.items():
+        with open(live / name, "rb") as f:
+            loaded[kind] = pickle.load(f)
+    scaler = loaded.pop("scaler")
+    return loaded, scaler
+
+
+def load_baseline_models(model_dir=MODEL_DIR):
+    """
+    Models of the last full training. Releases saved before these were
+    kept fall back to the live models.
+    """
+    live = current_model_dir(model_dir)
+    baseline = live / BASELINE_DIR
+    if not baseline.is_dir():
+        baseline = live
+
+    loaded = {}
+    for kind in TARGETS:
+        with open(baseline / MODEL_FILES[kind], "rb") as f:
+            loaded[kind] = pickle.load(f)
+    return loaded
+
+
+def growth(current, n_new, n_old):
+    return int(min(current, max(1, np.ceil(current * n_new / max(n_old, 1)))))
+
+
+def model_size(kind, model):
+    """Trees of the forest / boosting rounds of the booster."""
+    if kind == "co2":
+        return model.get_booster().num_boosted_rounds()
+    return model.n_estimators
+
+
+def update_forest(model, X_new, y_new, n_old):
+    """Add trees fitted on the new rows to a fitted RandomForest (in place)."""
+    added = growth(model.n_estimators, len(X_new), n_old)
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + added)
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False)
+    return model, added
+
+
+def update_booster(model, X_new, y_new, n_old):
+    """Continue boosting a fitted XGBRegressor on the new rows."""
+    from xgboost import XGBRegressor
+
+    current = model.get_booster().num_boosted_rounds()
+    added = growth(current, len(X_new), n_old)
+
+    params = model.get_params()
+    params["n_estimators"] = added
+    updated = XGBRegressor(**params).fit(X_new, y_new, xgb_model=model.get_booster())
+    updated.set_params(n_estimators=current + added)
+    return updated, added
+
+
+def relative_drift(incremental_mae, full_mae):
+    if full_mae <= 0:
+        return 0.0 if incremental_mae <= 0 else float("inf")
+    return (incremental_mae - full_mae) / full_mae
+
+
+# ==========================================================
+# PIPELINE
+# ==========================================================
+def run_incremental(
+    n_jobs=DEFAULT_N_JOBS,
+    max_drift=MAX_DRIFT,
+    model_dir=MODEL_DIR,
+    chunk_rows=None,
+    export_arrays=None,
+    save=True
+):
+    """Incremental training run; falls back to run() when there is no watermark."""
+    from data import count_material_rows
+
+    model_dir = Path(model_dir)
+    previous = load_report(model_dir) or {}
+    mark = previous.get("watermark") or {}
+    saved = all((current_model_dir(model_dir) / name).exists() for name in MODEL_FILES.values())
+
+    if mark.get("max") is None or not saved:
+        print("ℹ️ No previous training watermark → full retrain")
+        return run(n_jobs=n_jobs, model_dir=model_dir, chunk_rows=chunk_rows,
+                   export_arrays=export_arrays, save=save)
+
+    timer = StageTimer()
+    started = time.time()
+
+    with timer.stage("detect"):
+        n_new = count_material_rows(after_key=mark["max"])
+
+    if n_new == 0:
+        print(f"✅ No materials added after {mark['column']} {mark['max']}, models unchanged")
+        return previous
+    print(f"New materials since last training: {n_new}")
+
+    with timer.stage("load"):
+        split, full_scaler = load_split(chunk_rows)
+        full_data = model_data(split, full_scaler)
+        models, scaler = load_saved_models(model_dir)
+        baseline_models = load_baseline_models(model_dir)
+
+        is_new = split.key_train > mark["max"]
+        n_old = int((~is_new).sum())
+        X_new = split.frame(split.X_train[is_new])
+        y_new = {kind: split.target(split.y_train[is_new], target) for kind, target in TARGETS.items()}
+
+    searched = previous.get("search") or {}
+    params = {
+        kind: (searched.get(kind) or {}).get("params") or FIXED_PARAMS[kind]
+        for kind in TARGETS
+    }
+
+    # ================= INCREMENTAL UPDATE =================
+    update = {"cost": update_forest, "co2": update_booster}
+    X_update = {"cost": X_new, "co2": scaler.transform(X_new) if len(X_new) else X_new}
+    added = {}
+    refit = {}
+    with timer.stage("update"):
+        for kind in TARGETS:
+            size = model_size(kind, models[kind])
+            limit = MAX_GROWTH * params[kind].get("n_estimators", FIXED_PARAMS[kind]["n_estimators"])
+            if not len(X_new):
+                added[kind] = 0
+            elif size + growth(size, len(X_new), n_old) > limit:
+                refit[kind] = f"{size} trees, limit {limit:.0f}"
+            else:
+                models[kind], added[kind] = update[kind](models[kind], X_update[kind], y_new[kind], n_old)
+
+    X_test = split.frame(split.X_test)
+    holdout = {
+        "cost": (None, None, X_test, full_data["cost"][3]),
+        "co2": (None, None, scaler.transform(X_test), full_data["co2"][3])
+    }
+    with timer.stage("evaluate"):
+        incremental_metrics = evaluate({kind: models[kind] for kind in added}, holdout)
+        # Same hold-out for the reference. The saved scaler is the one the
+        # baseline CO2 model was fitted on (a CO2 refit replaces both)
+        baseline_metrics = evaluate({kind: baseline_models[kind] for kind in added}, holdout)
+
+    # ================= DRIFT CHECK =================
+    drifts = {}
+    for kind in added:
+        drifts[kind] = relative_drift(incremental_metrics[kind]["mae"], baseline_metrics[kind]["mae"])
+        if drifts[kind] > max_drift:
+            refit[kind] = f"drift {drifts[kind]:+.1%}"
+
+    # ================= FULL RETRAIN (drifted models only) =================
+    full_metrics = {}
+    if refit:
+        refit_data = {kind: full_data[kind] for kind in refit}
+        full_models, _ = search_and_fit(refit_data, timer, n_jobs=n_jobs, params=params)
+        with timer.stage("evaluate_full"):
+            full_metrics = evaluate(full_models, refit_data)
+
+    chosen = {}
+    decisions = {}
+    for kind in TARGETS:
+        use_incremental = kind not in refit
+        chosen[kind] = models[kind] if use_incremental else full_models[kind]
+        decisions[kind] = {
+            "used": "incremental" if use_incremental else "full",
+            "reason": refit.get(kind),
+            "added": added.get(kind, 0) if use_incremental else 0,
+            "size": model_size(kind, chosen[kind]),
+            "mae_incremental": incremental_metrics.get(kind, {}).get("mae"),
+            "mae_baseline": baseline_metrics.get(kind, {}).get("mae"),
+            "drift": drifts.get(kind)
+        }
+        if use_incremental:
+            print(f"✅ {kind.upper()}: incremental MAE {decisions[kind]['mae_incremental']:.4f} "
+                  f"vs last full {decisions[kind]['mae_baseline']:.4f} "
+                  f"(drift {drifts.get(kind, 0.0):+.1%}), {decisions[kind]['size']} trees")
+        else:
+            print(f"⚠️ {kind.upper()}: {refit[kind]} → full retrain, MAE {full_metrics[kind]['mae']:.4f}")
+
+    # The CO2 model was boosted on the saved scaler's output
+    chosen_scaler = scaler if decisions["co2"]["used"] == "incremental" else full_scaler
+    metrics = {
+        kind: incremental_metrics[kind] if decisions[kind]["used"] == "incremental" else full_metrics[kind]
+        for kind in TARGETS
+    }
+    # A refitted model becomes the reference of the next runs
+    baseline = {kind: full_models[kind] if kind in refit else baseline_models[kind] for kind in TARGETS}
+    print_metrics(metrics)
+
+    report = {
+        "started_at": started,
+        "mode": "incremental",
+        "max_drift": max_drift,
+        "new_rows": n_new,
+        "rows": {"train": len(split.X_train), "test": len(split.X_test)},
+        "search": {kind: {"params": params[kind]} for kind in TARGETS},
+        "incremental": decisions,
+        "metrics": metrics,
+        "watermark": watermark(split)
+    }
+    return publish(chosen, chosen_scaler, report, timer, model_dir, export_arrays, save, baseline)
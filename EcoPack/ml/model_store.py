@@ -0,0 +1,96 @@
+"""
+Versioned model sets.
+
+Every save writes a complete set (pickles, array bundles, compact model)
+into its own directory under models/releases/, then points models/CURRENT
+at it with one atomic rename. Readers resolve CURRENT once and load every
+file from that directory, so they never see a mix of two training runs;
+the server watches CURRENT to hot-reload. Without CURRENT the files in
+models/ itself are used (the layout shipped with the repo).
+"""
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+
+CURRENT_FILE = "CURRENT"
+RELEASES_DIR = "releases"
+
+# The live release + the previous one (workers may still map its arrays)
+KEEP_RELEASES = 2
+
+
+def write_atomic(path, data):
+    """Write to a temp file in the same directory, then rename over `path`."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def file_digest(path):
+    """sha256 of a file (ties derived files to the model they came from)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def link_file(src, dst):
+    """Hard link `src` to `dst`, copying where the filesystem does not allow it."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def current_model_dir(model_dir):
+    """Directory of the live model set."""
+    model_dir = Path(model_dir)
+    try:
+        name = (model_dir / CURRENT_FILE).read_text().strip()
+    except OSError:
+        return model_dir
+    return model_dir / RELEASES_DIR / name
+
+
+def new_release(model_dir, base=False, exclude=()):
+    """
+    Empty release directory, not live until activate_release(). With
+    `base`, it starts as a copy of the live set (hard links where the
+    filesystem allows) minus the `exclude` names, for tools that add or
+    replace single files. Linked files are shared with the live set:
+    replace them (write_atomic), never write into them.
+    """
+    model_dir = Path(model_dir)
+    release = model_dir / RELEASES_DIR / f"{time.time_ns()}-{os.getpid()}"
+
+    if not base:
+        release.mkdir(parents=True)
+        return release
+
+    shutil.copytree(
+        current_model_dir(model_dir),
+        release,
+        ignore=shutil.ignore_patterns(RELEASES_DIR, CURRENT_FILE, ".*", *exclude),
+        copy_function=link_file
+    )
+    return release
+
+
+def activate_release(model_dir, release):
+    """Make `release` the live set, then drop releases older than KEEP_RELEASES."""
+    model_dir = Path(model_dir)
+    release = Path(release)
+    write_atomic(model_dir / CURRENT_FILE, release.name.encode())
+
+    # Names start with the creation time in ns
+    releases = sorted(p for p in (model_dir / RELEASES_DIR).iterdir() if p.is_dir())
+    for old in releases[:-KEEP_RELEASES]:
+        if old.name != release.name:
+            shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,349 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ml.scoring import (
+    CATEGORY_TERMS,
+    DEFAULT_MIN_STRENGTH,
+    FRAGILITY_MIN_STRENGTH,
+    EPS,
+    STRENGTH,
+    min_strength,
+    suitability_scores
+)
+from ml.snapshot_states import SnapshotStates
+
+# Any top-N with N <= SKYBAND_K is served from the index
+SKYBAND_K = int(os.getenv("PARETO_SKYBAND_K", "10"))
+
+# Rows compared per vectorized step while building a skyband; blocks
+# start small so the band (the filter for later blocks) fills early
+FIRST_BLOCK_ROWS = 64
+BLOCK_ROWS = 2048
+FIRST_BAND_CHUNK = 16
+
+# A row only dominates another when it is better by more than this
+# share of the tier's range in at least one objective. Smaller
+# differences can vanish in the floating-point score, leaving the
+# dominated row tied with its dominator and ahead on catalog order.
+DOMINANCE_TOLERANCE = 1e-5
+# Incremental rebuilds keep the tolerance in raw units; once the range
+# has grown so much that it falls below this share, rebuild the tier
+MIN_DOMINANCE_TOLERANCE = 2e-6
+
+# The index is exact for weights >= this: weight × tolerance stays far
+# above the rounding error of a score (float32 CO2 term included)
+MIN_EXACT_WEIGHT = 1e-6
+
+
+# ==========================================================
+# 1️⃣ K-SKYBAND
+# ==========================================================
+def _dominators(band, points, tolerance):
+    """(len(band), len(points)) bool: band[i] dominates points[j] (all objectives minimized)."""
+    le = np.ones((len(band), len(points)), dtype=bool)
+    lt = np.zeros_like(le)
+    for d in range(points.shape[1]):
+        b = band[:, d, None]
+        p = points[None, :, d]
+        le &= b <= p
+        lt |= b < p - tolerance[d]
+    return le & lt
+
+
+def skyband(points, k, tolerance=0.0):
+    """
+    Indices (ascending) of the rows of `points` dominated by fewer than
+    `k` other rows, all objectives minimized. k=1 is the Pareto skyline.
+    A dominator must be better by more than `tolerance` (scalar or per
+    objective) in at least one objective.
+
+    Any positive weighting of the objectives ranks its top k inside the
+    k-skyband (for float scores, see DOMINANCE_TOLERANCE). Rows are
+    visited best-sum first in blocks, so a row's dominators come before
+    it or in its block. A row is kept when fewer
+    than k rows among the kept ones and its block dominate it: a dropped
+    dominator is itself dominated by k kept rows, which then dominate
+    this row too, so the count never has to look at dropped rows.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), points.shape[1:])
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    lo = points.min(axis=0)
+    span = points.max(axis=0) - lo
+    span[span == 0] = 1.0
+    total = ((points - lo) / span).sum(axis=1)
+    # Sum, then lexicographic within equal sums: a dominator always sorts
+    # strictly first
+    order = np.argsort(total, kind="stable")
+    sorted_total = total[order]
+    tied = np.flatnonzero(sorted_total[1:] == sorted_total[:-1])
+    if tied.size:
+        pos = np.union1d(tied, tied + 1)
+        sub = order[pos]
+        order[pos] = sub[np.lexsort((*points[sub].T[::-1], total[sub]))]
+    P = points[order]
+
+    band = np.empty((0, points.shape[1]))
+    kept = []
+
+    start, size = 0, FIRST_BLOCK_ROWS
+    while start < n:
+        block = P[start:start + size]
+        counts = np.zeros(len(block), dtype=np.int64)
+        alive = np.arange(len(block))
+
+        # Strongest band members first, in growing chunks: most rows
+        # reach k dominators within the first few
+        b, chunk = 0, FIRST_BAND_CHUNK
+        while b < len(band) and alive.size:
+            counts[alive] += _dominators(band[b:b + chunk], block[alive], tolerance).sum(axis=0)
+            alive = alive[counts[alive] < k]
+            b, chunk = b + chunk, chunk * 4
+
+        # Dominators within the block: counting every surviving row (not
+        # only the kept ones) gives the same decision, since a row with k
+        # dominators has k kept dominators
+        if alive.size:
+            counts[alive] += _dominators(block[alive], block[alive], tolerance).sum(axis=0)
+            accepted = alive[counts[alive] < k]
+            band = np.concatenate([band, block[accepted]])
+            kept.append(order[start + accepted])
+        start, size = start + size, min(size * 4, BLOCK_ROWS)
+
+    if not kept:
+        return np.empty(0, dtype=np.int64)
+    return np.sort(np.concatenate(kept))
+
+
+# ==========================================================
+# 2️⃣ PER-TIER INDEX
+# ==========================================================
+def suitability_kind(product_category):
+    """Categories sharing a suitability formula share an index entry."""
+    category = (product_category or "").lower()
+    return category if category in CATEGORY_TERMS else "other"
+
+
+def row_keys(snapshot, predictions):
+    """
+    uint64 key per row from everything the ranking objectives depend on
+    (features, cost, co2), plus an occurrence number so duplicate rows
+    get distinct keys. Used to match rows across catalog snapshots.
+    """
+    cost, co2 = predictions
+    values = pd.DataFrame(snapshot.features.T)
+    values["cost"] = cost
+    values["co2"] = co2
+
+    h = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    occurrence = pd.Series(h).groupby(h).cumcount().to_numpy()
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({"h": h, "n": occurrence}), index=False
+    ).to_numpy()
+
+
+def _positions(sorted_keys, order, keys):
+    """Positions of `keys` in the array whose argsort is `order` (-1 if absent)."""
+    if sorted_keys.size == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+    i = np.minimum(np.searchsorted(sorted_keys, keys), sorted_keys.size - 1)
+    return np.where(sorted_keys[i] == keys, order[i], -1)
+
+
+class SkybandEntry:
+    """k-skyband of one fragility tier under one suitability formula."""
+
+    __slots__ = ("rows", "band_keys", "bounds", "tier_size", "tolerance")
+
+    def __init__(self, rows, band_keys, bounds, tier_size, tolerance=None):
+        self.rows = rows              # ascending snapshot positions
+        self.band_keys = band_keys    # row keys of `rows`
+        self.bounds = bounds          # tier (lo, hi) of cost, co2, suitability
+        self.tier_size = tier_size
+        self.tolerance = tolerance    # dominance tolerance per objective (raw units)
+
+
+class _Skybands:
+    """Entries of one (snapshot, predictions) pair + its row-key diff."""
+
+    __slots__ = (
+        "snapshot", "predictions", "entries", "previous",
+        "keys", "sorted_keys", "key_order", "added", "removed_keys"
+    )
+
+    def __init__(self, snapshot, predictions, previous=None):
+        self.snapshot = snapshot
+        self.predictions = predictions
+        self.entries = {}
+
+        keys = row_keys(snapshot, predictions)
+        order = np.argsort(keys)
+        self.keys, self.sorted_keys, self.key_order = keys, keys[order], order
+
+        if previous is not None:
+            # Entries of the snapshot being replaced can be updated incrementally
+            self.previous = previous.entries
+            self.added = np.flatnonzero(_positions(previous.sorted_keys, previous.key_order, keys) < 0)
+            self.removed_keys = previous.keys[_positions(self.sorted_keys, order, previous.keys) < 0]
+        else:
+            self.previous = {}
+            self.added = self.removed_keys = None
+
+
+class ParetoIndex:
+    """
+    Per (fragility tier, suitability formula) k-skyband of the catalog.
+
+    The final score is a positive weighting of low cost, low CO2 and
+    high suitability, normalized over the tier. Whatever the weights,
+    the top k of a tier lies in its k-skyband (rows dominated by fewer
+    than k others), so a top-N with N <= k only needs to score those
+    rows, normalized with the tier's bounds.
+
+    Entries are built lazily on the first lookup after the catalog
+    snapshot or the predictions change. Rows are matched across
+    snapshots by row_keys(); when an entry existed for the previous
+    snapshot and none of its skyband rows were removed or edited, the
+    new skyband is computed from the old skyband plus the added rows
+    only (keeping the old dominance tolerance, as long as the tier's
+    ranges have not grown past MIN_DOMINANCE_TOLERANCE). Otherwise the
+    tier is rebuilt from scratch. Entries are kept per snapshot
+    (SnapshotStates), so the catalog poller can warm() the next snapshot
+    while requests still read the current one.
+    """
+
+    def __init__(self, k=SKYBAND_K):
+        self.k = k
+
+        self._lock = threading.Lock()
+        self._states = SnapshotStates()
+
+        self.full_builds = 0
+        self.incremental_builds = 0
+        self.build_seconds = 0.0
+        self.hits = 0
+        self.fallbacks = 0
+
+    # ------------------------------------------------------
+    def _base_rows(self, state, tier, kind, spans):
+        """
+        Rows the new skyband can come from (the old skyband + added rows)
+        and the old dominance tolerance, or None to rebuild the tier.
+        """
+        previous = state.previous.get((tier, kind))
+        if previous is None or previous.tolerance is None:
+            return None
+        if np.isin(state.removed_keys, previous.band_keys).any():
+            return None
+        # Old drops stay valid in raw units, but the tolerance must still
+        # be large enough relative to the (possibly wider) new range
+        if (previous.tolerance < MIN_DOMINANCE_TOLERANCE * spans).any():
+            return None
+
+        kept = _positions(state.sorted_keys, state.key_order, previous.band_keys)
+        added = state.added[state.snapshot.features[STRENGTH, state.added] >= tier]
+        return np.union1d(kept[kept >= 0], added), previous.tolerance
+
+    def _build(self, state, tier, kind):
+        start = time.perf_counter()
+        features = state.snapshot.features
+        cost, co2 = state.predictions
+
+        tier_rows = np.flatnonzero(features[STRENGTH] >= tier)
+        if tier_rows.size == 0:
+            self.full_builds += 1
+            self.build_seconds = time.perf_counter() - start
+            return SkybandEntry(tier_rows, state.keys[tier_rows], None, 0)
+
+        tier_suitability = suitability_scores(features[:, tier_rows], kind)
+        bounds = (
+            (cost[tier_rows].min(), cost[tier_rows].max()),
+            (co2[tier_rows].min(), co2[tier_rows].max()),
+            (tier_suitability.min(), tier_suitability.max())
+        )
+
+        # Denominators of the score's min-max normalization
+        spans = np.array([float(hi) - float(lo) + EPS for lo, hi in bounds])
+
+        incremental = self._base_rows(state, tier, kind, spans)
+        if incremental is None:
+            self.full_builds += 1
+            base, tolerance = tier_rows, DOMINANCE_TOLERANCE * spans
+            suitability = tier_suitability
+        else:
+            self.incremental_builds += 1
+            base, tolerance = incremental
+            suitability = suitability_scores(features[:, base], kind)
+
+        # All objectives minimized
+        points = np.column_stack([cost[base], co2[base], -suitability])
+        rows = base[skyband(points, self.k, tolerance)]
+
+        self.build_seconds = time.perf_counter() - start
+        return SkybandEntry(rows, state.keys[rows], bounds, tier_rows.size, tolerance)
+
+    # ------------------------------------------------------
+    def lookup(self, snapshot, predictions, product_category, fragility, top_n):
+        """
+        SkybandEntry holding every row that can rank in the top `top_n`
+        for these inputs, or None when top_n exceeds the index depth.
+        """
+        if top_n is None or top_n > self.k:
+            self.fallbacks += 1
+            return None
+
+        entry = self._entry(snapshot, predictions, min_strength(fragility), suitability_kind(product_category))
+        self.hits += 1
+        return entry
+
+    def _entry(self, snapshot, predictions, tier, kind):
+        # Built entries are read without the lock, so a build in progress
+        # (e.g. the poller warming the next snapshot) does not block them
+        state = self._states.get(snapshot, predictions)
+        entry = state.entries.get((tier, kind)) if state is not None else None
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            state = self._states.get(snapshot, predictions)
+            if state is None:
+                state = self._states.add(_Skybands(snapshot, predictions, self._states.latest()))
+
+            entry = state.entries.get((tier, kind))
+            if entry is None:
+                entry = state.entries[(tier, kind)] = self._build(state, tier, kind)
+        return entry
+
+    def warm(self, snapshot, predictions):
+        """Build every (tier, suitability formula) entry up front."""
+        for tier in sorted({DEFAULT_MIN_STRENGTH, *FRAGILITY_MIN_STRENGTH.values()}):
+            for kind in (*CATEGORY_TERMS, "other"):
+                self._entry(snapshot, predictions, tier, kind)
+
+    def invalidate(self):
+        with self._lock:
+            self._states.clear()
+
+    def stats(self):
+        latest = self._states.latest()
+        entries = latest.entries if latest is not None else {}
+        return {
+            "k": self.k,
+            "snapshots": len(self._states),
+            "entries": {
+                f"{tier}/{kind}": {"candidates": int(e.rows.size), "tier_rows": int(e.tier_size)}
+                for (tier, kind), e in list(entries.items())
+            },
+            "full_builds": self.full_builds,
+            "incremental_builds": self.incremental_builds,
+            "last_build_seconds": round(self.build_seconds, 4),
+            "hits": self.hits,
+            "fallbacks": self.fallbacks
+        }
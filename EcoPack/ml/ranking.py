@@ -1,9 +1,33 @@
+import hashlib
 import os
 import pickle
+import time
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
 from pathlib import Path
-from dotenv import load_dotenv
+
+from db import engine
+from metrics import log, report_error, timed
+from ml.catalog import MaterialCatalog
+from ml.compress import COMPACT_FILES, compact_available, compact_matches
+from ml.constraints import ConstraintIndex
+from ml.model_store import CURRENT_FILE, current_model_dir
+from ml.prediction_cache import PredictionCache
+from ml.pareto import MIN_EXACT_WEIGHT, ParetoIndex
+from ml.ranking_table import RankingTable
+from ml.sensitivity import rank_stability, score_columns
+from ml.single_flight import SingleFlight
+from ml.tree_engine import ARRAY_FILES, load_array_models, stale_bundles
+from ranking_store import MemoryRankingStore
+from ml.scoring import (
+    final_scores,
+    min_strength,
+    rank_order,
+    ranking_weights,
+    spec_key,
+    suitability_scores,
+    top_order
+)
 
 # =========================
 # 1️⃣ FIX PROJECT ROOT PATH
@@ -12,157 +36,646 @@ BASE_DIR = Path(__file__).resolve().parent
 ROOT_DIR = BASE_DIR.parent
 MODEL_DIR = ROOT_DIR / "models"
 
-print("MODEL DIRECTORY:", MODEL_DIR)
+log.info("model directory: %s", MODEL_DIR)
 
 # =========================
-# 2️⃣ LOAD ENV
+# 2️⃣ DATABASE
+# =========================
+# Pooled engine from db.py (DATABASE_URL + DB_POOL_* settings)
+# Material table lives in memory; a background poller reloads it on change
+catalog = MaterialCatalog(engine)
+
 # =========================
-load_dotenv(ROOT_DIR / ".env")
+# 3️⃣ LOAD MODELS
+# =========================
+# "library" → sklearn/XGBoost predict, "arrays" → ml.tree_engine bundles
+# (written by training when the live model set has them, or by
+# `python -m ml.tree_engine export`)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "library").lower()
+
+# COMPACT_COST_MODEL=1 → cost model picked by `python -m ml.compress`
+COMPACT_COST_MODEL = os.getenv("COMPACT_COST_MODEL", "0").lower() in ("1", "true", "yes")
+
+PICKLE_FILES = {
+    "cost": "rf_cost_model.pkl",
+    "co2": "xgb_co2_model.pkl",
+    "scaler": "scaler.pkl"
+}
+MODEL_NAMES = dict(ARRAY_FILES) if MODEL_BACKEND == "arrays" else dict(PICKLE_FILES)
+
+
+def model_names(model_dir, backend=MODEL_BACKEND):
+    """
+    File of each model in `model_dir` (the compact cost model when
+    enabled, present and derived from the full model next to it).
+    """
+    names = dict(ARRAY_FILES) if backend == "arrays" else dict(PICKLE_FILES)
+    if COMPACT_COST_MODEL:
+        compact_backend = "arrays" if backend == "arrays" else "library"
+        if not compact_available(model_dir, compact_backend):
+            log.warning("compact cost model not found, using the full model")
+        elif not compact_matches(model_dir):
+            log.warning("compact cost model was derived from another full model, using the full model")
+        else:
+            names["cost"] = COMPACT_FILES[compact_backend]
+    return names
+
+
+def array_backend_usable(model_dir, names):
+    """False (→ pickles) when bundles are missing or were exported from other pickles."""
+    missing = [name for name in names.values() if not (model_dir / name).exists()]
+    stale = stale_bundles(model_dir, names)
+    if missing or stale:
+        log.error(
+            "array bundles missing %s / stale %s in %s, predicting with the pickles; "
+            "run `python -m ml.tree_engine export`", missing, stale, model_dir
+        )
+        return False
+    return True
+
+
+# Watched for hot reload: CURRENT switches with every published model set
+# (ml.model_store); the flat files are the layout shipped with the repo
+MODEL_FILES = [MODEL_DIR / CURRENT_FILE, *(MODEL_DIR / name for name in MODEL_NAMES.values())]
+
+cost_model = None
+co2_model = None
+scaler = None
+# Backend of the loaded models: MODEL_BACKEND unless its bundles were unusable
+active_backend = None
+
+
+def load_models():
+    global cost_model, co2_model, scaler, active_backend
+
+    try:
+        # Resolved once: every file comes from the same model set
+        model_dir = current_model_dir(MODEL_DIR)
+        names = model_names(model_dir)
+
+        if MODEL_BACKEND == "arrays":
+            if array_backend_usable(model_dir, names):
+                cost_model, co2_model, scaler = load_array_models(model_dir, files=names)
+                active_backend = "arrays"
+                log.info("array models loaded from %s", model_dir)
+                return True
+            names = model_names(model_dir, "library")
+
+        loaded = {}
+        for kind in ("cost", "co2", "scaler"):
+            with open(model_dir / names[kind], "rb") as f:
+                loaded[kind] = pickle.load(f)
+
+        cost_model, co2_model, scaler = loaded["cost"], loaded["co2"], loaded["scaler"]
+        active_backend = "library"
+        log.info("models loaded from %s", model_dir)
+        return True
+
+    except Exception:
+        report_error("model_load")
+        return False
+
+
+def ensure_models():
+    """Load the models on first use (normally done by warmup())."""
+    if cost_model is None or co2_model is None or scaler is None:
+        return load_models()
+    return True
+
+
+def predict_materials(X_raw):
+    """Run both models over raw feature rows → (cost_rupees, co2_score)."""
+    if not ensure_models():
+        raise RuntimeError("Models are not loaded")
+
+    if active_backend == "arrays":
+        X_raw = X_raw.to_numpy(dtype=float)
+
+    with timed("scaler_transform"):
+        X_scaled = scaler.transform(X_raw)
+    with timed("cost_predict"):
+        cost = cost_model.predict(X_raw)
+    with timed("co2_predict"):
+        co2 = co2_model.predict(X_scaled)
+
+    if active_backend == "arrays":
+        # float32 like XGBoost's own predict
+        co2 = co2.astype(np.float32)
+    return cost, co2
+
+
+# Predictions only depend on the material row and the model files,
+# so they are computed once per catalog / model version.
+prediction_cache = PredictionCache(
+    MODEL_FILES,
+    predict_materials,
+    on_model_change=load_models
+)
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL not set!")
+def invalidate_predictions():
+    prediction_cache.invalidate()
 
-engine = create_engine(DATABASE_URL)
 
 # =========================
-# 3️⃣ LOAD MODELS
+# WARMUP
 # =========================
-try:
-    with open(MODEL_DIR / "rf_cost_model.pkl", "rb") as f:
-        cost_model = pickle.load(f)
+# Stage → seconds, filled in by warmup(); read by the readiness endpoint
+WARMUP_TIMINGS = {}
+# Stage → seconds of the last prepare_snapshot()
+PREPARE_TIMINGS = {}
+_ready = {"models": False, "catalog": False}
+
+
+def prepare_snapshot(snapshot):
+    """
+    Predict a catalog snapshot and build its constraint columns and
+    ranking table, or its Pareto index for catalogs too large for the
+    table. The catalog poller runs this before publishing a snapshot,
+    so requests never wait for it; a no-op for work already done.
+    """
+    def stage(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        PREPARE_TIMINGS[name] = round(time.perf_counter() - start, 4)
+        return result
+
+    predictions = stage("predictions", lambda: prediction_cache.get(
+        snapshot.df, catalog_version=snapshot.version
+    ))
+    stage("constraint_index", lambda: constraint_index.warm(snapshot, predictions))
+    if len(snapshot.df) > ranking_table.max_rows:
+        stage("pareto_index", lambda: pareto_index.warm(snapshot, predictions))
+    else:
+        stage("ranking_table", lambda: ranking_table.rebuild(snapshot, predictions))
+    return predictions
+
+
+catalog.prepare = prepare_snapshot
+
+
+def warmup(models=True, data=True):
+    """
+    Explicit initialization instead of import-time side effects.
+
+    models → unpickle / map the model files (safe in the gunicorn master
+    before fork). data → connect to the DB, load the catalog and
+    prepare_snapshot() it (per worker, after fork).
+    """
+    def stage(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        WARMUP_TIMINGS[name] = round(time.perf_counter() - start, 4)
+        return result
 
-    with open(MODEL_DIR / "xgb_co2_model.pkl", "rb") as f:
-        co2_model = pickle.load(f)
+    # Already loaded in the gunicorn master → keep the master's timing
+    if models and not _ready["models"]:
+        _ready["models"] = stage("models", ensure_models)
 
-    with open(MODEL_DIR / "scaler.pkl", "rb") as f:
-        scaler = pickle.load(f)
+    if data:
+        # A first load prepares the snapshot itself (timed in PREPARE_TIMINGS)
+        loaded = catalog.current() is not None
+        snapshot, _ = stage("catalog", load_snapshot)
+        if snapshot is not None and loaded:
+            prepare_snapshot(snapshot)
+        WARMUP_TIMINGS.update(PREPARE_TIMINGS)
+        _ready["catalog"] = snapshot is not None
 
-    print("✅ MODELS LOADED SUCCESSFULLY")
+    return is_ready()
+
+
+def is_ready():
+    return all(_ready.values())
 
-except Exception as e:
-    print("❌ MODEL LOAD ERROR:", e)
 
 # =========================
 # 4️⃣ MATERIAL RANKING
 # =========================
+def load_snapshot():
+    """
+    Current catalog snapshot with its (cost, co2) predictions.
+    Returns (None, None) when the catalog is empty or unavailable.
+    """
+    try:
+        snapshot = catalog.snapshot()
+
+        if snapshot.empty:
+            log.warning("material table is empty")
+            return None, None
+
+    except Exception:
+        report_error("catalog", "material catalog unavailable")
+        return None, None
+
+    with timed("predictions"):
+        predictions = prediction_cache.get(snapshot.df, catalog_version=snapshot.version)
+    return snapshot, predictions
+
+
+def tier_scores(
+    snapshot,
+    predictions,
+    product_category,
+    fragility,
+    shipping_type,
+    sustainability_priority,
+    weights=None,
+    constraints=None
+):
+    """
+    (candidates, cost, co2, suitability, score) over the fragility tier,
+    unsorted; None when no material is strong enough or meets the hard
+    `constraints` (see parse_constraints()).
+    """
+    cost, co2 = predictions
+
+    # ================= FRAGILITY + HARD CONSTRAINTS =================
+    features = snapshot.features
+    candidates = constraint_index.candidates(snapshot, predictions, min_strength(fragility), constraints)
+
+    if candidates.size == 0:
+        return None
+
+    cost = cost[candidates]
+    co2 = co2[candidates]
+
+    # ================= SCORING =================
+    with timed("suitability"):
+        suitability = suitability_scores(features[:, candidates], product_category)
+    weights = weights or ranking_weights(shipping_type, sustainability_priority)
+    with timed("final_score"):
+        score = final_scores(cost, co2, suitability, weights)
+
+    return candidates, cost, co2, suitability, score
+
+
+def rank_snapshot(
+    snapshot,
+    predictions,
+    product_category,
+    fragility,
+    shipping_type,
+    sustainability_priority,
+    weights=None,
+    top_n=None,
+    constraints=None
+):
+    """
+    Every material of the fragility tier, best first, or only the best
+    `top_n` (partial selection instead of a full sort). `weights`
+    (normalized cost / co2 / suitability) overrides the weights derived
+    from shipping_type and sustainability_priority; `constraints` drops
+    materials before scoring.
+    """
+    scored = tier_scores(
+        snapshot, predictions, product_category, fragility,
+        shipping_type, sustainability_priority, weights, constraints
+    )
+    if scored is None:
+        return pd.DataFrame()
+
+    candidates, cost, co2, suitability, score = scored
+
+    # ================= RANKING =================
+    with timed("sort"):
+        order = rank_order(score) if top_n is None else top_order(score, top_n)
+
+    return ranked_frame(snapshot.df, candidates[order], cost[order], co2[order], suitability[order], score[order])
+
+
+def rank_top(
+    snapshot,
+    predictions,
+    product_category,
+    fragility,
+    shipping_type,
+    sustainability_priority,
+    top_n,
+    weights=None
+):
+    """
+    Top `top_n` of rank_snapshot(), scoring only the tier's Pareto
+    candidates. None when the index cannot serve top_n.
+    """
+    weights = weights or ranking_weights(shipping_type, sustainability_priority)
+    # With a zero (or vanishing) weight a dominated row can tie its
+    # dominator and win on catalog order: the skyband is not exact
+    if min(weights) < MIN_EXACT_WEIGHT:
+        return None
+
+    entry = pareto_index.lookup(snapshot, predictions, product_category, fragility, top_n)
+    if entry is None:
+        return None
+
+    candidates = entry.rows
+    if candidates.size == 0:
+        return pd.DataFrame()
+
+    cost = predictions[0][candidates]
+    co2 = predictions[1][candidates]
+
+    with timed("suitability"):
+        suitability = suitability_scores(snapshot.features[:, candidates], product_category)
+    # Normalized over the whole tier, exactly like the brute-force ranking
+    with timed("final_score"):
+        score = final_scores(cost, co2, suitability, weights, bounds=entry.bounds)
+
+    with timed("sort"):
+        order = top_order(score, top_n)
+
+    return ranked_frame(snapshot.df, candidates[order], cost[order], co2[order], suitability[order], score[order])
+
+
+def ranked_frame(df, rows, cost, co2, suitability, score, first_rank=1):
+    """Output frame; `rows` (catalog positions) and the values are in rank order."""
+    return pd.DataFrame({
+        # Only the ranked rows: converting the whole string column is O(catalog)
+        "material_name": df["material_name"].iloc[rows].to_numpy(),
+        "cost_rupees": cost,
+        "co2_score": co2,
+        "suitability_score": suitability,
+        "final_score": score,
+        "rank": np.arange(first_rank, first_rank + len(rows))
+    }, index=df.index[rows])
+
+
+def rank_inputs(snapshot, predictions, inputs, top_n=None, weights=None, constraints=None):
+    """
+    Ranking for one set of inputs: the precomputed table for form
+    values, the Pareto index for a top-N, a live ranking otherwise.
+    Custom `weights` skip the table (it only holds the form's weights);
+    hard `constraints` skip both (they change the candidate set the
+    scores are normalized over).
+    """
+    if constraints:
+        with timed("rank_live"):
+            return rank_snapshot(
+                snapshot, predictions, *inputs, weights=weights, top_n=top_n, constraints=constraints
+            )
+
+    ranked = None
+    if weights is None:
+        with timed("ranking_table"):
+            ranked = ranking_table.lookup(snapshot, predictions, *inputs)
+
+    if ranked is None and top_n is not None:
+        with timed("rank_pareto"):
+            ranked = rank_top(snapshot, predictions, *inputs, top_n, weights=weights)
+        if ranked is not None:
+            return ranked
+
+    if ranked is None:
+        with timed("rank_live"):
+            return rank_snapshot(snapshot, predictions, *inputs, weights=weights, top_n=top_n)
+
+    return ranked if top_n is None else ranked.head(top_n)
+
+
 def get_material_ranking(
     product_type,
     product_category,
     fragility,
     shipping_type,
-    sustainability_priority
+    sustainability_priority,
+    top_n=None,
+    weights=None,
+    constraints=None
 ):
+    """
+    Ranked materials for the inputs (all of them, or the best `top_n`).
+    `weights` is a normalized (cost, co2, suitability) tuple, see
+    parse_weights(); `constraints` the hard limits from
+    parse_constraints().
+    """
+    inputs = (product_category, fragility, shipping_type, sustainability_priority)
 
-    try:
-        df = pd.read_sql(text("SELECT * FROM material"), engine)
+    # Identical concurrent requests (same canonical inputs) share one
+    # catalog read + ranking
+    key = (spec_key(*inputs, weights=weights), top_n, constraints)
+    return coalescer.do(key, lambda: _rank_current(inputs, top_n, weights, constraints))
 
-        if df.empty:
-            print("❌ MATERIAL TABLE EMPTY")
-            return pd.DataFrame()
 
-    except Exception as e:
-        print("❌ DB ERROR:", e)
+def _rank_current(inputs, top_n, weights=None, constraints=None):
+    snapshot, predictions = load_snapshot()
+
+    if snapshot is None:
         return pd.DataFrame()
 
-    features = [
-        "strength",
-        "weight_capacity",
-        "biodegradability_score",
-        "recyclability_percentage"
-    ]
+    return rank_inputs(snapshot, predictions, inputs, top_n, weights, constraints)
 
-    X_raw = df[features]
-    X_scaled = scaler.transform(X_raw)
 
-    # ================= MODEL PREDICTIONS =================
-    df["cost_rupees"] = cost_model.predict(X_raw)
-    df["co2_score"] = co2_model.predict(X_scaled)
+# Every combination of the form inputs, rebuilt when catalog/models change
+ranking_table = RankingTable(rank_snapshot)
 
-    # ================= FRAGILITY FILTER =================
-    fragility = (fragility or "").lower()
+# Pareto candidates per fragility tier, for top-N requests the table cannot serve
+pareto_index = ParetoIndex()
 
-    if fragility == "high":
-        df = df[df["strength"] >= 3]
-    elif fragility == "medium":
-        df = df[df["strength"] >= 2]
-    else:
-        df = df[df["strength"] >= 1]
+# Presorted columns for the fragility tier and hard constraints
+constraint_index = ConstraintIndex()
 
-    if df.empty:
-        return pd.DataFrame()
+coalescer = SingleFlight()
 
-    # ================= CATEGORY SUITABILITY =================
-    def material_priority_score(row):
 
-        cat = (product_category or "").lower()
+# =========================
+# 5️⃣ BATCH RANKING
+# =========================
+def get_material_rankings_batch(specs, top_n=5):
+    """
+    Rank many product specs against one catalog snapshot.
 
-        if cat == "food":
-            return 0.5 * row["biodegradability_score"] + 0.5 * row["recyclability_percentage"]
+    `specs` is a list of dicts with product_category, fragility,
+    shipping_type and sustainability_priority. Specs that rank
+    identically are computed once. Returns one top-N DataFrame per spec,
+    in input order.
+    """
+    snapshot, predictions = load_snapshot()
 
-        elif cat == "electronics":
-            return 0.6 * row["strength"] + 0.4 * row["weight_capacity"]
+    computed = {}
+    results = []
 
-        else:
-            return (
-                0.4 * row["strength"] +
-                0.3 * row["biodegradability_score"] +
-                0.3 * row["recyclability_percentage"]
-            )
+    for spec in specs:
+        inputs = (
+            spec.get("product_category"),
+            spec.get("fragility"),
+            spec.get("shipping_type"),
+            spec.get("sustainability_priority")
+        )
+        key = spec_key(*inputs)
 
-    df["suitability_score"] = df.apply(material_priority_score, axis=1)
+        if key not in computed:
+            if snapshot is None:
+                computed[key] = pd.DataFrame()
+            else:
+                computed[key] = rank_inputs(snapshot, predictions, inputs, top_n)
 
-    # ================= NORMALIZATION =================
-    df["cost_score"] = 1 - (
-        (df["cost_rupees"] - df["cost_rupees"].min()) /
-        (df["cost_rupees"].max() - df["cost_rupees"].min() + 1e-6)
-    )
+        results.append(computed[key])
 
-    df["co2_score_norm"] = 1 - (
-        (df["co2_score"] - df["co2_score"].min()) /
-        (df["co2_score"].max() - df["co2_score"].min() + 1e-6)
-    )
+    return results
 
-    df["suitability_norm"] = (
-        (df["suitability_score"] - df["suitability_score"].min()) /
-        (df["suitability_score"].max() - df["suitability_score"].min() + 1e-6)
+
+# =========================
+# 6️⃣ SENSITIVITY ANALYSIS
+# =========================
+def get_rank_sensitivity(product_category, fragility, weights, top_n=10, base_weights=None):
+    """
+    How stable each material's top-N rank is across many weight vectors
+    ((n, 3) cost / co2 / suitability, see ml.sensitivity).
+
+    Only the tier's Pareto candidates can reach a top-N with N <= the
+    index depth, so all vectors are scored as one (candidates × 3) @
+    (3 × n) product. Like rank_top(), the skyband is only exact for
+    positive weights: with a zero (or vanishing) weight, or a deeper
+    top-N, every tier row is scored. Returns (DataFrame, summary), most
+    stable first; (None, None) when the catalog is unavailable.
+    """
+    snapshot, predictions = load_snapshot()
+    if snapshot is None:
+        return None, None
+
+    weights = np.asarray(weights, dtype=float)
+    positive = weights.min() >= MIN_EXACT_WEIGHT and (
+        base_weights is None or min(base_weights) >= MIN_EXACT_WEIGHT
     )
 
-    # ================= WEIGHTS =================
-    cost_w, co2_w, suit_w = 0.4, 0.4, 0.2
+    entry = None
+    if positive:
+        entry = pareto_index.lookup(snapshot, predictions, product_category, fragility, top_n)
 
-    sustainability_priority = (sustainability_priority or "").lower()
-    shipping_type = (shipping_type or "").lower()
+    if entry is not None:
+        candidates, bounds, tier_size = entry.rows, entry.bounds, entry.tier_size
+    else:
+        # Every tier row; normalized over itself, like rank_snapshot()
+        candidates = constraint_index.candidates(snapshot, predictions, min_strength(fragility))
+        bounds, tier_size = None, candidates.size
 
-    if sustainability_priority == "high":
-        co2_w += 0.1
-        suit_w += 0.05
-        cost_w -= 0.15
+    summary = {
+        "tier_rows": int(tier_size),
+        "candidates": int(candidates.size),
+        "pareto": entry is not None
+    }
 
-    if shipping_type == "international":
-        co2_w += 0.1
-        cost_w -= 0.05
+    if candidates.size == 0:
+        return pd.DataFrame(), {**summary, "samples": len(weights), "top_n": 0}
 
-    total = cost_w + co2_w + suit_w
-    cost_w /= total
-    co2_w /= total
-    suit_w /= total
+    with timed("sensitivity"):
+        suitability = suitability_scores(snapshot.features[:, candidates], product_category)
+        columns = score_columns(
+            predictions[0][candidates], predictions[1][candidates], suitability, bounds
+        )
+        stats, stability = rank_stability(columns, weights, top_n, base_weights)
 
-    df["final_score"] = (
-        cost_w * df["cost_score"] +
-        co2_w * df["co2_score_norm"] +
-        suit_w * df["suitability_norm"]
-    )
+    rows = candidates[stats.pop("rows")]
+    df = pd.DataFrame({
+        "material_name": snapshot.df["material_name"].iloc[rows].to_numpy(),
+        **stats
+    }, index=snapshot.df.index[rows])
+
+    df = df.sort_values(["top_n_share", "mean_rank"], ascending=[False, True], kind="stable")
+    return df, {**summary, **stability}
+
+
+# =========================
+# 7️⃣ PAGINATED FULL RANKING
+# =========================
+# Full ranked orders kept for browsing (rows + scores, 16 bytes per
+# material), per input combination
+ORDER_CACHE_ENTRIES = int(os.getenv("RANKED_ORDER_CACHE_ENTRIES", "16"))
+ORDER_CACHE_TTL = float(os.getenv("RANKED_ORDER_CACHE_TTL", "600"))
 
-    df = df.sort_values("final_score", ascending=False)
-    df["rank"] = range(1, len(df) + 1)
-
-    return df[[
-        "material_name",
-        "cost_rupees",
-        "co2_score",
-        "suitability_score",
-        "final_score",
-        "rank"
-    ]]
\ No newline at end of file
+
+class RankedOrder:
+    """A full ranking as catalog positions + scores, best first."""
+
+    __slots__ = ("rows", "score", "version", "predictions")
+
+    def __init__(self, rows, score, version, predictions):
+        self.rows = rows
+        self.score = score
+        self.version = version
+        self.predictions = predictions
+
+
+ranked_orders = MemoryRankingStore(max_entries=ORDER_CACHE_ENTRIES, ttl=ORDER_CACHE_TTL)
+order_stats = {"hits": 0, "misses": 0}
+
+
+def ranking_version(snapshot):
+    """
+    Token that changes whenever the ranking can change: catalog content
+    (the DB fingerprint, identical in every worker) or the model files.
+    """
+    raw = repr((snapshot.fingerprint, prediction_cache.model_version()))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def ranked_order(snapshot, predictions, inputs, weights=None, constraints=None):
+    """Cached full RankedOrder for the inputs against this snapshot."""
+    key = (spec_key(*inputs, weights=weights), constraints)
+
+    order = ranked_orders.get(key)
+    if order is not None and order.version == snapshot.version and order.predictions is predictions:
+        order_stats["hits"] += 1
+        return order
+
+    def compute():
+        scored = tier_scores(snapshot, predictions, *inputs, weights, constraints)
+        if scored is None:
+            rows, score = np.empty(0, dtype=np.int64), np.empty(0)
+        else:
+            candidates, _, _, _, score = scored
+            with timed("sort"):
+                ranking = rank_order(score)
+            rows, score = candidates[ranking], score[ranking]
+
+        computed = RankedOrder(rows, score, snapshot.version, predictions)
+        ranked_orders.put(key, computed)
+        return computed
+
+    order_stats["misses"] += 1
+    with timed("rank_full_order"):
+        return coalescer.do(("order", key, snapshot.version), compute)
+
+
+def ranking_page(snapshot, predictions, inputs, offset, limit, weights=None, constraints=None):
+    """
+    Ranks offset+1 .. offset+limit of the full ranking and the total
+    number of ranked materials. Only the page rows are materialized.
+    """
+    if weights is None and not constraints:
+        # Form inputs: the precomputed table already holds the full ranking
+        ranked = ranking_table.lookup(snapshot, predictions, *inputs)
+        if ranked is not None:
+            return ranked.iloc[offset:offset + limit], len(ranked)
+
+    order = ranked_order(snapshot, predictions, inputs, weights, constraints)
+    rows = order.rows[offset:offset + limit]
+
+    page = ranked_frame(
+        snapshot.df,
+        rows,
+        predictions[0][rows],
+        predictions[1][rows],
+        suitability_scores(snapshot.features[:, rows], inputs[0]),
+        order.score[offset:offset + limit],
+        first_rank=offset + 1
+    )
+    return page, len(order.rows)
+
+
+def get_ranking_page(inputs, offset, limit, weights=None, version=None, constraints=None):
+    """
+    (page, total, version) of the full ranking for the inputs;
+    (None, 0, None) when the catalog is unavailable. Raises LookupError
+    when `version` (from an earlier page) no longer matches, since the
+    order the cursor points into is gone.
+    """
+    snapshot, predictions = load_snapshot()
+    if snapshot is None:
+        return None, 0, None
+
+    current = ranking_version(snapshot)
+    if version is not None and version != current:
+        raise LookupError("The ranking changed since the first page; start again without a cursor")
+
+    page, total = ranking_page(snapshot, predictions, inputs, offset, limit, weights, constraints)
+    return page, total, current
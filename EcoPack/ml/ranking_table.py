@@ -0,0 +1,149 @@
+import itertools
+import os
+import threading
+import time
+
+from metrics import log
+from ml.scoring import spec_key
+from ml.snapshot_states import SnapshotStates
+
+# =========================
+# INPUT GRID (form values)
+# =========================
+PRODUCT_CATEGORIES = ["food", "electronics", "cosmetics", "pharmaceutical", "glass", "other"]
+FRAGILITIES = ["high", "medium", "low"]
+SHIPPING_TYPES = ["domestic", "international"]
+SUSTAINABILITY_PRIORITIES = ["high", "medium", "low"]
+
+# Above this catalog size the table would not fit comfortably in memory
+MAX_ROWS = int(os.getenv("RANKING_TABLE_MAX_ROWS", "100000"))
+
+
+def normalize_inputs(product_category, fragility, shipping_type, sustainability_priority):
+    return tuple(
+        (value or "").strip().lower()
+        for value in (product_category, fragility, shipping_type, sustainability_priority)
+    )
+
+
+class _Table:
+    __slots__ = ("snapshot", "predictions", "rankings")
+
+    def __init__(self, snapshot, predictions, rankings):
+        self.snapshot = snapshot
+        self.predictions = predictions
+        self.rankings = rankings
+
+
+# ==========================================================
+# MATERIALIZED RANKING TABLE
+# ==========================================================
+class RankingTable:
+    """
+    Precomputed rankings for every combination of the form inputs.
+
+    The table is built by rebuild() (the catalog poller, before it
+    publishes a snapshot) or on the first lookup after the catalog
+    snapshot or the model predictions change. Tables are kept per
+    snapshot (SnapshotStates), so building the next one does not evict
+    the one requests are reading. Combinations that rank identically
+    (same `spec_key`) share one DataFrame. Values outside the grid, or
+    catalogs larger than `max_rows`, return None so the caller can fall
+    back to live computation.
+    """
+
+    def __init__(self, rank_fn, max_rows=MAX_ROWS):
+        self.rank_fn = rank_fn
+        self.max_rows = max_rows
+
+        self._lock = threading.Lock()
+        self._tables = SnapshotStates()
+
+        self.build_seconds = 0.0
+        self.memory_bytes = 0
+        self.distinct = 0
+        self.hits = 0
+        self.fallbacks = 0
+
+    # ------------------------------------------------------
+    def rebuild(self, snapshot, predictions):
+        """Build the table for this snapshot; a no-op if it exists already."""
+        with self._lock:
+            table = self._tables.get(snapshot, predictions)
+            if table is None:
+                table = self._tables.add(self._build(snapshot, predictions))
+        return table
+
+    def _build(self, snapshot, predictions):
+        start = time.perf_counter()
+
+        by_key = {}
+        table = {}
+
+        for inputs in itertools.product(
+            PRODUCT_CATEGORIES, FRAGILITIES, SHIPPING_TYPES, SUSTAINABILITY_PRIORITIES
+        ):
+            key = spec_key(*inputs)
+            if key not in by_key:
+                by_key[key] = self.rank_fn(snapshot, predictions, *inputs)
+            table[inputs] = by_key[key]
+
+        self.build_seconds = time.perf_counter() - start
+        self.distinct = len(by_key)
+        # Shallow: material names are shared with the catalog snapshot
+        self.memory_bytes = int(sum(
+            df.memory_usage(index=True).sum() for df in by_key.values()
+        ))
+
+        log.info(
+            "ranking table built: %d combinations (%d distinct) in %.3fs, %.2f MB",
+            len(table), self.distinct, self.build_seconds, self.memory_bytes / 1024 ** 2
+        )
+        return _Table(snapshot, predictions, table)
+
+    # ------------------------------------------------------
+    def lookup(
+        self,
+        snapshot,
+        predictions,
+        product_category,
+        fragility,
+        shipping_type,
+        sustainability_priority
+    ):
+        """
+        Full ranked DataFrame for the inputs, or None if they are off-grid.
+        The returned frame is shared: callers must not modify it.
+        """
+        if len(snapshot.df) > self.max_rows:
+            self.fallbacks += 1
+            return None
+
+        inputs = normalize_inputs(
+            product_category, fragility, shipping_type, sustainability_priority
+        )
+
+        table = self._tables.get(snapshot, predictions) or self.rebuild(snapshot, predictions)
+        result = table.rankings.get(inputs)
+
+        if result is None:
+            self.fallbacks += 1
+        else:
+            self.hits += 1
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._tables.clear()
+
+    def stats(self):
+        latest = self._tables.latest()
+        return {
+            "snapshots": len(self._tables),
+            "combinations": len(latest.rankings) if latest is not None else 0,
+            "distinct_rankings": self.distinct,
+            "build_seconds": round(self.build_seconds, 4),
+            "memory_bytes": self.memory_bytes,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks
+        }
@@ -0,0 +1,169 @@
+import numpy as np
+
+# =========================
+# FEATURE LAYOUT
+# =========================
+# Row order of the (4, n) feature matrix kept on each catalog snapshot
+FEATURES = [
+    "strength",
+    "weight_capacity",
+    "biodegradability_score",
+    "recyclability_percentage"
+]
+
+STRENGTH, WEIGHT_CAPACITY, BIODEGRADABILITY, RECYCLABILITY = range(4)
+
+# =========================
+# CATEGORY SUITABILITY
+# =========================
+# (feature row, weight) terms, summed left to right
+CATEGORY_TERMS = {
+    "food": [(BIODEGRADABILITY, 0.5), (RECYCLABILITY, 0.5)],
+    "electronics": [(STRENGTH, 0.6), (WEIGHT_CAPACITY, 0.4)],
+}
+
+DEFAULT_TERMS = [(STRENGTH, 0.4), (BIODEGRADABILITY, 0.3), (RECYCLABILITY, 0.3)]
+
+# Minimum strength per fragility level
+FRAGILITY_MIN_STRENGTH = {
+    "high": 3,
+    "medium": 2,
+}
+
+DEFAULT_MIN_STRENGTH = 1
+
+EPS = 1e-6
+
+
+# ==========================================================
+# 1️⃣ INPUT HELPERS
+# ==========================================================
+def min_strength(fragility):
+    return FRAGILITY_MIN_STRENGTH.get((fragility or "").lower(), DEFAULT_MIN_STRENGTH)
+
+
+def ranking_weights(shipping_type, sustainability_priority):
+    """Return normalized (cost_w, co2_w, suit_w) for the request inputs."""
+    cost_w, co2_w, suit_w = 0.4, 0.4, 0.2
+
+    sustainability_priority = (sustainability_priority or "").lower()
+    shipping_type = (shipping_type or "").lower()
+
+    if sustainability_priority == "high":
+        co2_w += 0.1
+        suit_w += 0.05
+        cost_w -= 0.15
+
+    if shipping_type == "international":
+        co2_w += 0.1
+        cost_w -= 0.05
+
+    total = cost_w + co2_w + suit_w
+    return cost_w / total, co2_w / total, suit_w / total
+
+
+WEIGHT_NAMES = ("cost", "co2", "suitability")
+
+
+def parse_weights(value):
+    """
+    Client weights → normalized (cost_w, co2_w, suit_w), or None when not
+    given. Accepts {"cost": .., "co2": .., "suitability": ..} (missing
+    keys are 0) or a 3-item list. Raises ValueError for anything else,
+    negative weights or an all-zero vector.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, dict):
+        unknown = set(value) - set(WEIGHT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+        value = [value.get(name, 0) for name in WEIGHT_NAMES]
+
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError("weights must be an object with cost / co2 / suitability or a list of 3 numbers")
+
+    try:
+        weights = [float(w) for w in value]
+    except (TypeError, ValueError):
+        raise ValueError("weights must be numbers") from None
+
+    if not all(np.isfinite(weights)) or min(weights) < 0:
+        raise ValueError("weights must be finite and non-negative")
+
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("at least one weight must be positive")
+    return tuple(w / total for w in weights)
+
+
+def spec_key(product_category, fragility, shipping_type, sustainability_priority, weights=None):
+    """Canonical form of the ranking inputs: equal keys → identical rankings."""
+    category = (product_category or "").lower()
+
+    return (
+        category if category in CATEGORY_TERMS else "other",
+        min_strength(fragility),
+        weights or ranking_weights(shipping_type, sustainability_priority)
+    )
+
+
+# ==========================================================
+# 2️⃣ VECTORIZED SCORING
+# ==========================================================
+def suitability_scores(features, product_category):
+    """Category suitability for every column of a (4, n) feature matrix."""
+    terms = CATEGORY_TERMS.get((product_category or "").lower(), DEFAULT_TERMS)
+
+    (row, weight), rest = terms[0], terms[1:]
+    score = weight * features[row]
+    for row, weight in rest:
+        score += weight * features[row]
+    return score
+
+
+def minmax(values, bounds=None):
+    lo, hi = bounds if bounds is not None else (values.min(), values.max())
+    return (values - lo) / (hi - lo + EPS)
+
+
+def final_scores(cost, co2, suitability, weights, bounds=None):
+    """
+    Weighted score in [0, 1]: cheap, low-CO2 and suitable → higher.
+    All inputs are 1-D arrays over the same candidate set.
+
+    `bounds` ((lo, hi) for cost, co2 and suitability) normalizes against
+    a larger set than the one scored, e.g. the fragility tier when only
+    its Pareto candidates are passed in.
+    """
+    cost_w, co2_w, suit_w = weights
+    cost_b, co2_b, suit_b = bounds if bounds is not None else (None, None, None)
+
+    score = cost_w * (1 - minmax(cost, cost_b))
+    score += co2_w * (1 - minmax(co2, co2_b))
+    score += suit_w * minmax(suitability, suit_b)
+    return score
+
+
+def rank_order(scores):
+    """Indices that sort `scores` best first (stable for ties)."""
+    return np.argsort(-scores, kind="stable")
+
+
+def top_order(scores, k):
+    """
+    rank_order(scores)[:k] without sorting every score: partial
+    selection of the k best (O(n)), then a stable sort of those only.
+    Ties at the cut keep the lowest indices, like the full stable sort.
+    """
+    if k >= len(scores):
+        return rank_order(scores)
+
+    negated = -scores
+    cut = np.partition(negated, k - 1)[k - 1]
+    better = np.flatnonzero(negated < cut)
+    tied = np.flatnonzero(negated == cut)[:k - len(better)]
+
+    picked = np.union1d(better, tied)
+    return picked[rank_order(scores[picked])]
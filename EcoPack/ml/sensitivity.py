@@ -0,0 +1,138 @@
+import os
+
+import numpy as np
+
+from ml.scoring import minmax
+
+DEFAULT_SAMPLES = 2000
+MAX_SAMPLES = int(os.getenv("SENSITIVITY_MAX_SAMPLES", "20000"))
+
+# Dirichlet parameters must be > 0; zero weights in the center get this
+MIN_ALPHA = 1e-3
+
+# Score matrix elements (rows × weight vectors) per step, so scoring a
+# whole tier stays bounded in memory
+MAX_SCORE_ELEMENTS = 4_000_000
+
+
+# ==========================================================
+# 1️⃣ WEIGHT SAMPLES
+# ==========================================================
+def sample_weights(n, seed=0, center=None, concentration=None):
+    """
+    (n, 3) weight vectors (cost, co2, suitability) on the simplex:
+    uniform, or Dirichlet-distributed around `center` when a
+    concentration is given (larger → closer to the center).
+    """
+    rng = np.random.default_rng(seed)
+
+    if center is None or concentration is None:
+        alpha = np.ones(3)
+    else:
+        alpha = np.maximum(np.asarray(center, dtype=float) * concentration, MIN_ALPHA)
+
+    return rng.dirichlet(alpha, n)
+
+
+# ==========================================================
+# 2️⃣ RANK STABILITY
+# ==========================================================
+def score_columns(cost, co2, suitability, bounds=None):
+    """
+    (n, 3) normalized score columns: final score = columns @ weights,
+    the same terms final_scores() adds up. Without `bounds` each column
+    is normalized over its own values.
+    """
+    cost_b, co2_b, suit_b = bounds or (None, None, None)
+    return np.column_stack([
+        1 - minmax(cost, cost_b),
+        1 - minmax(co2, co2_b),
+        minmax(suitability, suit_b)
+    ])
+
+
+def top_ranks(columns, weights, top_n):
+    """
+    (top_n, n_weights) row indices, best first, for every weight vector:
+    one matrix product, then a partial sort per column.
+    """
+    weights = np.asarray(weights, dtype=float)
+    step = max(1, MAX_SCORE_ELEMENTS // max(len(columns), 1))
+    if len(weights) > step:
+        return np.concatenate([
+            _top_ranks(columns, weights[i:i + step], top_n)
+            for i in range(0, len(weights), step)
+        ], axis=1)
+    return _top_ranks(columns, weights, top_n)
+
+
+def _top_ranks(columns, weights, top_n):
+    scores = columns @ weights.T
+    top_n = min(top_n, len(columns))
+
+    if top_n < len(columns):
+        top = np.sort(np.argpartition(-scores, top_n - 1, axis=0)[:top_n], axis=0)
+    else:
+        top = np.broadcast_to(np.arange(len(columns))[:, None], scores.shape)
+
+    # Stable on row order (rows are ascending), like rank_order()
+    order = np.argsort(-np.take_along_axis(scores, top, axis=0), axis=0, kind="stable")
+    return np.take_along_axis(top, order, axis=0)
+
+
+def rank_stability(columns, weights, top_n, base_weights=None):
+    """
+    Per-row rank statistics across `weights` (n_weights, 3).
+
+    Returns (stats, summary). stats holds, for every row that reaches
+    the top `top_n` under at least one weight vector: top_n_share,
+    top1_share, best / worst / mean rank and rank std (over the samples
+    where it is in the top N), and its rank under `base_weights` (None
+    outside the base top N).
+    """
+    n_rows = len(columns)
+    n_weights = len(weights)
+    top = top_ranks(columns, weights, top_n)
+    top_n = len(top)
+
+    rows = top.ravel()
+    ranks = np.repeat(np.arange(1, top_n + 1, dtype=float), n_weights)
+
+    count = np.bincount(rows, minlength=n_rows)
+    rank_sum = np.bincount(rows, weights=ranks, minlength=n_rows)
+    rank_sq = np.bincount(rows, weights=ranks ** 2, minlength=n_rows)
+    first = np.bincount(top[0], minlength=n_rows)
+
+    best = np.full(n_rows, np.inf)
+    worst = np.zeros(n_rows)
+    np.minimum.at(best, rows, ranks)
+    np.maximum.at(worst, rows, ranks)
+
+    base_rank = np.zeros(n_rows, dtype=np.int64)
+    unchanged = None
+    if base_weights is not None:
+        base_top = top_ranks(columns, [base_weights], top_n)[:, 0]
+        base_rank[base_top] = np.arange(1, top_n + 1)
+        # Share of samples with the same top-N set as the base weights
+        unchanged = float((np.sort(top, axis=0) == np.sort(base_top)[:, None]).all(axis=0).mean())
+
+    seen = np.flatnonzero(count)
+    mean = rank_sum[seen] / count[seen]
+    stats = {
+        "rows": seen,
+        "top_n_share": count[seen] / n_weights,
+        "top1_share": first[seen] / n_weights,
+        "best_rank": best[seen].astype(np.int64),
+        "worst_rank": worst[seen].astype(np.int64),
+        "mean_rank": mean,
+        "rank_std": np.sqrt(np.maximum(rank_sq[seen] / count[seen] - mean ** 2, 0.0)),
+        "base_rank": np.array([rank or None for rank in base_rank[seen].tolist()], dtype=object)
+    }
+    summary = {
+        "samples": n_weights,
+        "top_n": top_n,
+        "materials_in_top_n": int(seen.size),
+        "distinct_top1": int(np.unique(top[0]).size),
+        "top_n_unchanged_share": unchanged
+    }
+    return stats, summary
@@ -0,0 +1,83 @@
+import os
+import threading
+
+# Followers wait at most this long for the leader, then compute themselves
+MAX_WAIT_SECONDS = float(os.getenv("COALESCE_MAX_WAIT_SECONDS", "5"))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# ==========================================================
+# SINGLE-FLIGHT COALESCING
+# ==========================================================
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one computation.
+
+    The first caller for a key (the leader) runs `fn`; callers arriving
+    while it runs wait for its result (or exception) instead of running
+    `fn` again. A follower that waits longer than `max_wait` computes
+    on its own. Nothing is cached: once the leader finishes, the next
+    call for the key starts a new computation.
+    """
+
+    def __init__(self, max_wait=MAX_WAIT_SECONDS):
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._calls = {}
+
+        self.leaders = 0
+        self.collapsed = 0
+        self.timeouts = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+
+        if not call.done.wait(self.max_wait):
+            with self._lock:
+                self.timeouts += 1
+            return fn()
+
+        with self._lock:
+            self.collapsed += 1
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "collapsed": self.collapsed,
+                "timeouts": self.timeouts
+            }
@@ -0,0 +1,44 @@
+# The snapshot requests are reading + the one the poller is preparing
+KEEP_SNAPSHOTS = 2
+
+
+# ==========================================================
+# PER-SNAPSHOT STATE
+# ==========================================================
+class SnapshotStates:
+    """
+    State derived from a (catalog snapshot, predictions) pair, kept for
+    the last `keep` pairs.
+
+    Holding more than one lets the catalog poller build the state of the
+    next snapshot while requests still read the published one, without
+    either side evicting the other. Matched on object identity, not on
+    the version number. States must expose `snapshot` and `predictions`.
+    Callers serialize add() / clear() with their own lock.
+    """
+
+    def __init__(self, keep=KEEP_SNAPSHOTS):
+        self.keep = max(1, keep)
+        self._states = []
+
+    def get(self, snapshot, predictions):
+        for state in self._states:
+            if state.snapshot is snapshot and state.predictions is predictions:
+                return state
+        return None
+
+    def latest(self):
+        """Most recently added state, or None."""
+        states = self._states
+        return states[0] if states else None
+
+    def add(self, state):
+        # Replaced, never mutated: get() may run without the caller's lock
+        self._states = [state, *self._states][:self.keep]
+        return state
+
+    def clear(self):
+        self._states = []
+
+    def __len__(self):
+        return len(self._states)
@@ -1,160 +1,604 @@
 # backend/ml/train_model.py
+"""
+Training pipeline for the cost (RandomForest) and CO2 (XGBoost) models.
 
-import sys
+Streams the material table into a train / test split, runs a
+cross-validated hyperparameter search for both models on a process
+pool, refits the best candidates, and publishes them as one new model
+set (ml.model_store) together with a report (per-stage wall / CPU
+time, MAE / RMSE / R2).
+
+    python -m ml.train_model                        # search, all cores
+    python -m ml.train_model --n-jobs 4 --n-iter 20 --cv 5
+    python -m ml.train_model --no-search            # fixed parameters only
+    python -m ml.train_model --no-export-arrays     # skip the *.arrays/ bundles
+    python -m ml.train_model --incremental          # only rows added since the last run
+"""
+import argparse
+import json
 import os
-from pathlib import Path
 import pickle
-import pandas as pd
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
-from sklearn.metrics import (
-    mean_absolute_error,
-    mean_squared_error,
-    r2_score,
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score
-)
 
 # ============================
 # 1️⃣ Fix module path
 # ============================
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from data import load_material_data
-
 # ============================
 # 2️⃣ Setup MODEL SAVE PATH
 # ============================
+from ml.model_store import activate_release, current_model_dir, link_file, new_release, write_atomic
+
 BASE_DIR = Path(__file__).resolve().parent
 MODEL_DIR = BASE_DIR.parent / "models"
-MODEL_DIR.mkdir(parents=True, exist_ok=True)
 
-print("Models will be saved to:", MODEL_DIR)
+MODEL_FILES = {
+    "cost": "rf_cost_model.pkl",
+    "co2": "xgb_co2_model.pkl",
+    "scaler": "scaler.pkl"
+}
+REPORT_FILE = "training_report.json"
 
-# ============================
-# 3️⃣ Load dataset from Render PostgreSQL
-# ============================
-df = load_material_data()
+# Models of the last full training, per release (incremental drift reference)
+BASELINE_DIR = "baseline"
 
-if df.empty:
-    raise ValueError("❌ Material table is empty or DB connection failed!")
+TARGETS = {"cost": "cost_rupees", "co2": "co2_score"}
 
-print("Dataset shape:", df.shape)
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
 
-# ============================
-# 4️⃣ Features & Targets
-# ============================
-X = df[[
-    "strength",
-    "weight_capacity",
-    "biodegradability_score",
-    "recyclability_percentage"
-]]
+DEFAULT_N_JOBS = int(os.getenv("TRAINING_N_JOBS", "-1"))
+DEFAULT_CV = 5
+DEFAULT_N_ITER = 12
 
-y_cost_rupees = df["cost_rupees"]
-y_co2_score = df["co2_score"]
+# Parameters of the original fixed models; always part of the search
+FIXED_PARAMS = {
+    "cost": {
+        "n_estimators": 400,
+        "max_depth": 10,
+        "min_samples_split": 5,
+        "min_samples_leaf": 2
+    },
+    "co2": {
+        "n_estimators": 300,
+        "learning_rate": 0.1
+    }
+}
 
-# ============================
-# 5️⃣ Train-Test Split
-# ============================
-X_train, X_test, y_cost_train, y_cost_test, y_co2_train, y_co2_test = train_test_split(
-    X,
-    y_cost_rupees,
-    y_co2_score,
-    test_size=0.2,
-    random_state=42
-)
+SEARCH_SPACE = {
+    "cost": {
+        "n_estimators": [200, 400, 600],
+        "max_depth": [6, 8, 10, 14, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 4],
+        "max_features": [1.0, 0.75, 0.5]
+    },
+    "co2": {
+        "n_estimators": [150, 300, 500],
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "max_depth": [3, 4, 6, 8],
+        "subsample": [0.8, 1.0],
+        "colsample_bytree": [0.75, 1.0],
+        "min_child_weight": [1, 3, 5]
+    }
+}
 
-# ============================
-# 6️⃣ Feature Scaling
-# ============================
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
 
-# Save scaler
-with open(MODEL_DIR / "scaler.pkl", "wb") as f:
-    pickle.dump(scaler, f)
-print("✅ Scaler saved")
+# ==========================================================
+# STAGE TIMER
+# ==========================================================
+class StageTimer:
+    """
+    Wall and CPU seconds per stage. Work done in pool workers is added
+    with add_cpu(), since the parent's process_time() does not see it.
+    """
 
-# ============================
-# 7️⃣ Random Forest – COST Prediction
-# ============================
-rf_cost_model = RandomForestRegressor(
-    n_estimators=400,
-    max_depth=10,
-    min_samples_split=5,
-    min_samples_leaf=2,
-    random_state=42
-)
-
-rf_cost_model.fit(X_train, y_cost_train)
-y_cost_pred = rf_cost_model.predict(X_test)
-
-# Save model
-with open(MODEL_DIR / "rf_cost_model.pkl", "wb") as f:
-    pickle.dump(rf_cost_model, f)
-
-mae_cost = mean_absolute_error(y_cost_test, y_cost_pred)
-rmse_cost = np.sqrt(mean_squared_error(y_cost_test, y_cost_pred))
-r2_cost = r2_score(y_cost_test, y_cost_pred)
-
-print("\n===== COST PREDICTION =====")
-print("MAE :", mae_cost)
-print("RMSE:", rmse_cost)
-print("R2  :", r2_cost)
+    def __init__(self):
+        self.stages = {}
 
-# ============================
-# 8️⃣ XGBoost – CO2 Prediction
-# ============================
-xgb_co2_model = XGBRegressor(
-    n_estimators=300,
-    learning_rate=0.1,
-    random_state=42
-)
+    def stage(self, name):
+        return _Stage(self, name)
 
-xgb_co2_model.fit(X_train_scaled, y_co2_train)
-y_co2_pred = xgb_co2_model.predict(X_test_scaled)
+    def add_cpu(self, name, seconds):
+        self.stages[name]["cpu_s"] += seconds
 
-# Save model
-with open(MODEL_DIR / "xgb_co2_model.pkl", "wb") as f:
-    pickle.dump(xgb_co2_model, f)
+    def report(self):
+        out = {}
+        for name, s in self.stages.items():
+            out[name] = {
+                "wall_s": round(s["wall_s"], 3),
+                "cpu_s": round(s["cpu_s"], 3),
+                # average number of busy cores during the stage
+                "cpu_cores": round(s["cpu_s"] / s["wall_s"], 2) if s["wall_s"] > 0 else 0.0
+            }
+        return out
 
-mae_co2 = mean_absolute_error(y_co2_test, y_co2_pred)
-rmse_co2 = np.sqrt(mean_squared_error(y_co2_test, y_co2_pred))
-r2_co2 = r2_score(y_co2_test, y_co2_pred)
 
-print("\n===== CO2 PREDICTION =====")
-print("MAE :", mae_co2)
-print("RMSE:", rmse_co2)
-print("R2  :", r2_co2)
+class _Stage:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
 
-# ============================
-# 9️⃣ Classification Metrics
-# ============================
-cost_threshold = y_cost_test.median()
-y_cost_true_cls = (y_cost_test >= cost_threshold).astype(int)
-y_cost_pred_cls = (y_cost_pred >= cost_threshold).astype(int)
-
-print("\n===== COST CLASSIFICATION =====")
-print("Accuracy :", accuracy_score(y_cost_true_cls, y_cost_pred_cls))
-print("Precision:", precision_score(y_cost_true_cls, y_cost_pred_cls))
-print("Recall   :", recall_score(y_cost_true_cls, y_cost_pred_cls))
-print("F1-score :", f1_score(y_cost_true_cls, y_cost_pred_cls))
-
-co2_threshold = y_co2_test.median()
-y_co2_true_cls = (y_co2_test >= co2_threshold).astype(int)
-y_co2_pred_cls = (y_co2_pred >= co2_threshold).astype(int)
-
-print("\n===== CO2 CLASSIFICATION =====")
-print("Accuracy :", accuracy_score(y_co2_true_cls, y_co2_pred_cls))
-print("Precision:", precision_score(y_co2_true_cls, y_co2_pred_cls))
-print("Recall   :", recall_score(y_co2_true_cls, y_co2_pred_cls))
-print("F1-score :", f1_score(y_co2_true_cls, y_co2_pred_cls))
-
-print("\n🎉 TRAINING COMPLETED SUCCESSFULLY")
\ No newline at end of file
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.timer.stages[self.name] = {"wall_s": 0.0, "cpu_s": 0.0}
+        return self
+
+    def __exit__(self, *exc):
+        s = self.timer.stages[self.name]
+        s["wall_s"] += time.perf_counter() - self.wall
+        s["cpu_s"] += time.process_time() - self.cpu
+        return False
+
+
+# ==========================================================
+# 3️⃣ DATA
+# ==========================================================
+def load_split(chunk_rows=None):
+    """
+    Stream the material table → (SplitData, fitted StandardScaler).
+    The scaler is fitted chunk by chunk on the train rows. With a
+    KEY_COLUMN the stream is in key order, so existing rows keep their
+    train / test side as the table grows (see ml.incremental).
+    """
+    from sklearn.preprocessing import StandardScaler
+    from data import (
+        CHUNK_ROWS,
+        FEATURE_COLUMNS,
+        KEY_COLUMN,
+        TARGET_COLUMNS,
+        TRAINING_COLUMNS,
+        count_material_rows,
+        has_key_column,
+        iter_material_chunks
+    )
+    from ml.dataset import stream_split
+
+    try:
+        n_rows = count_material_rows()
+    except Exception as e:
+        print("DB Load Error:", e)
+        n_rows = 0
+
+    if n_rows == 0:
+        raise ValueError("❌ Material table is empty or DB connection failed!")
+
+    key = KEY_COLUMN if has_key_column() else None
+    columns = TRAINING_COLUMNS + ([key] if key else [])
+
+    scaler = StandardScaler()
+    split = stream_split(
+        iter_material_chunks(columns=columns, chunk_rows=chunk_rows or CHUNK_ROWS, order_by=key),
+        n_rows,
+        FEATURE_COLUMNS,
+        TARGET_COLUMNS,
+        test_size=TEST_SIZE,
+        random_state=RANDOM_STATE,
+        scaler=scaler,
+        key_name=key
+    )
+    print("Dataset rows:", n_rows, "→ train / test:", len(split.X_train), "/", len(split.X_test))
+    return split, scaler
+
+
+def model_data(split, scaler):
+    """
+    Per model: (X_train, y_train, X_test, y_test). The cost model uses
+    raw features, the CO2 model standardized ones.
+    """
+    X_train = split.frame(split.X_train)
+    X_test = split.frame(split.X_test)
+
+    return {
+        "cost": (
+            X_train,
+            split.target(split.y_train, TARGETS["cost"]),
+            X_test,
+            split.target(split.y_test, TARGETS["cost"])
+        ),
+        "co2": (
+            scaler.transform(X_train),
+            split.target(split.y_train, TARGETS["co2"]),
+            scaler.transform(X_test),
+            split.target(split.y_test, TARGETS["co2"])
+        )
+    }
+
+
+# ==========================================================
+# 4️⃣ MODELS
+# ==========================================================
+def make_estimator(kind, params):
+    # One thread per estimator: parallelism comes from the process pool
+    if kind == "cost":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=1, **params)
+
+    from xgboost import XGBRegressor
+    return XGBRegressor(random_state=RANDOM_STATE, n_jobs=1, **params)
+
+
+def candidates(kind, n_iter, search=True):
+    """FIXED_PARAMS first, then up to `n_iter` sampled from SEARCH_SPACE."""
+    result = [dict(FIXED_PARAMS[kind])]
+    if not search or n_iter <= 0:
+        return result
+
+    from sklearn.model_selection import ParameterSampler
+
+    for params in ParameterSampler(SEARCH_SPACE[kind], n_iter, random_state=RANDOM_STATE):
+        if params not in result:
+            result.append(params)
+    return result
+
+
+# ==========================================================
+# 5️⃣ PROCESS POOL
+# ==========================================================
+# Training arrays are written once to .npy files that every worker maps
+# read-only (shared page cache), instead of a pickled copy per worker
+_worker_data = {}
+
+
+def _share_arrays(train, directory):
+    shared = {}
+    for kind, (X, y) in train.items():
+        columns = list(X.columns) if hasattr(X, "columns") else None
+        paths = (Path(directory) / f"{kind}_X.npy", Path(directory) / f"{kind}_y.npy")
+        np.save(paths[0], np.asarray(X))
+        np.save(paths[1], np.asarray(y))
+        shared[kind] = (*map(str, paths), columns)
+    return shared
+
+
+def _init_worker(shared):
+    import pandas as pd
+
+    for kind, (X_path, y_path, columns) in shared.items():
+        X = np.load(X_path, mmap_mode="r")
+        if columns is not None:
+            X = pd.DataFrame(X, columns=columns, copy=False)
+        _worker_data[kind] = (X, np.load(y_path, mmap_mode="r"))
+
+
+def _cv_task(kind, index, params, fold, cv):
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import KFold
+
+    start = time.process_time()
+    X, y = _worker_data[kind]
+    folds = KFold(cv, shuffle=True, random_state=RANDOM_STATE)
+    train_idx, valid_idx = list(folds.split(X))[fold]
+
+    take = (lambda idx: X.iloc[idx]) if hasattr(X, "iloc") else (lambda idx: X[idx])
+    model = make_estimator(kind, params).fit(take(train_idx), y[train_idx])
+    mae = mean_absolute_error(y[valid_idx], model.predict(take(valid_idx)))
+
+    return kind, index, mae, time.process_time() - start
+
+
+def _fit_task(kind, params):
+    start = time.process_time()
+    X, y = _worker_data[kind]
+    model = make_estimator(kind, params).fit(X, y)
+    return kind, model, time.process_time() - start
+
+
+def _n_workers(n_jobs, n_tasks=None):
+    cpus = os.cpu_count() or 1
+    workers = cpus + 1 + n_jobs if n_jobs < 0 else n_jobs
+    # No idle workers when there are fewer tasks than cores
+    if n_tasks is not None:
+        workers = min(workers, n_tasks)
+    return max(1, workers)
+
+
+def search_and_fit(
+    data,
+    timer,
+    n_jobs=DEFAULT_N_JOBS,
+    cv=DEFAULT_CV,
+    n_iter=DEFAULT_N_ITER,
+    search=True,
+    params=None
+):
+    """
+    K-fold CV over every candidate of both models as independent pool
+    tasks, then refit the best candidate of each model on its full
+    train set. `params` ({kind: params}) skips the search and fits
+    exactly those. Returns ({kind: model}, {kind: search summary}).
+    """
+    train = {kind: (X, y) for kind, (X, y, _, _) in data.items()}
+    if params is not None:
+        search = False
+        grid = {kind: [dict(params[kind])] for kind in train}
+    else:
+        grid = {kind: candidates(kind, n_iter, search) for kind in train}
+
+    n_tasks = sum(len(p) for p in grid.values()) * (cv if search and cv > 1 else 1)
+
+    with tempfile.TemporaryDirectory(prefix="ecopack-train-") as shared_dir, ProcessPoolExecutor(
+        max_workers=_n_workers(n_jobs, n_tasks),
+        initializer=_init_worker,
+        initargs=(_share_arrays(train, shared_dir),)
+    ) as pool:
+        scores = {kind: [[] for _ in grid[kind]] for kind in grid}
+
+        if search and cv > 1:
+            with timer.stage("search"):
+                futures = [
+                    pool.submit(_cv_task, kind, i, params, fold, cv)
+                    for kind, params_list in grid.items()
+                    for i, params in enumerate(params_list)
+                    for fold in range(cv)
+                ]
+                for future in futures:
+                    kind, i, mae, cpu = future.result()
+                    scores[kind][i].append(mae)
+                    timer.add_cpu("search", cpu)
+
+        best = {}
+        for kind, params_list in grid.items():
+            means = [float(np.mean(s)) if s else float("nan") for s in scores[kind]]
+            i = int(np.nanargmin(means)) if search and cv > 1 else 0
+            best[kind] = {
+                "params": params_list[i],
+                "cv_mae": None if np.isnan(means[i]) else means[i],
+                "candidates": len(params_list)
+            }
+            if search and cv > 1:
+                print(f"✅ {kind.upper()} best CV MAE {means[i]:.4f} of {len(params_list)}: {params_list[i]}")
+
+        with timer.stage("fit"):
+            futures = [pool.submit(_fit_task, kind, best[kind]["params"]) for kind in grid]
+            models = {}
+            for future in futures:
+                kind, model, cpu = future.result()
+                models[kind] = model
+                timer.add_cpu("fit", cpu)
+
+    return models, best
+
+
+# ==========================================================
+# 6️⃣ METRICS
+# ==========================================================
+def regression_metrics(y_true, y_pred):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    return {
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "r2": float(r2_score(y_true, y_pred))
+    }
+
+
+def classification_metrics(y_true, y_pred):
+    """Above / below the test median, as in the original training script."""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    threshold = np.median(y_true)
+    true_cls = (y_true >= threshold).astype(int)
+    pred_cls = (y_pred >= threshold).astype(int)
+
+    return {
+        "accuracy": float(accuracy_score(true_cls, pred_cls)),
+        "precision": float(precision_score(true_cls, pred_cls, zero_division=0)),
+        "recall": float(recall_score(true_cls, pred_cls, zero_division=0)),
+        "f1": float(f1_score(true_cls, pred_cls, zero_division=0))
+    }
+
+
+def evaluate(models, data):
+    metrics = {}
+    for kind, model in models.items():
+        _, _, X_test, y_test = data[kind]
+        y_pred = model.predict(X_test)
+        metrics[kind] = {
+            **regression_metrics(y_test, y_pred),
+            "classification": classification_metrics(y_test, y_pred)
+        }
+    return metrics
+
+
+def print_metrics(metrics):
+    for kind, m in metrics.items():
+        print(f"\n===== {kind.upper()} PREDICTION =====")
+        print("MAE :", m["mae"])
+        print("RMSE:", m["rmse"])
+        print("R2  :", m["r2"])
+
+        c = m["classification"]
+        print(f"\n===== {kind.upper()} CLASSIFICATION =====")
+        print("Accuracy :", c["accuracy"])
+        print("Precision:", c["precision"])
+        print("Recall   :", c["recall"])
+        print("F1-score :", c["f1"])
+
+
+# ==========================================================
+# 7️⃣ ATOMIC SAVE
+# ==========================================================
+def save_models(models, scaler, model_dir=MODEL_DIR, baseline=None):
+    """
+    Pickle the model set into a new release directory (not live yet,
+    see activate_release()). Returns (release dir, {file: bytes}).
+
+    `baseline` ({kind: model}, default `models`) are the models of the
+    last full training, kept under BASELINE_DIR for ml.incremental.
+    """
+    release = new_release(model_dir)
+
+    payloads = {
+        MODEL_FILES["scaler"]: pickle.dumps(scaler),
+        MODEL_FILES["cost"]: pickle.dumps(models["cost"]),
+        MODEL_FILES["co2"]: pickle.dumps(models["co2"])
+    }
+    for name, data in payloads.items():
+        write_atomic(release / name, data)
+
+    baseline_dir = release / BASELINE_DIR
+    baseline_dir.mkdir()
+    for kind in TARGETS:
+        name = MODEL_FILES[kind]
+        model = (baseline or models)[kind]
+        if model is models[kind]:
+            link_file(release / name, baseline_dir / name)
+        else:
+            write_atomic(baseline_dir / name, pickle.dumps(model))
+
+    return release, {name: len(data) for name, data in payloads.items()}
+
+
+def load_report(model_dir=MODEL_DIR):
+    """Report of the last saved run, or None."""
+    try:
+        with open(Path(model_dir) / REPORT_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def watermark(split):
+    """Highest key seen by this run; the next incremental run starts after it."""
+    if split.key_train is None:
+        return None
+
+    from data import KEY_COLUMN
+
+    keys = [k.max() for k in (split.key_train, split.key_test) if len(k)]
+    return {"column": KEY_COLUMN, "max": int(max(keys)) if keys else None}
+
+
+# ==========================================================
+# 8️⃣ PIPELINE
+# ==========================================================
+def run(
+    n_jobs=DEFAULT_N_JOBS,
+    cv=DEFAULT_CV,
+    n_iter=DEFAULT_N_ITER,
+    search=True,
+    model_dir=MODEL_DIR,
+    chunk_rows=None,
+    export_arrays=None,
+    save=True
+):
+    """Full training run. Returns the report dict (also saved next to the models)."""
+    timer = StageTimer()
+    started = time.time()
+    print("Models will be saved to:", model_dir)
+
+    with timer.stage("load"):
+        split, scaler = load_split(chunk_rows)
+        data = model_data(split, scaler)
+
+    models, best = search_and_fit(data, timer, n_jobs=n_jobs, cv=cv, n_iter=n_iter, search=search)
+
+    with timer.stage("evaluate"):
+        metrics = evaluate(models, data)
+    print_metrics(metrics)
+
+    report = {
+        "started_at": started,
+        "n_jobs": _n_workers(n_jobs),
+        "cv": cv,
+        "rows": {"train": len(split.X_train), "test": len(split.X_test)},
+        "search": best,
+        "metrics": metrics,
+        "watermark": watermark(split)
+    }
+
+    return publish(models, scaler, report, timer, model_dir, export_arrays, save)
+
+
+def publish(models, scaler, report, timer, model_dir=MODEL_DIR, export_arrays=None, save=True, baseline=None):
+    """
+    Save models (+ array bundles) as one release, switch to it, and save
+    the report; print the stage table. export_arrays=None → export when
+    the live model set has bundles, so they never fall behind the pickles.
+    `baseline`: see save_models().
+    """
+    if save:
+        if export_arrays is None:
+            from ml.tree_engine import array_models_available
+            export_arrays = array_models_available(current_model_dir(model_dir))
+
+        with timer.stage("save"):
+            release, report["saved_bytes"] = save_models(models, scaler, model_dir, baseline)
+
+        if export_arrays:
+            from ml.tree_engine import export_models
+            with timer.stage("export_arrays"):
+                export_models(release)
+
+        # The whole set goes live with one rename
+        activate_release(model_dir, release)
+        report["release"] = release.name
+
+    report["stages"] = timer.report()
+
+    print("\n===== STAGES =====")
+    for name, s in report["stages"].items():
+        print(f"{name:<14} wall {s['wall_s']:>8.3f}s  cpu {s['cpu_s']:>8.3f}s  cores {s['cpu_cores']:.2f}")
+
+    if save:
+        write_atomic(Path(model_dir) / REPORT_FILE, json.dumps(report, indent=2).encode())
+
+    print("\n🎉 TRAINING COMPLETED SUCCESSFULLY")
+    return report
+
+
+# ==========================================================
+# CLI
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-jobs", type=int, default=DEFAULT_N_JOBS, help="pool workers (-1 = all cores)")
+    parser.add_argument("--cv", type=int, default=DEFAULT_CV, help="cross-validation folds")
+    parser.add_argument("--n-iter", type=int, default=DEFAULT_N_ITER, help="sampled candidates per model")
+    parser.add_argument("--no-search", action="store_true", help="train the fixed parameters only")
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    parser.add_argument("--chunk-rows", type=int, default=None, help="rows per streamed DB chunk")
+    parser.add_argument("--export-arrays", action=argparse.BooleanOptionalAction, default=None,
+                        help="write the ml.tree_engine bundles (default: when the live model set has them)")
+    parser.add_argument("--dry-run", action="store_true", help="do not write models or the report")
+    parser.add_argument("--incremental", action="store_true", help="update the saved models with new rows only")
+    parser.add_argument("--max-drift", type=float, default=None,
+                        help="incremental: max relative hold-out MAE increase vs. the last full training")
+    args = parser.parse_args(argv)
+
+    if args.incremental:
+        from ml.incremental import MAX_DRIFT, run_incremental
+        run_incremental(
+            n_jobs=args.n_jobs,
+            max_drift=MAX_DRIFT if args.max_drift is None else args.max_drift,
+            model_dir=Path(args.model_dir),
+            chunk_rows=args.chunk_rows,
+            export_arrays=args.export_arrays,
+            save=not args.dry_run
+        )
+        return 0
+
+    run(
+        n_jobs=args.n_jobs,
+        cv=args.cv,
+        n_iter=args.n_iter,
+        search=not args.no_search,
+        model_dir=Path(args.model_dir),
+        chunk_rows=args.chunk_rows,
+        export_arrays=args.export_arrays,
+        save=not args.dry_run
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""
+Array-backed inference for the cost (RandomForest) and CO2 (XGBoost) models.
+
+Both ensembles are flattened into padded NumPy arrays (split feature,
+threshold, left/right child, leaf value) and evaluated for every tree
+at once, one tree level per step, instead of going through the library
+predict paths.
+
+Exported models are directories of raw .npy files that load with
+mmap_mode="r", so every gunicorn worker maps the same read-only pages
+instead of holding its own unpickled copy.
+
+    python -m ml.tree_engine export   # *.pkl → *.arrays/ of the live model set
+    python -m ml.tree_engine verify   # compare with library predictions
+"""
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from ml.model_store import activate_release, current_model_dir, file_digest, new_release
+
+BASE_DIR = Path(__file__).resolve().parent
+MODEL_DIR = BASE_DIR.parent / "models"
+
+# meta.json key: sha256 of the pickle a bundle was exported from
+SOURCE_KEY = "source_sha256"
+
+# Rows evaluated per step: bounds the (rows × trees) node-index matrix
+CHUNK_ROWS = 2048
+
+
+# ==========================================================
+# 0️⃣ .NPY BUNDLES
+# ==========================================================
+def save_bundle(path, arrays, meta):
+    """Write `arrays` as <name>.npy plus meta.json, replacing `path` atomically."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    old = path.with_name(path.name + ".old")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+    (tmp / "meta.json").write_text(json.dumps(meta))
+
+    shutil.rmtree(old, ignore_errors=True)
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_bundle(path, mmap_mode="r"):
+    """Return ({name: array}, meta); arrays are read-only memory maps by default."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    arrays = {
+        f.stem: np.load(f, mmap_mode=mmap_mode)
+        for f in sorted(path.glob("*.npy"))
+    }
+    return arrays, meta
+
+
+def bundle_source(path):
+    """sha256 of the pickle the bundle was exported from (None for older bundles)."""
+    return json.loads((Path(path) / "meta.json").read_text()).get(SOURCE_KEY)
+
+
+# ==========================================================
+# 1️⃣ FLAT TREE ENSEMBLE
+# ==========================================================
+class TreeEnsemble:
+    """
+    n_trees trees padded to max_nodes nodes each, stored as flat arrays
+    indexed by tree * max_nodes + node. Leaves point to themselves, so
+    walking max_depth levels always ends on a leaf.
+
+    `split` is "le" (sklearn: go left if x <= t) or "lt" (XGBoost: go
+    left if x < t). Output is base_score + mean or sum of leaf values.
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "right", "value", "default_left", "children")
+
+    def __init__(self, feature, threshold, left, right, value, default_left,
+                 n_trees, max_nodes, max_depth, split, aggregate, base_score,
+                 threshold_dtype, children=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.n_trees = int(n_trees)
+        self.max_nodes = int(max_nodes)
+        self.max_depth = int(max_depth)
+        self.split = str(split)
+        self.aggregate = str(aggregate)
+        self.base_score = float(base_score)
+        self.threshold_dtype = np.dtype(threshold_dtype)
+
+        # [left, right] pairs → one gather per level: children[2 * node + go_right]
+        if children is None:
+            children = np.empty(2 * len(left), dtype=np.int64)
+            children[0::2] = left
+            children[1::2] = right
+            children *= 2
+        self.children = children
+
+    # ------------------------------------------------------
+    @classmethod
+    def from_trees(cls, trees, split, aggregate, base_score, threshold_dtype):
+        """
+        Build from a list of per-tree dicts with equal-length arrays:
+        feature, threshold, left, right, value (+ optional default_left).
+        Leaves are marked with left == -1.
+        """
+        n_trees = len(trees)
+        max_nodes = max(len(t["left"]) for t in trees)
+        size = n_trees * max_nodes
+
+        feature = np.zeros(size, dtype=np.int64)
+        threshold = np.zeros(size, dtype=threshold_dtype)
+        left = np.zeros(size, dtype=np.int32)
+        right = np.zeros(size, dtype=np.int32)
+        value = np.zeros(size, dtype=np.float64)
+        default_left = np.zeros(size, dtype=bool)
+
+        max_depth = 0
+        for i, tree in enumerate(trees):
+            offset = i * max_nodes
+            n = len(tree["left"])
+            nodes = np.arange(n)
+            is_leaf = np.asarray(tree["left"]) < 0
+
+            sl = slice(offset, offset + n)
+            feature[sl] = np.where(is_leaf, 0, tree["feature"])
+            threshold[sl] = np.where(is_leaf, 0, tree["threshold"])
+            left[sl] = offset + np.where(is_leaf, nodes, tree["left"])
+            right[sl] = offset + np.where(is_leaf, nodes, tree["right"])
+            value[sl] = tree["value"]
+            if "default_left" in tree:
+                default_left[sl] = tree["default_left"]
+
+            max_depth = max(max_depth, _tree_depth(tree["left"], tree["right"]))
+
+        return cls(
+            feature, threshold, left, right, value, default_left,
+            n_trees, max_nodes, max_depth, split, aggregate, base_score,
+            threshold_dtype
+        )
+
+    # ------------------------------------------------------
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        # Both libraries compare float32 inputs
+        X = X.astype(np.float32).astype(self.threshold_dtype)
+        n_features = X.shape[1]
+
+        feature = self.feature
+        threshold = self.threshold
+        children = self.children
+        has_missing = bool(np.isnan(X).any())
+
+        out = np.empty(len(X), dtype=np.float64)
+        roots = 2 * np.arange(self.n_trees, dtype=np.int64) * self.max_nodes
+
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            flat = chunk.ravel()
+            row_offset = (np.arange(len(chunk), dtype=np.int64) * n_features)[:, None]
+
+            # node ids are kept doubled (2 * node) to index `children` directly
+            node2 = np.repeat(roots[None, :], len(chunk), axis=0)
+
+            for _ in range(self.max_depth):
+                node = node2 >> 1
+                x = flat.take(row_offset + feature.take(node))
+                if self.split == "le":
+                    go_right = x > threshold.take(node)
+                else:
+                    go_right = x >= threshold.take(node)
+                if has_missing:
+                    missing = np.isnan(x)
+                    go_right[missing] = ~self.default_left.take(node[missing])
+                node2 = children.take(node2 + go_right)
+
+            leaves = self.value.take(node2 >> 1)
+            total = leaves.mean(axis=1) if self.aggregate == "mean" else leaves.sum(axis=1)
+            out[start:start + len(chunk)] = total + self.base_score
+
+        return out
+
+    # ------------------------------------------------------
+    def meta(self):
+        return {
+            "n_trees": self.n_trees,
+            "max_nodes": self.max_nodes,
+            "max_depth": self.max_depth,
+            "split": self.split,
+            "aggregate": self.aggregate,
+            "base_score": self.base_score,
+            "threshold_dtype": self.threshold_dtype.name
+        }
+
+    def save(self, path, source=None):
+        meta = self.meta()
+        if source is not None:
+            meta[SOURCE_KEY] = source
+        save_bundle(path, {name: getattr(self, name) for name in self.ARRAYS}, meta)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        arrays, meta = load_bundle(path, mmap_mode)
+        meta.pop(SOURCE_KEY, None)
+        return cls(**{name: arrays[name] for name in cls.ARRAYS}, **meta)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+
+def _tree_depth(left, right):
+    depth = 0
+    level = [0]
+    while level:
+        nxt = [c for n in level for c in (left[n], right[n]) if c >= 0]
+        if nxt:
+            depth += 1
+        level = nxt
+    return depth
+
+
+# ==========================================================
+# 2️⃣ EXPORTERS
+# ==========================================================
+def export_random_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        t = estimator.tree_
+        trees.append({
+            "feature": t.feature,
+            "threshold": t.threshold,
+            "left": t.children_left,
+            "right": t.children_right,
+            "value": t.value[:, 0, 0]
+        })
+    # sklearn thresholds are float64, inputs float32
+    return TreeEnsemble.from_trees(trees, "le", "mean", 0.0, np.float64)
+
+
+def export_xgboost(model):
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "reg:squarederror":
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+    trees = []
+    for t in learner["gradient_booster"]["model"]["trees"]:
+        left = np.asarray(t["left_children"])
+        trees.append({
+            "feature": t["split_indices"],
+            "threshold": t["split_conditions"],
+            "left": left,
+            "right": t["right_children"],
+            # split_conditions holds the leaf weight on leaf nodes
+            "value": np.where(left < 0, t["split_conditions"], 0.0),
+            "default_left": np.asarray(t["default_left"], dtype=bool)
+        })
+    return TreeEnsemble.from_trees(trees, "lt", "sum", base_score, np.float32)
+
+
+class ArrayScaler:
+    """StandardScaler.transform as two arrays."""
+
+    def __init__(self, mean, scale):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        return cls(scaler.mean_, scaler.scale_)
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+    def save(self, path, source=None):
+        meta = {} if source is None else {SOURCE_KEY: source}
+        save_bundle(path, {"mean": self.mean, "scale": self.scale}, meta)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        arrays, _ = load_bundle(path, mmap_mode)
+        return cls(arrays["mean"], arrays["scale"])
+
+
+# ==========================================================
+# 3️⃣ MODEL SET
+# ==========================================================
+ARRAY_FILES = {
+    "cost": "rf_cost_model.arrays",
+    "co2": "xgb_co2_model.arrays",
+    "scaler": "scaler.arrays"
+}
+
+
+def source_pickle(bundle_name):
+    """rf_cost_model.arrays → rf_cost_model.pkl"""
+    return bundle_name[:-len(".arrays")] + ".pkl"
+
+
+def export_models(model_dir=MODEL_DIR):
+    """
+    Flatten the pickled models in `model_dir` into .npy bundles, each
+    recording the sha256 of its pickle (see stale_bundles()).
+    """
+    model_dir = Path(model_dir)
+    exporters = {
+        "cost": export_random_forest,
+        "co2": export_xgboost,
+        "scaler": ArrayScaler.from_sklearn
+    }
+
+    exported = {}
+    for kind, name in ARRAY_FILES.items():
+        source = model_dir / source_pickle(name)
+        with open(source, "rb") as f:
+            exported[kind] = exporters[kind](pickle.load(f))
+        exported[kind].save(model_dir / name, source=file_digest(source))
+
+    cost, co2, scaler = exported["cost"], exported["co2"], exported["scaler"]
+
+    print(f"✅ COST MODEL: {cost.n_trees} trees, depth {cost.max_depth}, {cost.nbytes / 1024:.0f} KB")
+    print(f"✅ CO2 MODEL: {co2.n_trees} trees, depth {co2.max_depth}, {co2.nbytes / 1024:.0f} KB")
+    return cost, co2, scaler
+
+
+def load_array_models(model_dir=MODEL_DIR, mmap_mode="r", files=ARRAY_FILES):
+    model_dir = Path(model_dir)
+    return (
+        TreeEnsemble.load(model_dir / files["cost"], mmap_mode),
+        TreeEnsemble.load(model_dir / files["co2"], mmap_mode),
+        ArrayScaler.load(model_dir / files["scaler"], mmap_mode)
+    )
+
+
+def array_models_available(model_dir=MODEL_DIR):
+    return all((Path(model_dir) / name).exists() for name in ARRAY_FILES.values())
+
+
+def stale_bundles(model_dir=MODEL_DIR, files=ARRAY_FILES):
+    """
+    Bundles exported from a different pickle than the one next to them
+    (the models were retrained without exporting). Bundles that predate
+    the recorded hash are trusted.
+    """
+    model_dir = Path(model_dir)
+    stale = []
+    for name in files.values():
+        source = model_dir / source_pickle(name)
+        recorded = bundle_source(model_dir / name)
+        if recorded is not None and source.exists() and recorded != file_digest(source):
+            stale.append(name)
+    return stale
+
+
+def verify(model_dir=MODEL_DIR, n_rows=5000, rtol=1e-5, atol=1e-4):
+    """Compare array predictions with the library ones on random inputs."""
+    model_dir = Path(model_dir)
+    rng = np.random.default_rng(0)
+
+    X = np.column_stack([
+        rng.integers(1, 6, n_rows),
+        rng.uniform(1, 50, n_rows),
+        rng.uniform(1, 10, n_rows),
+        rng.uniform(10, 100, n_rows)
+    ]).astype(float)
+
+    with open(model_dir / "rf_cost_model.pkl", "rb") as f:
+        rf = pickle.load(f)
+    with open(model_dir / "xgb_co2_model.pkl", "rb") as f:
+        xgb = pickle.load(f)
+    with open(model_dir / "scaler.pkl", "rb") as f:
+        scaler = pickle.load(f)
+
+    cost, co2, array_scaler = load_array_models(model_dir)
+    X_scaled = scaler.transform(X)
+
+    checks = {
+        "cost": (rf.predict(X), cost.predict(X)),
+        "co2": (xgb.predict(X_scaled), co2.predict(array_scaler.transform(X)))
+    }
+
+    ok = True
+    for name, (expected, actual) in checks.items():
+        err = float(np.max(np.abs(expected - actual)))
+        match = np.allclose(expected, actual, rtol=rtol, atol=atol)
+        ok &= match
+        print(f"{'✅' if match else '❌'} {name}: max abs diff {err:.2e}")
+    return ok
+
+
+# ==========================================================
+# CLI
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model-dir", default=str(MODEL_DIR))
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        # Published as a new model set, so the server reloads the bundles
+        release = new_release(args.model_dir, base=True, exclude=ARRAY_FILES.values())
+        export_models(release)
+        activate_release(args.model_dir, release)
+        return 0
+    return 0 if verify(current_model_dir(args.model_dir)) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
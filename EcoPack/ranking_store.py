@@ -0,0 +1,158 @@
+# ranking_store.py
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+STORE_BACKEND = os.getenv("RANKING_STORE", "memory")
+STORE_PATH = os.getenv("RANKING_STORE_PATH", "/tmp/ecopack_rankings.sqlite3")
+STORE_TTL_SECONDS = float(os.getenv("RANKING_STORE_TTL", "3600"))
+STORE_MAX_ENTRIES = int(os.getenv("RANKING_STORE_MAX_ENTRIES", "1000"))
+
+
+def new_result_id():
+    return secrets.token_urlsafe(16)
+
+
+# ==========================================================
+# 1️⃣ IN-MEMORY LRU / TTL STORE (per worker)
+# ==========================================================
+class MemoryRankingStore:
+    """Bounded LRU map with a per-entry TTL, local to one process."""
+
+    def __init__(self, max_entries=STORE_MAX_ENTRIES, ttl=STORE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ==========================================================
+# 2️⃣ SQLITE STORE (shared by all workers on one host)
+# ==========================================================
+class SQLiteRankingStore:
+    """
+    Same interface as MemoryRankingStore, backed by a local SQLite file
+    so every gunicorn worker sees the same results. Values must be
+    JSON-serializable.
+    """
+
+    def __init__(self, path=STORE_PATH, max_entries=STORE_MAX_ENTRIES, ttl=STORE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rankings ("
+                " result_id TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS rankings_accessed ON rankings (accessed_at)"
+            )
+
+    def _connect(self):
+        # One connection per thread (and per process after fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+
+        row = conn.execute(
+            "SELECT payload, expires_at FROM rankings WHERE result_id = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, expires_at = row
+        if expires_at < now:
+            conn.execute("DELETE FROM rankings WHERE result_id = ?", (key,))
+            return None
+
+        conn.execute(
+            "UPDATE rankings SET accessed_at = ? WHERE result_id = ?", (now, key)
+        )
+        return json.loads(payload)
+
+    def put(self, key, value):
+        now = time.time()
+        conn = self._connect()
+
+        conn.execute(
+            "INSERT OR REPLACE INTO rankings VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl, now)
+        )
+        conn.execute("DELETE FROM rankings WHERE expires_at < ?", (now,))
+        conn.execute(
+            "DELETE FROM rankings WHERE result_id IN ("
+            " SELECT result_id FROM rankings ORDER BY accessed_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM rankings WHERE result_id = ?", (key,))
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+
+
+# ==========================================================
+# 3️⃣ FACTORY
+# ==========================================================
+def create_ranking_store(backend=STORE_BACKEND):
+    backend = (backend or "memory").lower()
+
+    if backend == "memory":
+        return MemoryRankingStore()
+    if backend == "sqlite":
+        return SQLiteRankingStore()
+
+    raise ValueError(f"Unknown RANKING_STORE backend: {backend!r}")
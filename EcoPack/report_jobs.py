@@ -0,0 +1,170 @@
+# report_jobs.py
+
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from export_utils import render_pdf
+from metrics import report_error
+
+# ==========================================================
+# CONFIG
+# ==========================================================
+REPORT_CACHE_DIR = Path(
+    os.getenv("REPORT_CACHE_DIR", Path(tempfile.gettempdir()) / "ecopack_reports")
+)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_JOB_TIMEOUT = float(os.getenv("REPORT_JOB_TIMEOUT", "120"))
+MAX_CACHED_REPORTS = int(os.getenv("MAX_CACHED_REPORTS", "500"))
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{8,64}$")
+
+
+# ==========================================================
+# WORKER-SIDE RENDERING
+# ==========================================================
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_to_file(rankings, path):
+    _write_atomic(Path(path), render_pdf(rankings))
+
+
+# ==========================================================
+# REPORT CACHE + ASYNC JOBS
+# ==========================================================
+class ReportJobs:
+    """
+    PDF reports cached on disk by the content hash of their ranking.
+
+    The files (`<key>.pdf`, plus `<key>.pending` / `<key>.error` markers)
+    live in one directory, so every gunicorn worker on the host sees the
+    same cache and job state. Async jobs run in a process pool, so
+    matplotlib/ReportLab work never holds the web worker's GIL.
+    """
+
+    def __init__(self, cache_dir=REPORT_CACHE_DIR, max_workers=REPORT_WORKERS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------
+    @staticmethod
+    def valid_key(key):
+        return bool(key) and bool(KEY_PATTERN.match(key))
+
+    def _file(self, key, suffix):
+        if not self.valid_key(key):
+            raise ValueError(f"Invalid report key: {key!r}")
+        return self.cache_dir / f"{key}{suffix}"
+
+    def path(self, key):
+        return self._file(key, ".pdf")
+
+    def cached(self, key):
+        path = self.path(key)
+        if path.exists():
+            self.hits += 1
+            return path
+        return None
+
+    # ------------------------------------------------------
+    def render_now(self, key, rankings):
+        """Synchronous path: cached file, or render in this process."""
+        path = self.cached(key)
+        if path is not None:
+            return path
+
+        self.misses += 1
+        _render_to_file(rankings, self.path(key))
+        self._prune()
+        return self.path(key)
+
+    # ------------------------------------------------------
+    def _pool(self):
+        # Pools do not survive fork → one per web worker process
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, key, rankings):
+        """Start rendering in the background unless cached or in progress."""
+        status = self.status(key)
+        if status in ("done", "pending"):
+            return status
+
+        self.misses += 1
+        self._file(key, ".error").unlink(missing_ok=True)
+        self._file(key, ".pending").touch()
+
+        future = self._pool().submit(_render_to_file, rankings, str(self.path(key)))
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return "pending"
+
+    def _finish(self, key, future):
+        error = future.exception()
+        if error is not None:
+            self._file(key, ".error").write_text(str(error))
+            report_error("report_job", exc=error)
+        self._file(key, ".pending").unlink(missing_ok=True)
+        self._prune()
+
+    def status(self, key):
+        if self.path(key).exists():
+            return "done"
+
+        pending = self._file(key, ".pending")
+        if pending.exists():
+            # A worker that died mid-render leaves a stale marker behind
+            if time.time() - pending.stat().st_mtime < REPORT_JOB_TIMEOUT:
+                return "pending"
+            return "failed"
+
+        if self._file(key, ".error").exists():
+            return "failed"
+        return "unknown"
+
+    def error(self, key):
+        path = self._file(key, ".error")
+        return path.read_text() if path.exists() else None
+
+    # ------------------------------------------------------
+    def _prune(self):
+        def mtime(path):
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0
+
+        reports = sorted(self.cache_dir.glob("*.pdf"), key=mtime, reverse=True)
+        for stale in reports[MAX_CACHED_REPORTS:]:
+            stale.unlink(missing_ok=True)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0
+        }
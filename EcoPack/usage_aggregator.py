@@ -0,0 +1,333 @@
+# usage_aggregator.py
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+# ==========================================================
+# WINDOWS: bucket size (seconds) × number of buckets kept
+# ==========================================================
+WINDOWS = {
+    "minute": (60, 60),       # last hour, per minute
+    "hour": (3600, 24),       # last day, per hour
+    "day": (86400, 30)        # last 30 days, per day
+}
+
+DEFAULT_WINDOW = "hour"
+
+USAGE_BACKEND = os.getenv("USAGE_STORE", "memory")
+USAGE_PATH = os.getenv("USAGE_STORE_PATH", "/tmp/ecopack_usage.sqlite3")
+
+
+def _bucket_start(epoch, bucket_seconds):
+    return datetime.fromtimestamp(epoch * bucket_seconds, tz=timezone.utc).isoformat()
+
+
+# ==========================================================
+# RING OF TIME BUCKETS
+# ==========================================================
+class _Ring:
+    """
+    Fixed number of buckets plus running totals over the whole ring.
+    Each bucket maps material_name → [count, co2_sum, cost_sum].
+    """
+
+    def __init__(self, bucket_seconds, buckets):
+        self.bucket_seconds = bucket_seconds
+        self.size = buckets
+        self.epochs = [None] * buckets
+        self.buckets = [{} for _ in range(buckets)]
+        self.counts = [0] * buckets
+        self.totals = {}
+
+    def _expire(self, epoch):
+        # Drop buckets that fell out of the window, subtracting them from totals
+        oldest = epoch - self.size + 1
+        for slot, slot_epoch in enumerate(self.epochs):
+            if slot_epoch is not None and slot_epoch < oldest:
+                for name, (count, co2, cost) in self.buckets[slot].items():
+                    total = self.totals[name]
+                    total[0] -= count
+                    total[1] -= co2
+                    total[2] -= cost
+                    if total[0] <= 0:
+                        del self.totals[name]
+                self.buckets[slot] = {}
+                self.counts[slot] = 0
+                self.epochs[slot] = None
+
+    def add(self, now, rows):
+        epoch = int(now // self.bucket_seconds)
+        self._expire(epoch)
+
+        slot = epoch % self.size
+        self.epochs[slot] = epoch
+        bucket = self.buckets[slot]
+
+        for name, co2, cost in rows:
+            for target in (bucket.setdefault(name, [0, 0.0, 0.0]),
+                           self.totals.setdefault(name, [0, 0.0, 0.0])):
+                target[0] += 1
+                target[1] += co2
+                target[2] += cost
+            self.counts[slot] += 1
+
+    def timeline(self, now):
+        epoch = int(now // self.bucket_seconds)
+        self._expire(epoch)
+
+        points = []
+        for e in range(epoch - self.size + 1, epoch + 1):
+            slot = e % self.size
+            count = self.counts[slot] if self.epochs[slot] == e else 0
+            points.append({
+                "bucket_start": _bucket_start(e, self.bucket_seconds),
+                "count": count
+            })
+        return points
+
+
+def _usage_rows(records):
+    return [
+        (
+            str(r["material_name"]),
+            float(r.get("co2_score") or 0),
+            float(r.get("cost_rupees") or 0)
+        )
+        for r in records
+        if r.get("material_name") is not None
+    ]
+
+
+class _TrendReads:
+    """Trend lists built on the subclass's _top(window, limit, now)."""
+
+    def usage_trend(self, window=DEFAULT_WINDOW, limit=5, now=None):
+        now = time.time() if now is None else now
+        return [
+            {"material_name": name, "count": int(count)}
+            for name, (count, _, _) in self._top(window, limit, now)
+        ]
+
+    def co2_trend(self, window=DEFAULT_WINDOW, limit=5, now=None):
+        now = time.time() if now is None else now
+        return [
+            {"material_name": name, "avg_co2": co2 / count}
+            for name, (count, co2, _) in self._top(window, limit, now)
+        ]
+
+    def cost_trend(self, window=DEFAULT_WINDOW, limit=5, now=None):
+        now = time.time() if now is None else now
+        return [
+            {"material_name": name, "avg_cost": cost / count}
+            for name, (count, _, cost) in self._top(window, limit, now)
+        ]
+
+
+# ==========================================================
+# 1️⃣ IN-MEMORY AGGREGATOR (per worker)
+# ==========================================================
+class UsageAggregator(_TrendReads):
+    """
+    Incremental per-material usage statistics across ranking calls,
+    local to one process.
+
+    Every recommended material adds one count plus its CO2 and cost to
+    the current minute, hour and day bucket. Memory is bounded by
+    (buckets × materials), and reads only walk the running totals.
+    """
+
+    def __init__(self, windows=WINDOWS):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._rings = {
+            name: _Ring(bucket_seconds, buckets)
+            for name, (bucket_seconds, buckets) in windows.items()
+        }
+
+    def record(self, records, now=None):
+        """Add the materials of one ranking result (list of record dicts)."""
+        rows = _usage_rows(records)
+        if not rows:
+            return
+
+        now = time.time() if now is None else now
+        with self._lock:
+            for ring in self._rings.values():
+                ring.add(now, rows)
+            self.version += 1
+
+    def state_key(self, window=DEFAULT_WINDOW, now=None):
+        """
+        Changes whenever the window's trends can change: on every record
+        and whenever the window slides to a new bucket.
+        """
+        now = time.time() if now is None else now
+        ring = self._ring(window)
+        return f"{window}.{self.version}.{int(now // ring.bucket_seconds)}"
+
+    def _ring(self, window):
+        ring = self._rings.get(window)
+        if ring is None:
+            raise ValueError(f"Unknown window {window!r}, expected one of {list(self._rings)}")
+        return ring
+
+    def _top(self, window, limit, now):
+        ring = self._ring(window)
+        with self._lock:
+            ring._expire(int(now // ring.bucket_seconds))
+            items = [(name, tuple(total)) for name, total in ring.totals.items()]
+        return heapq.nlargest(limit, items, key=lambda item: (item[1][0], item[0]))
+
+    def timeline(self, window=DEFAULT_WINDOW, now=None):
+        now = time.time() if now is None else now
+        ring = self._ring(window)
+        with self._lock:
+            return ring.timeline(now)
+
+
+# ==========================================================
+# 2️⃣ SQLITE AGGREGATOR (shared by all workers on one host)
+# ==========================================================
+class SQLiteUsageAggregator(_TrendReads):
+    """
+    Same interface as UsageAggregator, backed by a local SQLite file so
+    every gunicorn worker reports the same trends (and ETags). One row
+    per (window, bucket, material); buckets that left their window are
+    deleted on write.
+    """
+
+    def __init__(self, path=USAGE_PATH, windows=WINDOWS):
+        self.path = path
+        self.windows = dict(windows)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage_buckets ("
+                " window_name TEXT NOT NULL,"
+                " epoch INTEGER NOT NULL,"
+                " material_name TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " co2_sum REAL NOT NULL,"
+                " cost_sum REAL NOT NULL,"
+                " PRIMARY KEY (window_name, epoch, material_name))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage_version ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " version INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO usage_version VALUES (0, 0)")
+
+    def _connect(self):
+        # One connection per thread (and per process after fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @property
+    def version(self):
+        return self._connect().execute(
+            "SELECT version FROM usage_version WHERE id = 0"
+        ).fetchone()[0]
+
+    def _window(self, window):
+        spec = self.windows.get(window)
+        if spec is None:
+            raise ValueError(f"Unknown window {window!r}, expected one of {list(self.windows)}")
+        return spec
+
+    def record(self, records, now=None):
+        """Add the materials of one ranking result (list of record dicts)."""
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for name, co2, cost in _usage_rows(records):
+            total = totals[name]
+            total[0] += 1
+            total[1] += co2
+            total[2] += cost
+        if not totals:
+            return
+
+        now = time.time() if now is None else now
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for window, (bucket_seconds, buckets) in self.windows.items():
+                epoch = int(now // bucket_seconds)
+                conn.execute(
+                    "DELETE FROM usage_buckets WHERE window_name = ? AND epoch < ?",
+                    (window, epoch - buckets + 1)
+                )
+                conn.executemany(
+                    "INSERT INTO usage_buckets VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (window_name, epoch, material_name) DO UPDATE SET"
+                    " count = count + excluded.count,"
+                    " co2_sum = co2_sum + excluded.co2_sum,"
+                    " cost_sum = cost_sum + excluded.cost_sum",
+                    [(window, epoch, name, *total) for name, total in totals.items()]
+                )
+            conn.execute("UPDATE usage_version SET version = version + 1 WHERE id = 0")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def state_key(self, window=DEFAULT_WINDOW, now=None):
+        """
+        Changes whenever the window's trends can change: on every record
+        (by any worker) and whenever the window slides to a new bucket.
+        """
+        now = time.time() if now is None else now
+        bucket_seconds, _ = self._window(window)
+        return f"{window}.{self.version}.{int(now // bucket_seconds)}"
+
+    def _top(self, window, limit, now):
+        bucket_seconds, buckets = self._window(window)
+        oldest = int(now // bucket_seconds) - buckets + 1
+        rows = self._connect().execute(
+            "SELECT material_name, SUM(count), SUM(co2_sum), SUM(cost_sum)"
+            " FROM usage_buckets WHERE window_name = ? AND epoch >= ?"
+            " GROUP BY material_name"
+            " ORDER BY SUM(count) DESC, material_name DESC LIMIT ?",
+            (window, oldest, limit)
+        ).fetchall()
+        return [(name, (count, co2, cost)) for name, count, co2, cost in rows]
+
+    # ------------------------------------------------------
+    def timeline(self, window=DEFAULT_WINDOW, now=None):
+        now = time.time() if now is None else now
+        bucket_seconds, buckets = self._window(window)
+        epoch = int(now // bucket_seconds)
+
+        counts = dict(self._connect().execute(
+            "SELECT epoch, SUM(count) FROM usage_buckets"
+            " WHERE window_name = ? AND epoch >= ? GROUP BY epoch",
+            (window, epoch - buckets + 1)
+        ).fetchall())
+        return [
+            {"bucket_start": _bucket_start(e, bucket_seconds), "count": int(counts.get(e, 0))}
+            for e in range(epoch - buckets + 1, epoch + 1)
+        ]
+
+
+# ==========================================================
+# 3️⃣ FACTORY
+# ==========================================================
+def create_usage_aggregator(backend=USAGE_BACKEND):
+    backend = (backend or "memory").lower()
+
+    if backend == "memory":
+        return UsageAggregator()
+    if backend == "sqlite":
+        return SQLiteUsageAggregator()
+
+    raise ValueError(f"Unknown USAGE_STORE backend: {backend!r}")